@@ -3,6 +3,11 @@ ASGI config for WellKidHomeWork project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The live dashboard stream (/live/events/) holds long-lived connections and
+should be served through this entry point, e.g.:
+
+    uvicorn WellKidHomeWork.asgi:application
+
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 """
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -80,10 +81,53 @@ WSGI_APPLICATION = 'WellKidHomeWork.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
     }
 }
 
+# Профиль SQLite для нескольких воркеров (gunicorn/uvicorn), включается
+# переменной окружения SQLITE_PRODUCTION=1. Прагмы выполняются при каждом
+# подключении (tracker/db.py), транзакции на запись начинаются с
+# BEGIN IMMEDIATE, соединения переиспользуются между запросами.
+# Проверка под нагрузкой: python manage.py stress_sqlite
+SQLITE_PRAGMAS = None
+
+if os.environ.get('SQLITE_PRODUCTION') == '1':
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+        },
+    })
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 10000,
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -32000,
+        'temp_store': 'MEMORY',
+    }
+
+# Реплика для отчётов в файлы, выгрузок, дашбордов и аналитики
+# (tracker/routers.py). Включается переменной SQLITE_REPLICA_PATH — путь к
+# копии базы, которую обновляет python manage.py refresh_replica. Без неё
+# алиас указывает на основную базу и роутер его не использует.
+DATABASES['replica'] = {
+    **DATABASES['default'],
+    'TEST': {'MIRROR': 'default'},
+}
+REPLICA_DATABASE_ALIAS = 'replica'
+REPLICA_ENABLED = bool(os.environ.get('SQLITE_REPLICA_PATH'))
+if REPLICA_ENABLED:
+    DATABASES['replica']['NAME'] = os.environ['SQLITE_REPLICA_PATH']
+
+# Сколько реплика может отставать (интервал refresh_replica --every): столько
+# после записи сброшенные ею кэши заполняются из основной базы
+REPLICA_MAX_LAG = 5 * 60
+
+DATABASE_ROUTERS = ['tracker.routers.ReplicaRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -17,6 +17,9 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path
 
+from tracker.live import event_stream
+
 urlpatterns = [
+    path('live/events/', event_stream, name='live_events'),
     path('', admin.site.urls),
 ]
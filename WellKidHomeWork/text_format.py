@@ -291,6 +291,10 @@ def printf(*args: Any, style: Optional[str] = None, **kwargs: Any) -> None:
     print(*processed_args, **kwargs)
 
 
+# Короткое имя: под ним printf вызывают prinf_table, prinf_progress и примеры
+prinf = printf
+
+
 # СТАНДАРТНЫЕ СТИЛИ
 STYLES: str = """
 /* Основные стили для текста */
@@ -1,17 +1,302 @@
+import json
+import tempfile
+from functools import partial
+
+from django import forms
 from django.contrib import admin
-from django.utils.html import format_html
-from django.urls import reverse
+from django.contrib.admin.models import CHANGE, LogEntry
+from django.contrib.admin.utils import unquote
+from django.contrib.contenttypes.models import ContentType
+from django.db import router, transaction
+from django.db.models import Count, Q
+from django.forms.models import model_to_dict
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.http import FileResponse, Http404, StreamingHttpResponse
+from django.template.response import TemplateResponse
+from django.utils import timezone
+from django.utils.html import format_html, format_html_join
+from django.urls import path, reverse
 from django.utils.http import urlencode
-from .models import Student, Lesson
+from . import analytics, archive, bulk, jobs
+from .dashboard import get_group_stats, get_traffic_light_counts
+from .etags import catalog_signature, conditional_response, page_etag
+from .export import stream_csv, write_xlsx
+from .pagination import EstimatedCountPaginator, KeysetChangeList
+from .parallel import fetch_in_threads, fetch_sequentially
+from .models import ArchivedLessonProgress, ArchivedStudent, AutomatedReport, Job, Student, Lesson, StudyGroup, StudentLessonProgress
+from .search import search_students
+from .snapshots import get_snapshot, get_snapshots
+from .timeline import get_timeline_page, student_timeline_sources
 
 from django.utils.safestring import mark_safe
 
 
 @admin.register(Lesson)
 class LessonAdmin(admin.ModelAdmin):
-    list_display = ['code', 'module', 'lesson']
+    list_display = ['code', 'module', 'lesson', 'topic']
     list_filter = ['module']
-    search_fields = ['module', 'lesson']
+    search_fields = ['module', 'lesson', 'topic']
+
+@admin.register(StudyGroup)
+class StudyGroupAdmin(admin.ModelAdmin):
+    list_display = ['number', 'schedule', 'current_lesson', 'students_count']
+    search_fields = ['number']
+    actions = ['advance_group', 'advance_group_homework']
+    
+    # Выборки дашборда идут одновременно (tracker/parallel.py);
+    # benchmark_views сравнивает с последовательными
+    concurrent_fetches = True
+    
+    @admin.action(description='Перевести группы на следующий урок')
+    def advance_group(self, request, queryset):
+        updated = bulk.advance_groups(queryset, bulk.LAST_LESSON)
+        self.message_user(request, f'Переведено учеников: {updated}')
+    
+    @admin.action(description='Засчитать группам ДЗ следующего урока')
+    def advance_group_homework(self, request, queryset):
+        updated = bulk.advance_groups(queryset, bulk.LAST_HOMEWORK_LESSON)
+        self.message_user(request, f'Засчитано ДЗ: {updated}')
+    
+    def students_count(self, obj):
+        return obj.students_count
+    students_count.short_description = 'Учеников'
+    students_count.admin_order_field = 'students_count'
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(
+            'current_lesson'
+        ).annotate(students_count=Count('students', filter=Q(students__is_active=True)))
+    
+    def get_urls(self):
+        info = self.opts.app_label, self.opts.model_name
+        return [
+            path(
+                'dashboard/',
+                # Ответ проверяется по ETag (tracker/etags.py), never_cache не нужен
+                self.admin_site.admin_view(self.dashboard_view, cacheable=True),
+                name='%s_%s_dashboard' % info,
+            ),
+        ] + super().get_urls()
+    
+    def dashboard_view(self, request):
+        """Успеваемость по группам: размер, отставание, уроки и светофор"""
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        
+        fetch = fetch_in_threads if self.concurrent_fetches else fetch_sequentially
+        data = fetch({
+            'groups': get_group_stats,
+            'traffic_light': get_traffic_light_counts,
+        })
+        
+        def render():
+            context = {
+                **self.admin_site.each_context(request),
+                'opts': self.opts,
+                'title': 'Успеваемость по группам',
+                **data,
+            }
+            return TemplateResponse(request, 'admin/tracker/studygroup/dashboard.html', context)
+        
+        # ETag по выведенным данным: статистика групп может прийти из кэша,
+        # поэтому версия страницы считается по ней, а не по таблице учеников
+        return conditional_response(request, page_etag(request, data), render)
+
+
+@admin.register(StudentLessonProgress)
+class StudentLessonProgressAdmin(admin.ModelAdmin):
+    list_display = ['student', 'lesson', 'date_completed', 'homework_completed']
+    list_filter = ['homework_completed', 'lesson__module']
+    search_fields = ['student__last_name', 'student__first_name']
+    raw_id_fields = ['student']
+    date_hierarchy = 'date_completed'
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('student', 'lesson')
+
+
+@admin.register(AutomatedReport)
+class AutomatedReportAdmin(admin.ModelAdmin):
+    list_display = [
+        'student', 'period_start', 'period_end',
+        'lessons_completed', 'homeworks_completed',
+        'total_lessons_completed', 'total_homeworks_completed',
+    ]
+    search_fields = ['student__last_name', 'student__first_name']
+    raw_id_fields = ['student']
+    date_hierarchy = 'period_end'
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('student')
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'status', 'progress_column', 'created_at', 'finished_at', 'result']
+    list_filter = ['status', 'kind']
+    readonly_fields = [
+        'kind', 'params', 'status', 'progress', 'result', 'error',
+        'worker', 'created_at', 'started_at', 'heartbeat_at', 'finished_at',
+    ]
+    
+    def progress_column(self, obj):
+        return format_html('<progress max="100" value="{}"></progress> {}%', obj.progress, obj.progress)
+    progress_column.short_description = 'Прогресс'
+    
+    # Задачи создаются только действиями админки и командами
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+class ArchivedLessonProgressInline(admin.TabularInline):
+    model = ArchivedLessonProgress
+    fields = ['lesson', 'date_completed', 'homework_completed']
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('lesson')
+    
+    def has_add_permission(self, request, obj=None):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedStudent)
+class ArchivedStudentAdmin(admin.ModelAdmin):
+    """Архив только для просмотра; живые таблицы учеников он не затрагивает"""
+    list_display = ['__str__', 'email', 'format', 'last_lesson', 'archived_at']
+    list_filter = ['format']
+    search_fields = ['last_name', 'first_name', 'email']
+    list_select_related = ['last_lesson']
+    show_full_result_count = False
+    exclude = ['reports']
+    inlines = [ArchivedLessonProgressInline]
+    actions = ['restore']
+    
+    @admin.action(description='Вернуть из архива', permissions=['restore'])
+    def restore(self, request, queryset):
+        restored = archive.restore_students(queryset)
+        self.message_user(request, f'Возвращено из архива учеников: {restored}')
+    
+    def has_restore_permission(self, request):
+        return request.user.has_perm('tracker.add_student')
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+class PreloadedChoiceField(forms.ModelChoiceField):
+    """ModelChoiceField, который находит выбранный объект в уже загруженном списке, а не запросом"""
+    
+    def __init__(self, objects, **kwargs):
+        super().__init__(**kwargs)
+        self.objects = {str(obj.pk): obj for obj in objects}
+    
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            return self.objects[str(getattr(value, 'pk', value))]
+        except KeyError:
+            raise ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice',
+                params={'value': value},
+            )
+
+
+class LessonChoiceField(PreloadedChoiceField):
+    """Выбор урока: варианты строятся из того же списка уроков, без запроса на каждую строку"""
+    
+    def __init__(self, lessons, **kwargs):
+        super().__init__(lessons, **kwargs)
+        self.choices = [('', self.empty_label)] + [
+            (lesson.pk, self.label_from_instance(lesson)) for lesson in lessons
+        ]
+
+
+class ChangeListForm(forms.ModelForm):
+    
+    def _get_validation_exclusions(self):
+        exclude = super()._get_validation_exclusions()
+        # Выбор уже проверен по загруженному списку, ForeignKey.validate
+        # повторил бы проверку запросом на каждое поле каждой строки
+        exclude.update(
+            name for name, field in self.fields.items()
+            if isinstance(field, PreloadedChoiceField)
+        )
+        return exclude
+
+
+class ChangeListFormSet(forms.BaseModelFormSet):
+    """Формы строк получают учеников из queryset страницы, а не запросом на строку"""
+    
+    def get_queryset(self):
+        # Страница, выбранная по курсору, приходит уже загруженным списком
+        if isinstance(self.queryset, list):
+            return self.queryset
+        return super().get_queryset()
+    
+    def add_fields(self, form, index):
+        super().add_fields(form, index)
+        name = self.model._meta.pk.name
+        field = form.fields[name]
+        form.fields[name] = PreloadedChoiceField(
+            self.get_queryset(),
+            queryset=field.queryset,
+            initial=field.initial,
+            required=field.required,
+            widget=field.widget,
+        )
+
+
+class StudyGroupFilter(admin.SimpleListFilter):
+    """Фильтр по группе с количеством учеников из кэша (без DISTINCT по ученикам)"""
+    title = 'группа'
+    parameter_name = 'group'
+    
+    def lookups(self, request, model_admin):
+        return [
+            (str(pk), f'{number} ({count})')
+            for pk, number, count in StudyGroup.get_facets()
+        ]
+    
+    def queryset(self, request, queryset):
+        value = self.value()
+        if value and value.isdigit():
+            return queryset.filter(group_id=value)
+        return queryset
+
+
+class StudentChangeList(KeysetChangeList):
+    
+    def get_results(self, request):
+        super().get_results(request)
+        # Снимки прогресса всей страницы одним обращением к кэшу
+        snapshots = get_snapshots(self.result_list)
+        for obj in self.result_list:
+            obj.snapshot = snapshots[obj.pk]
+
+
+class StudentExportChangeList(StudentChangeList):
+    """Только queryset с фильтрами, поиском и сортировкой: страница и число строк не выбираются"""
+    
+    def get_results(self, request):
+        self.result_list = []
+
 
 @admin.register(Student)
 class StudentAdmin(admin.ModelAdmin):
@@ -28,6 +313,7 @@ class StudentAdmin(admin.ModelAdmin):
         'last_lesson',
         'last_homework_lesson',
         'lessons_behind_column',
+        'recent_activity_column',
     ]
     
     list_editable = ('last_lesson', 'last_homework_lesson')
@@ -36,20 +322,40 @@ class StudentAdmin(admin.ModelAdmin):
     # Вариант 2: Если нужно оставить имя как ссылку, но убрать остальное
     # list_display_links = ('full_name_column',)
     
-    list_filter = ['format', 'group_number', 'last_lesson__module']
-    search_fields = ['first_name', 'last_name', 'email', 'group_number']
+    list_filter = ['is_active', 'format', StudyGroupFilter, 'last_lesson__module']
+    
+    # Листание по курсору и число строк без полного COUNT (tracker/pagination.py)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
-    # Убираем выпадающее меню действий
-    actions = None
+    search_fields = ['first_name', 'last_name', 'email', 'group__number']
+    
+    # В меню действий только фоновые задачи, массового удаления нет
+    actions = [
+        'advance_lesson',
+        'advance_homework',
+        'mark_homework_done',
+        'enqueue_reports',
+        'enqueue_report_output',
+        'enqueue_export_csv',
+    ]
     
     fieldsets = (
         ('Основная информация', {
             'fields': ('first_name', 'last_name', 'email', 'first_lesson_date')
         }),
         ('Обучение', {
-            'fields': ('format', 'group_number', 'last_lesson', 'last_homework_lesson')
+            'fields': ('is_active', 'format', 'group', 'last_lesson', 'last_homework_lesson')
+        }),
+        ('Прогресс', {
+            'fields': ('progress_snapshot',)
         }),
     )
+    readonly_fields = ('progress_snapshot',)
+    
+    # Снимок и лента страницы ученика читаются одновременно (tracker/parallel.py);
+    # benchmark_views сравнивает с последовательными
+    concurrent_fetches = True
     
     def full_name_column(self, obj):
         """Отображаем имя и фамилию в одной колонке БЕЗ ссылки"""
@@ -64,14 +370,16 @@ class StudentAdmin(admin.ModelAdmin):
     
     def format_column(self, obj):
         """Отображаем формат с номером группы если есть"""
-        if obj.format == Student.GROUP and obj.group_number:
-            return f'{obj.get_format_display()} ({obj.group_number})'
+        if obj.format == Student.GROUP and obj.group:
+            return f'{obj.get_format_display()} ({obj.group.number})'
         return obj.get_format_display()
     format_column.short_description = 'Формат'
     
     def lessons_behind_column(self, obj):
         """Цветовое оформление отставания"""
-        behind = obj.lessons_behind
+        # Из снимка страницы: Student.lessons_behind обращается к кэшу на каждую строку
+        snapshot = getattr(obj, 'snapshot', None)
+        behind = snapshot['lessons_behind'] if snapshot else obj.lessons_behind
         if behind is None:
             return '-'
         
@@ -83,6 +391,184 @@ class StudentAdmin(admin.ModelAdmin):
             return format_html('<span style="color: red; font-weight: bold;">Отстаёт на {}</span>', behind)
     lessons_behind_column.short_description = 'Отставание'
     
+    def recent_activity_column(self, obj):
+        """Дата последнего прохождения из снимка прогресса"""
+        snapshot = getattr(obj, 'snapshot', None)
+        if not snapshot or not snapshot['recent_activity']:
+            return '-'
+        return snapshot['recent_activity'][0]['date']
+    recent_activity_column.short_description = 'Последняя активность'
+    
+    def progress_snapshot(self, obj):
+        """Последние прохождения уроков из кэша снимков"""
+        if obj is None or obj.pk is None:
+            return '-'
+        snapshot = getattr(obj, 'snapshot', None) or get_snapshot(obj)
+        recent = snapshot['recent_activity']
+        if not recent:
+            return 'Нет прохождений'
+        return format_html_join(
+            mark_safe('<br>'),
+            '{} — {}{}',
+            (
+                (item['date'], item['lesson'], ' (ДЗ сдано)' if item['homework_completed'] else '')
+                for item in recent
+            ),
+        )
+    progress_snapshot.short_description = 'Последние уроки'
+    
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name in ('last_lesson', 'last_homework_lesson'):
+            if not hasattr(request, '_lessons'):
+                request._lessons = list(Lesson.objects.all())
+            return db_field.formfield(form_class=LessonChoiceField, lessons=request._lessons, **kwargs)
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+    
+    def get_changelist_form(self, request, **kwargs):
+        kwargs.setdefault('form', ChangeListForm)
+        return super().get_changelist_form(request, **kwargs)
+    
+    def get_changelist_formset(self, request, **kwargs):
+        kwargs.setdefault('formset', ChangeListFormSet)
+        return super().get_changelist_formset(request, **kwargs)
+    
+    def changelist_view(self, request, extra_context=None):
+        if request.method != 'POST' or '_save' not in request.POST:
+            return super().changelist_view(request, extra_context)
+        
+        # Правки list_editable копятся в save_model/log_change и пишутся
+        # одним bulk_update и одним bulk_create в той же транзакции
+        request._list_editable = {'students': [], 'fields': set(), 'log': []}
+        with transaction.atomic(using=router.db_for_write(self.model)):
+            response = super().changelist_view(request, extra_context)
+            self._save_list_editable(request)
+        return response
+    
+    def save_model(self, request, obj, form, change):
+        batch = getattr(request, '_list_editable', None)
+        if batch is None:
+            return super().save_model(request, obj, form, change)
+        batch['students'].append(obj)
+        batch['fields'].update(form.changed_data)
+    
+    def log_change(self, request, obj, message):
+        batch = getattr(request, '_list_editable', None)
+        if batch is None:
+            return super().log_change(request, obj, message)
+        batch['log'].append((obj, message))
+    
+    def _save_list_editable(self, request):
+        batch = request._list_editable
+        if not batch['students']:
+            return
+        
+        bulk.save_students(batch['students'], batch['fields'])
+        content_type = ContentType.objects.get_for_model(self.model)
+        LogEntry.objects.bulk_create([
+            LogEntry(
+                user_id=request.user.pk,
+                content_type=content_type,
+                object_id=str(obj.pk),
+                object_repr=str(obj)[:200],
+                action_flag=CHANGE,
+                change_message=json.dumps(message) if isinstance(message, list) else message,
+            )
+            for obj, message in batch['log']
+        ])
+    
+    def change_view(self, request, object_id, form_url='', extra_context=None):
+        # Выборки делаются до транзакции changeform_view: внутри неё потоки
+        # не получили бы своих соединений (см. fetch_in_threads)
+        render = partial(super().change_view, request, object_id, form_url, extra_context)
+        if request.method == 'GET':
+            obj = self.get_object(request, unquote(object_id))
+            if obj is not None and self.has_view_or_change_permission(request, obj):
+                fetch = fetch_in_threads if self.concurrent_fetches else fetch_sequentially
+                request._change_page = fetch(self._change_page_fetchers(obj, request.GET.get('cursor')))
+                # Без изменений ученика, его ленты и справочников — 304 без рендеринга формы
+                return conditional_response(request, self._change_page_etag(request, obj), render)
+        return render()
+    
+    def _change_page_fetchers(self, obj, cursor):
+        """Независимые выборки страницы ученика"""
+        return {
+            'snapshot': lambda: get_snapshot(obj),
+            # Лента активности листается по курсору (tracker/timeline.py)
+            'timeline': lambda: get_timeline_page(student_timeline_sources(obj), cursor),
+        }
+    
+    def _change_page_etag(self, request, obj):
+        """ETag страницы ученика: поля формы, снимок, лента и подписи списков выбора"""
+        items, next_cursor = request._change_page['timeline']
+        return page_etag(
+            request,
+            model_to_dict(obj),
+            obj.updated_at,
+            request._change_page['snapshot'],
+            [(item['kind'], item['date'], model_to_dict(item['object'])) for item in items],
+            next_cursor,
+            catalog_signature(),
+        )
+    
+    def get_object(self, request, object_id, from_field=None):
+        obj = super().get_object(request, object_id, from_field)
+        page = getattr(request, '_change_page', None)
+        if obj is not None and page is not None:
+            obj.snapshot = page['snapshot']
+        return obj
+    
+    def render_change_form(self, request, context, add=False, change=False, form_url='', obj=None):
+        page = getattr(request, '_change_page', None)
+        if page is not None:
+            items, next_cursor = page['timeline']
+            context.update({
+                'show_timeline': True,
+                'timeline': items,
+                'timeline_next_cursor': next_cursor,
+                'timeline_is_first_page': not request.GET.get('cursor'),
+            })
+        return super().render_change_form(request, context, add, change, form_url, obj)
+    
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+    
+    @admin.action(description='Перевести на следующий урок')
+    def advance_lesson(self, request, queryset):
+        updated = bulk.advance_students(queryset, bulk.LAST_LESSON)
+        self.message_user(request, f'Переведено на следующий урок: {updated}')
+    
+    @admin.action(description='Засчитать ДЗ следующего урока')
+    def advance_homework(self, request, queryset):
+        updated = bulk.advance_students(queryset, bulk.LAST_HOMEWORK_LESSON)
+        self.message_user(request, f'Засчитано ДЗ: {updated}')
+    
+    @admin.action(description='Засчитать ДЗ по последнему уроку')
+    def mark_homework_done(self, request, queryset):
+        updated = bulk.mark_homework_done(queryset)
+        self.message_user(request, f'Засчитано ДЗ: {updated}')
+    
+    def _enqueue(self, request, queryset, kind, **params):
+        job = jobs.enqueue(kind, student_ids=list(queryset.values_list('pk', flat=True)), **params)
+        url = reverse('admin:tracker_job_change', args=[job.pk])
+        self.message_user(request, format_html(
+            'Задача <a href="{}">{}</a> поставлена в очередь, прогресс — в разделе «Фоновые задачи»',
+            url, job,
+        ))
+    
+    @admin.action(description='Сформировать отчёты (в фоне)')
+    def enqueue_reports(self, request, queryset):
+        self._enqueue(request, queryset, 'generate_reports')
+    
+    @admin.action(description='Выгрузить отчёт для аналитики (в фоне)')
+    def enqueue_report_output(self, request, queryset):
+        self._enqueue(request, queryset, 'report_output')
+    
+    @admin.action(description='Выгрузить CSV (в фоне)')
+    def enqueue_export_csv(self, request, queryset):
+        self._enqueue(request, queryset, 'export_students', file_format='csv')
+    
     # Опционально: убрать кнопку "Добавить" сверху
     # def has_add_permission(self, request):
     #     return False
@@ -93,5 +579,97 @@ class StudentAdmin(admin.ModelAdmin):
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related(
-            'last_lesson', 'last_homework_lesson'
-        )
\ No newline at end of file
+            'last_lesson', 'last_homework_lesson', 'group'
+        )
+    
+    def get_changelist(self, request, **kwargs):
+        if getattr(request, '_export', False):
+            return StudentExportChangeList
+        return StudentChangeList
+    
+    def get_search_results(self, request, queryset, search_term):
+        # Поиск идёт по индексу (см. tracker/search.py), search_fields
+        # остаются только для отображения строки поиска
+        return search_students(queryset, search_term), False
+    
+    def get_urls(self):
+        info = self.opts.app_label, self.opts.model_name
+        return [
+            # Страница ученика проверяется по ETag (tracker/etags.py), never_cache не нужен
+            path(
+                '<path:object_id>/change/',
+                self.admin_site.admin_view(self.change_view, cacheable=True),
+                name='%s_%s_change' % info,
+            ),
+            path(
+                'export/<str:file_format>/',
+                self.admin_site.admin_view(self.export_view),
+                name='%s_%s_export' % info,
+            ),
+            path(
+                'forecast/',
+                self.admin_site.admin_view(self.forecast_view),
+                name='%s_%s_forecast' % info,
+            ),
+            path(
+                'live/',
+                self.admin_site.admin_view(self.live_view),
+                name='%s_%s_live' % info,
+            ),
+        ] + super().get_urls()
+    
+    def export_view(self, request, file_format):
+        """Выгрузка учеников с текущими фильтрами и поиском changelist"""
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        if file_format not in ('csv', 'xlsx'):
+            raise Http404
+        
+        # Фильтры, поиск и сортировка changelist без выборки страницы
+        request._export = True
+        queryset = self.get_changelist_instance(request).queryset
+        filename = f'students-{timezone.localdate():%Y-%m-%d}.{file_format}'
+        
+        if file_format == 'csv':
+            response = StreamingHttpResponse(
+                stream_csv(queryset),
+                content_type='text/csv; charset=utf-8',
+            )
+            response['Content-Disposition'] = f'attachment; filename="{filename}"'
+            return response
+        
+        try:
+            import xlsxwriter  # noqa: F401
+        except ImportError:
+            raise Http404('Для выгрузки в XLSX установите пакет xlsxwriter')
+        
+        # Книга пишется во временный файл и отдаётся с диска
+        output = tempfile.TemporaryFile()
+        write_xlsx(queryset, output)
+        output.seek(0)
+        return FileResponse(output, as_attachment=True, filename=filename)
+    
+    def forecast_view(self, request):
+        """Прогноз окончания программы и группа риска"""
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.opts,
+            'title': 'Прогноз окончания программы',
+            'forecast': analytics.get_cached_forecast() if analytics.np is not None else None,
+        }
+        return TemplateResponse(request, 'admin/tracker/student/forecast.html', context)
+    
+    def live_view(self, request):
+        """Живой дашборд: светофор и сданные ДЗ без перезагрузки страницы"""
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.opts,
+            'title': 'Живой дашборд',
+        }
+        return TemplateResponse(request, 'admin/tracker/student/live.html', context)
\ No newline at end of file
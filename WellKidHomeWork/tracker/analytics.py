@@ -0,0 +1,194 @@
+"""
+Прогноз окончания программы для всех учеников.
+
+Список учеников выгружается одним запросом values_list в столбцы NumPy;
+номер урока и отставание считаются через Lesson.get_map() один раз на
+каждое сочетание (урок, урок с ДЗ), а не на ученика. Дальше темп, дата окончания, перцентиль отставания и признак риска
+считаются векторно, без циклов по ученикам. Требует установленного numpy.
+"""
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Lesson, Student
+from .routers import use_replica_unless_written
+
+try:
+    import numpy as np
+except ImportError:  # numpy нужен только для аналитики
+    np = None
+
+
+CURRICULUM_LESSONS = 12 * 4
+
+# Ученик в группе риска, если его темп ниже этой доли медианного темпа,
+# отставание по ДЗ не меньше AT_RISK_BACKLOG или попадает в верхние
+# (100 - AT_RISK_PERCENTILE) процентов по всем ученикам
+SLOW_PACE_RATIO = 0.5
+AT_RISK_BACKLOG = 3
+AT_RISK_PERCENTILE = 90
+
+FORECAST_CACHE_KEY = 'tracker:forecast'
+FORECAST_CACHE_TIMEOUT = 10 * 60
+
+ROSTER_FIELDS = ['pk', 'first_lesson_date', 'last_lesson_id', 'last_homework_lesson_id']
+
+
+def _lesson_ids(ids):
+    """id уроков, 0 для отсутствующих (None становится nan)"""
+    return np.nan_to_num(np.array(ids, dtype=float), nan=0).astype(np.int64)
+
+
+def load_roster(queryset=None):
+    """
+    Столбцы ростера одним запросом: id, дата первого урока, номер
+    последнего урока (0 без урока) и отставание по ДЗ (Lesson.lessons_behind)
+    """
+    if queryset is None:
+        queryset = Student.active.all()
+    rows = list(queryset.order_by().values_list(*ROSTER_FIELDS))
+
+    if not rows:
+        columns = [[] for _ in ROSTER_FIELDS]
+    else:
+        columns = list(zip(*rows))
+
+    ids, start_dates, lesson_ids, homework_ids = columns
+    pairs = np.column_stack([_lesson_ids(lesson_ids), _lesson_ids(homework_ids)]).reshape(-1, 2)
+    unique, inverse = np.unique(pairs, axis=0, return_inverse=True)
+
+    lesson_map = Lesson.get_map()
+    numbers = np.zeros(len(unique), dtype=np.int64)
+    backlogs = np.zeros(len(unique), dtype=np.int64)
+    for index, (lesson_id, homework_id) in enumerate(unique.tolist()):
+        last_lesson = lesson_map.get(lesson_id)
+        behind = Lesson.lessons_behind(last_lesson, lesson_map.get(homework_id))
+        if behind is not None:
+            numbers[index] = last_lesson[1]
+            backlogs[index] = behind
+
+    inverse = inverse.reshape(-1)
+    return {
+        'id': np.array(ids, dtype=np.int64),
+        'first_lesson_date': np.array(start_dates, dtype='datetime64[D]'),
+        'lesson': numbers[inverse],
+        'backlog': backlogs[inverse],
+    }
+
+
+def forecast(roster, today=None):
+    """
+    Прогноз по столбцам ростера. Возвращает словарь массивов:
+    pace (уроков в неделю), backlog, backlog_percentile, finish_date
+    (NaT, если темп нулевой) и at_risk.
+
+    До окончания программы ученику нужно пройти оставшиеся уроки и сдать
+    накопившиеся ДЗ, поэтому к оставшимся урокам добавляется отставание.
+    """
+    # Сегодня по TIME_ZONE проекта, а не по часовому поясу сервера
+    today = np.datetime64(today or timezone.localdate(), 'D')
+    count = len(roster['id'])
+
+    days = (today - roster['first_lesson_date']).astype(np.int64)
+    days = np.maximum(days, 1)
+    done = roster['lesson']
+    backlog = roster['backlog']
+
+    pace_per_day = done / days
+    remaining = np.clip(CURRICULUM_LESSONS - done, 0, None) + np.clip(backlog, 0, None)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        days_left = np.ceil(remaining / pace_per_day)
+    finished = remaining == 0
+    days_left = np.where(finished, 0, days_left)
+    known = np.isfinite(days_left)
+
+    finish_date = np.full(count, np.datetime64('NaT'), dtype='datetime64[D]')
+    finish_date[known] = today + days_left[known].astype(np.int64)
+
+    if count:
+        sorted_backlog = np.sort(backlog)
+        backlog_percentile = (
+            np.searchsorted(sorted_backlog, backlog, side='right') / count * 100
+        )
+        median_pace = np.median(pace_per_day)
+    else:
+        backlog_percentile = np.zeros(0)
+        median_pace = 0
+
+    slow = ~known | (pace_per_day < median_pace * SLOW_PACE_RATIO)
+    at_risk = ~finished & (
+        slow
+        | (backlog >= AT_RISK_BACKLOG)
+        | ((backlog_percentile >= AT_RISK_PERCENTILE) & (backlog > 0))
+    )
+
+    return {
+        'id': roster['id'],
+        'lesson': done,
+        'pace': pace_per_day * 7,
+        'backlog': backlog,
+        'backlog_percentile': backlog_percentile,
+        'finish_date': finish_date,
+        'at_risk': at_risk,
+    }
+
+
+def forecast_summary(result):
+    """Сводка по прогнозу для дашборда и консоли"""
+    count = len(result['id'])
+    known = ~np.isnat(result['finish_date'])
+    return {
+        'students': count,
+        'at_risk': int(result['at_risk'].sum()),
+        'median_pace': float(np.median(result['pace'])) if count else None,
+        'median_backlog': float(np.median(result['backlog'])) if count else None,
+        'last_finish_date': (
+            result['finish_date'][known].max().item() if known.any() else None
+        ),
+    }
+
+
+def at_risk_rows(result, limit=None):
+    """Ученики группы риска, самые отстающие первыми"""
+    indexes = np.flatnonzero(result['at_risk'])
+    indexes = indexes[np.argsort(-result['backlog'][indexes], kind='stable')]
+    if limit is not None:
+        indexes = indexes[:limit]
+
+    return [
+        {
+            'id': int(result['id'][i]),
+            'lesson': int(result['lesson'][i]),
+            'pace': round(float(result['pace'][i]), 2),
+            'backlog': int(result['backlog'][i]),
+            'backlog_percentile': round(float(result['backlog_percentile'][i]), 1),
+            'finish_date': (
+                None if np.isnat(result['finish_date'][i])
+                else result['finish_date'][i].item()
+            ),
+        }
+        for i in indexes
+    ]
+
+
+def get_cached_forecast(limit=200):
+    """Сводка и список группы риска для админки, хранятся в кэше"""
+    data = cache.get(FORECAST_CACHE_KEY)
+    if data is None:
+        with use_replica_unless_written():
+            result = forecast(load_roster())
+            rows = at_risk_rows(result, limit)
+            names = {
+                pk: f'{last_name} {first_name}'
+                for pk, last_name, first_name in Student.objects.filter(
+                    pk__in=[row['id'] for row in rows]
+                ).values_list('pk', 'last_name', 'first_name')
+            }
+            for row in rows:
+                row['name'] = names.get(row['id'], '')
+            data = {
+                'summary': forecast_summary(result),
+                'at_risk': rows,
+            }
+        cache.set(FORECAST_CACHE_KEY, data, FORECAST_CACHE_TIMEOUT)
+    return data
@@ -1,5 +1,25 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate, pre_migrate
+
+
+def install_search_index(sender, using='default', **kwargs):
+    from .search import install_search_index
+    install_search_index(using)
+
+
+def uninstall_search_triggers(sender, using='default', **kwargs):
+    from .search import uninstall_search_triggers
+    uninstall_search_triggers(using)
 
 
 class TrackerConfig(AppConfig):
     name = 'tracker'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .db import apply_sqlite_pragmas
+        
+        connection_created.connect(apply_sqlite_pragmas)
+        pre_migrate.connect(uninstall_search_triggers, sender=self)
+        post_migrate.connect(install_search_index, sender=self)
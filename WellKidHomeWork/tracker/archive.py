@@ -0,0 +1,137 @@
+"""
+Архив давно неактивных учеников.
+
+archive_students() переносит учеников вместе с прохождениями и отчётами в
+таблицы ArchivedStudent / ArchivedLessonProgress порциями по chunk_size,
+каждая порция — одна транзакция с bulk_create и удалением из живых таблиц.
+restore_students() делает обратное. id учеников и прохождений сохраняются,
+поэтому отметки отчётов (last_progress_id) и ссылки на учеников остаются
+верными после восстановления.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .bulk import invalidate_progress_caches
+from .live import publish_resync
+from .models import (
+    ArchivedLessonProgress, ArchivedStudent, AutomatedReport, Student,
+    StudentLessonProgress, StudyGroup,
+)
+
+
+ARCHIVE_CHUNK_SIZE = 500
+
+STUDENT_FIELDS = [
+    'id', 'first_name', 'last_name', 'email', 'format', 'group_id',
+    'first_lesson_date', 'last_lesson_id', 'last_homework_lesson_id',
+    'progress_version', 'reported_version', 'updated_at',
+]
+PROGRESS_FIELDS = ['id', 'student_id', 'lesson_id', 'date_completed', 'homework_completed']
+
+
+def archivable_students(months):
+    """Неактивные ученики, которые не менялись больше months месяцев"""
+    cutoff = timezone.now() - timedelta(days=30 * months)
+    return Student.objects.filter(is_active=False, updated_at__lt=cutoff)
+
+
+def _chunks(ids, chunk_size):
+    for start in range(0, len(ids), chunk_size):
+        yield ids[start:start + chunk_size]
+
+
+def _invalidate_caches():
+    StudyGroup.invalidate_caches()
+    invalidate_progress_caches()
+
+
+def archive_students(queryset, chunk_size=ARCHIVE_CHUNK_SIZE):
+    """Переносит неактивных учеников queryset в архив, возвращает их число"""
+    ids = list(queryset.filter(is_active=False).order_by('pk').values_list('pk', flat=True))
+    archived = 0
+    for chunk in _chunks(ids, chunk_size):
+        with transaction.atomic():
+            archived += _archive_chunk(chunk)
+            publish_resync()
+    if archived:
+        _invalidate_caches()
+    return archived
+
+
+def _archive_chunk(ids):
+    # Повторная проверка внутри транзакции: ученика могли успеть вернуть
+    students = list(Student.objects.filter(pk__in=ids, is_active=False).values(*STUDENT_FIELDS))
+    ids = [student['id'] for student in students]
+
+    reports = defaultdict(list)
+    for report in AutomatedReport.objects.filter(student_id__in=ids).order_by('pk').values():
+        reports[report.pop('student_id')].append(report)
+
+    ArchivedStudent.objects.bulk_create([
+        ArchivedStudent(**student, reports=reports[student['id']])
+        for student in students
+    ])
+    progress = StudentLessonProgress.objects.filter(student_id__in=ids)
+    ArchivedLessonProgress.objects.bulk_create([
+        ArchivedLessonProgress(**row)
+        for row in progress.order_by().values(*PROGRESS_FIELDS).iterator()
+    ])
+
+    # Прохождения удаляются одним DELETE: сигнал пересчёта прогресса на
+    # каждую строку не нужен, ученик удаляется следом
+    progress._raw_delete(progress.db)
+    Student.objects.filter(pk__in=ids).delete()
+    return len(students)
+
+
+def restore_students(queryset, activate=False, chunk_size=ARCHIVE_CHUNK_SIZE):
+    """Возвращает учеников из архива (queryset ArchivedStudent), возвращает их число"""
+    ids = list(queryset.order_by('pk').values_list('pk', flat=True))
+    restored = 0
+    for chunk in _chunks(ids, chunk_size):
+        with transaction.atomic():
+            restored += _restore_chunk(chunk, activate)
+            publish_resync()
+    if restored:
+        _invalidate_caches()
+    return restored
+
+
+def _restore_chunk(ids, activate):
+    archived = list(ArchivedStudent.objects.filter(pk__in=ids))
+    ids = [student.pk for student in archived]
+
+    Student.objects.bulk_create([
+        Student(
+            **{field: getattr(student, field) for field in STUDENT_FIELDS},
+            is_active=activate,
+        )
+        for student in archived
+    ])
+    StudentLessonProgress.objects.bulk_create([
+        StudentLessonProgress(**row)
+        for row in ArchivedLessonProgress.objects.filter(student_id__in=ids)
+        .order_by().values(*PROGRESS_FIELDS).iterator()
+    ])
+    reports = [
+        AutomatedReport(student_id=student.pk, **report)
+        for student in archived
+        for report in student.reports
+    ]
+    created_at = [report.created_at for report in reports]
+    AutomatedReport.objects.bulk_create(reports)
+    # auto_now_add при bulk_create ставит текущее время, а отчёт должен
+    # сохранить дату создания: она возвращается вторым запросом
+    created_at_field = AutomatedReport._meta.get_field('created_at')
+    restored_reports = []
+    for report, value in zip(reports, created_at):
+        if value:
+            report.created_at = created_at_field.to_python(value)
+            restored_reports.append(report)
+    AutomatedReport.objects.bulk_update(restored_reports, ['created_at'])
+
+    ArchivedStudent.objects.filter(pk__in=ids).delete()
+    return len(archived)
@@ -0,0 +1,149 @@
+"""
+Массовое продвижение и сохранение учеников.
+
+Следующий урок вычисляется по порядковому номеру из Lesson.get_map(), и
+всё изменение выполняется одним UPDATE с CASE по текущему уроку, сколько бы
+учеников ни было выбрано. В том же UPDATE увеличивается progress_version
+(снимки в кэше становятся неактуальными сами), а кэши дашбордов
+сбрасываются и живой дашборд получает свежие счётчики один раз на всю
+операцию.
+
+save_students() — то же для правок из list_editable в админке: все
+изменённые строки пишутся одним bulk_update.
+"""
+from django.core.cache import cache
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.utils import timezone
+
+from .analytics import FORECAST_CACHE_KEY
+from .live import publish_progress_change, publish_resync
+from .models import GROUP_DASHBOARD_CACHE_KEY, Lesson, Student, StudyGroup
+from .routers import note_write
+
+
+LAST_LESSON = 'last_lesson'
+LAST_HOMEWORK_LESSON = 'last_homework_lesson'
+
+
+def _next_lesson_case(field):
+    """CASE: id текущего урока -> id следующего, без урока -> первый урок"""
+    lesson_map = Lesson.get_map()
+    ids_by_number = {number: pk for pk, (code, number) in lesson_map.items()}
+
+    whens = [
+        When(**{f'{field}_id': pk}, then=Value(ids_by_number[number + 1]))
+        for pk, (code, number) in lesson_map.items()
+        if number + 1 in ids_by_number
+    ]
+    if ids_by_number:
+        whens.append(When(**{f'{field}__isnull': True}, then=Value(ids_by_number[min(ids_by_number)])))
+    # Последний урок программы остаётся как есть
+    return Case(*whens, default=F(f'{field}_id'), output_field=IntegerField())
+
+
+def invalidate_progress_caches():
+    """Сбрасывает кэши, зависящие от уроков учеников"""
+    cache.delete_many([GROUP_DASHBOARD_CACHE_KEY, FORECAST_CACHE_KEY])
+    note_write()
+
+
+def _update_progress(queryset, **values):
+    updated = queryset.update(
+        **values,
+        progress_version=F('progress_version') + 1,
+        updated_at=timezone.now(),
+    )
+    if updated:
+        invalidate_progress_caches()
+        publish_resync()
+    return updated
+
+
+def advance_students(queryset, field=LAST_LESSON):
+    """
+    Переводит учеников на следующий урок (field=LAST_LESSON) или засчитывает
+    ДЗ следующего урока (field=LAST_HOMEWORK_LESSON). ДЗ не продвигается
+    дальше последнего пройденного урока. Возвращает число изменённых учеников.
+    """
+    if field == LAST_HOMEWORK_LESSON:
+        queryset = queryset.filter(last_lesson__isnull=False).alias(
+            lesson_number=Lesson.number_expression(LAST_LESSON),
+            homework_number=Lesson.number_expression(LAST_HOMEWORK_LESSON),
+        ).filter(Q(homework_number__isnull=True) | Q(homework_number__lt=F('lesson_number')))
+    else:
+        # Ученики на последнем уроке программы не меняются. Условие записано
+        # через isnull явно: exclude(lesson_number__gte=...) для аннотации
+        # даёт NOT (x >= y) и отбрасывает учеников без урока (NULL)
+        last_number = max((number for code, number in Lesson.get_map().values()), default=0)
+        queryset = queryset.alias(
+            lesson_number=Lesson.number_expression(LAST_LESSON),
+        ).filter(Q(lesson_number__isnull=True) | Q(lesson_number__lt=last_number))
+    return _update_progress(queryset, **{field: _next_lesson_case(field)})
+
+
+def mark_homework_done(queryset):
+    """Засчитывает ДЗ по последнему пройденному уроку"""
+    return _update_progress(
+        queryset.filter(last_lesson__isnull=False).exclude(
+            last_homework_lesson=F('last_lesson')
+        ),
+        last_homework_lesson=F('last_lesson'),
+    )
+
+
+def advance_groups(groups, field=LAST_LESSON):
+    """
+    Продвигает активных учеников групп. При переходе на следующий урок текущий
+    урок групп тоже сдвигается одним UPDATE.
+    """
+    updated = advance_students(Student.active.filter(group__in=groups), field)
+    if field == LAST_LESSON:
+        groups.update(current_lesson=_next_lesson_case('current_lesson'))
+    return updated
+
+
+def save_students(students, fields):
+    """
+    Сохраняет изменённых учеников одним bulk_update (по полям fields) с той
+    же логикой, что и Student.save(): очистка группы у индивидуального
+    формата, увеличение progress_version при смене уроков, события живого
+    дашборда. Кэши сбрасываются один раз на всю партию.
+    """
+    fields = set(fields)
+    if fields & {'format', 'group'}:
+        fields.add('group')
+
+    now = timezone.now()
+    progress_changes = []
+    group_changed = False
+    for student in students:
+        if student.format == Student.INDIVIDUAL:
+            student.group = None
+        group_changed = group_changed or student._changed('group_id')
+        if any(student._changed(field) for field in Student.PROGRESS_FIELDS):
+            progress_changes.append((
+                student.pk,
+                tuple(student._loaded_values[field] for field in Student.PROGRESS_FIELDS),
+                tuple(getattr(student, field) for field in Student.PROGRESS_FIELDS),
+            ))
+            student.progress_version = F('progress_version') + 1
+        else:
+            student.progress_version = F('progress_version')
+        student.updated_at = now
+
+    Student.objects.bulk_update(students, [*sorted(fields), 'progress_version', 'updated_at'])
+
+    for change in progress_changes:
+        publish_progress_change(*change)
+    if progress_changes:
+        invalidate_progress_caches()
+    if group_changed:
+        StudyGroup.invalidate_caches()
+
+    for student in students:
+        # Значения F() не годятся для дальнейшей работы с объектом
+        del student.progress_version
+        student._loaded_values = {
+            field: getattr(student, field)
+            for field in Student.TRACKED_FIELDS
+        }
@@ -0,0 +1,120 @@
+"""
+Программа курса из декларативного файла (по умолчанию tracker/curriculum.json).
+
+Файл описывает модули: номер, название, число уроков и, при желании, темы
+уроков (без тем урок получает название модуля):
+
+    {"modules": [
+        {"module": 1, "title": "Основы программирования", "lessons": 4,
+         "topics": ["Переменные", "Условия", "Циклы", "Функции"]}
+    ]}
+
+apply_curriculum() сравнивает файл с таблицей уроков одним запросом и
+записывает только новые и изменившиеся уроки одним bulk_create с
+update_conflicts по (module, lesson) в одной транзакции, поэтому повторный
+запуск при деплое ничего не меняет. Уроки, которых нет в файле, не удаляются:
+на них ссылаются ученики и прохождения, о них только сообщается.
+"""
+import json
+from pathlib import Path
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import LESSON_MAP_CACHE_KEY, Lesson
+
+
+CURRICULUM_PATH = Path(__file__).resolve().parent / 'curriculum.json'
+
+# Порядковый номер урока считается как (модуль - 1) * 4 + урок (см. Lesson.number)
+LESSONS_PER_MODULE = 4
+
+TOPIC_MAX_LENGTH = Lesson._meta.get_field('topic').max_length
+
+
+class CurriculumError(ValueError):
+    """Ошибка в файле программы"""
+
+
+def read_curriculum(path=CURRICULUM_PATH):
+    """Уроки из файла: {(модуль, урок): тема}"""
+    try:
+        with open(path, encoding='utf-8') as curriculum_file:
+            data = json.load(curriculum_file)
+    except (OSError, json.JSONDecodeError) as error:
+        raise CurriculumError(f'Не удалось прочитать {path}: {error}')
+
+    modules = data.get('modules', []) if isinstance(data, dict) else None
+    if not isinstance(modules, list):
+        raise CurriculumError(f'{path}: ожидается объект со списком "modules"')
+
+    lessons = {}
+    for entry in modules:
+        if not isinstance(entry, dict):
+            raise CurriculumError(f'Модуль должен быть объектом: {entry!r}')
+        module = entry.get('module')
+        if not isinstance(module, int) or module < 1:
+            raise CurriculumError(f'Неверный номер модуля: {module!r}')
+        topics = entry.get('topics') or []
+        if not isinstance(topics, list) or not all(isinstance(topic, str) for topic in topics):
+            raise CurriculumError(f'Модуль {module}: темы должны быть списком строк')
+        count = entry.get('lessons', len(topics))
+        if not isinstance(count, int) or not 1 <= count <= LESSONS_PER_MODULE:
+            raise CurriculumError(
+                f'Модуль {module}: число уроков должно быть от 1 до {LESSONS_PER_MODULE}'
+            )
+        if len(topics) > count:
+            raise CurriculumError(f'Модуль {module}: тем больше, чем уроков')
+
+        title = entry.get('title', '')
+        if not isinstance(title, str):
+            raise CurriculumError(f'Модуль {module}: название должно быть строкой')
+        for number in range(1, count + 1):
+            if (module, number) in lessons:
+                raise CurriculumError(f'Модуль {module} описан дважды')
+            topic = topics[number - 1] if number <= len(topics) else title
+            if len(topic) > TOPIC_MAX_LENGTH:
+                raise CurriculumError(f'М{module}У{number}: тема длиннее {TOPIC_MAX_LENGTH} символов')
+            lessons[module, number] = topic
+
+    if not lessons:
+        raise CurriculumError(f'В {path} нет ни одного урока')
+    return lessons
+
+
+def apply_curriculum(lessons, dry_run=False):
+    """
+    Приводит таблицу уроков к lessons ({(модуль, урок): тема}).
+    Возвращает отличия: {'created': [...], 'updated': [...], 'unchanged': n,
+    'missing': [...]}, где уроки — пары (модуль, урок).
+    """
+    diff = {'created': [], 'updated': [], 'unchanged': 0, 'missing': []}
+    with transaction.atomic():
+        existing = {
+            (module, number): topic
+            for module, number, topic in Lesson.objects.values_list('module', 'lesson', 'topic')
+        }
+
+        changed = []
+        for key, topic in sorted(lessons.items()):
+            if key not in existing:
+                diff['created'].append(key)
+            elif existing[key] != topic:
+                diff['updated'].append(key)
+            else:
+                diff['unchanged'] += 1
+                continue
+            changed.append(Lesson(module=key[0], lesson=key[1], topic=topic))
+        diff['missing'] = sorted(existing.keys() - lessons.keys())
+
+        if changed and not dry_run:
+            Lesson.objects.bulk_create(
+                changed,
+                update_conflicts=True,
+                unique_fields=['module', 'lesson'],
+                update_fields=['topic'],
+            )
+
+    if diff['created'] and not dry_run:
+        cache.delete(LESSON_MAP_CACHE_KEY)
+    return diff
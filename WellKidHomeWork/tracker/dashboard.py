@@ -0,0 +1,115 @@
+"""
+Сводная статистика по группам для дашборда преподавателя.
+
+Вся статистика считается одним GROUP BY по (группа, номер урока, номер урока
+с ДЗ): таких сочетаний немного, поэтому медиана, распределение по урокам и
+светофор досчитываются в Python без запросов на каждую группу или ученика.
+"""
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.db.models.functions import Coalesce
+
+from .models import GROUP_DASHBOARD_CACHE_KEY, Lesson, Student
+from .routers import use_replica, use_replica_unless_written
+
+
+GROUP_DASHBOARD_TIMEOUT = 60
+
+
+def _weighted_median(counts):
+    """Медиана по словарю {значение: количество}"""
+    total = sum(counts.values())
+    if not total:
+        return None
+
+    def nth(index):
+        seen = 0
+        for value in sorted(counts):
+            seen += counts[value]
+            if seen > index:
+                return value
+
+    if total % 2:
+        return nth(total // 2)
+    return (nth(total // 2 - 1) + nth(total // 2)) / 2
+
+
+def _build_group_stats():
+    rows = (
+        Student.active.filter(group__isnull=False)
+        .order_by()
+        .annotate(
+            lesson_number=Lesson.number_expression('last_lesson'),
+            homework_number=Coalesce(Lesson.number_expression('last_homework_lesson'), 0),
+        )
+        .values('group_id', 'group__number', 'lesson_number', 'homework_number')
+        .annotate(students=Count('pk'))
+    )
+
+    groups = {}
+    for row in rows:
+        group = groups.setdefault(row['group_id'], {
+            'id': row['group_id'],
+            'number': row['group__number'],
+            'size': 0,
+            'no_data': 0,
+            'backlogs': {},
+            'lessons': {},
+            Student.GREEN: 0,
+            Student.YELLOW: 0,
+            Student.RED: 0,
+        })
+        count = row['students']
+        group['size'] += count
+
+        # Ученики без последнего урока в статистику отставания не попадают
+        if row['lesson_number'] is None:
+            group['no_data'] += count
+            continue
+
+        behind = row['lesson_number'] - row['homework_number']
+        group['backlogs'][behind] = group['backlogs'].get(behind, 0) + count
+        group['lessons'][row['lesson_number']] = (
+            group['lessons'].get(row['lesson_number'], 0) + count
+        )
+        group[Student.backlog_level(behind)] += count
+
+    stats = []
+    for group in sorted(groups.values(), key=lambda group: group['number']):
+        backlogs = group.pop('backlogs')
+        group['median_backlog'] = _weighted_median(backlogs)
+        group['max_backlog'] = max(backlogs) if backlogs else None
+        group['lessons'] = [
+            (Lesson.code_for_number(number), count)
+            for number, count in sorted(group['lessons'].items())
+        ]
+        stats.append(group)
+    return stats
+
+
+def get_group_stats():
+    """Статистика по всем группам (из кэша, если она ещё актуальна)"""
+    stats = cache.get(GROUP_DASHBOARD_CACHE_KEY)
+    if stats is None:
+        with use_replica_unless_written():
+            stats = _build_group_stats()
+        cache.set(GROUP_DASHBOARD_CACHE_KEY, stats, GROUP_DASHBOARD_TIMEOUT)
+    return stats
+
+
+@use_replica()
+def get_traffic_light_counts():
+    """Количество учеников на каждом уровне светофора одним запросом"""
+    behind = (
+        Lesson.number_expression('last_lesson')
+        - Coalesce(Lesson.number_expression('last_homework_lesson'), 0)
+    )
+    return (
+        Student.active.filter(last_lesson__isnull=False)
+        .annotate(behind=behind)
+        .aggregate(**{
+            Student.GREEN: Count('pk', filter=Q(behind__lte=0)),
+            Student.YELLOW: Count('pk', filter=Q(behind__gt=0, behind__lte=2)),
+            Student.RED: Count('pk', filter=Q(behind__gt=2)),
+        })
+    )
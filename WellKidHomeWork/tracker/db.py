@@ -0,0 +1,55 @@
+"""
+Настройка SQLite под конкурентную нагрузку.
+
+apply_sqlite_pragmas выполняет settings.SQLITE_PRAGMAS на каждом новом
+соединении SQLite (прагмы действуют в пределах соединения, а journal_mode=WAL
+сохраняется в самом файле базы). retry_on_locked повторяет запись, если
+база всё-таки оказалась заблокирована дольше busy_timeout.
+"""
+import random
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+
+
+LOCKED_RETRY_ATTEMPTS = 5
+LOCKED_RETRY_DELAY = 0.05
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', None)
+    if not pragmas or connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def is_locked_error(error):
+    return isinstance(error, OperationalError) and 'locked' in str(error)
+
+
+def retry_on_locked(attempts=LOCKED_RETRY_ATTEMPTS, delay=LOCKED_RETRY_DELAY, using=DEFAULT_DB_ALIAS):
+    """
+    Повторяет функцию при «database is locked» с экспоненциальной паузой.
+    Внутри внешней транзакции не повторяет: откатывать и повторять её целиком
+    должен тот, кто её открыл.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            for attempt in range(attempts):
+                try:
+                    return func(*args, **kwargs)
+                except OperationalError as error:
+                    if (
+                        not is_locked_error(error)
+                        or attempt == attempts - 1
+                        or connections[using].in_atomic_block
+                    ):
+                        raise
+                    time.sleep(delay * 2 ** attempt * (1 + random.random()))
+        return wrapper
+    return decorator
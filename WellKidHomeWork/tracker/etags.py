@@ -0,0 +1,55 @@
+"""
+Условные GET для страниц админки.
+
+ETag считается по всему, что выводит страница: её выборкам, полям объекта,
+справочникам уроков и групп (подписи списков выбора) и пользователю —
+от его прав зависят меню и доступность полей. Если ETag совпал
+с If-None-Match, отдаётся 304 без рендеринга шаблона.
+
+Страницы видит только персонал, поэтому ответ хранит лишь браузер и каждый
+раз перепроверяет его: Cache-Control: private, no-cache. URL таких страниц
+регистрируются через admin_view(..., cacheable=True), иначе never_cache
+запретит браузеру хранить ответ.
+"""
+import hashlib
+
+from django.contrib import messages
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+
+from .models import Lesson, StudyGroup
+
+
+def catalog_signature():
+    """Справочники, из которых строятся подписи уроков и групп в формах"""
+    return (
+        list(Lesson.objects.order_by('pk').values_list('pk', 'module', 'lesson')),
+        list(StudyGroup.objects.order_by('pk').values_list('pk', 'number')),
+    )
+
+
+def user_signature(user):
+    """Пользователь и его права: новый вход меняет last_login и CSRF-токен"""
+    return user.pk, user.last_login, user.is_superuser, sorted(user.get_all_permissions())
+
+
+def page_etag(request, *parts):
+    """ETag по данным страницы и пользователю запроса"""
+    data = repr((user_signature(request.user), parts)).encode()
+    return quote_etag(hashlib.md5(data, usedforsecurity=False).hexdigest())
+
+
+def conditional_response(request, etag, render):
+    """
+    304, если у браузера та же версия страницы, иначе render().
+    Страница с непоказанными сообщениями всегда рендерится заново,
+    чтобы сообщения не остались висеть до следующей страницы.
+    """
+    response = None
+    if request.method in ('GET', 'HEAD') and not messages.get_messages(request):
+        response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = render()
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -0,0 +1,114 @@
+"""
+Потоковая выгрузка списка учеников в CSV и XLSX.
+
+Строки читаются из базы порциями через QuerySet.iterator(), коды уроков
+берутся из закэшированного словаря Lesson.get_map(), поэтому память воркера
+не зависит от количества учеников.
+"""
+import csv
+
+from .models import Lesson, Student
+from .routers import replica_iterator
+
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_HEADERS = [
+    'ID',
+    'Фамилия',
+    'Имя',
+    'Email',
+    'Формат обучения',
+    'Номер группы',
+    'Дата первого урока',
+    'Последний урок',
+    'Последний урок с ДЗ',
+    'Отставание',
+]
+
+EXPORT_FIELDS = [
+    'pk',
+    'last_name',
+    'first_name',
+    'email',
+    'format',
+    'group__number',
+    'first_lesson_date',
+    'last_lesson_id',
+    'last_homework_lesson_id',
+]
+
+
+class Echo:
+    """Псевдо-файл для csv.writer: возвращает строку вместо записи"""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Генератор строк выгрузки (без заголовка)"""
+    lesson_map = Lesson.get_map()
+    format_labels = dict(Student.FORMAT_CHOICES)
+
+    rows = queryset.values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+    for (pk, last_name, first_name, email, study_format, group_number,
+         first_lesson_date, last_lesson_id, last_homework_lesson_id) in rows:
+        last_lesson = lesson_map.get(last_lesson_id)
+        last_homework = lesson_map.get(last_homework_lesson_id)
+        behind = Lesson.lessons_behind(last_lesson, last_homework)
+
+        yield [
+            pk,
+            last_name,
+            first_name,
+            email,
+            format_labels.get(study_format, study_format),
+            group_number or '',
+            first_lesson_date,
+            last_lesson[0] if last_lesson else '',
+            last_homework[0] if last_homework else '',
+            behind if behind is not None else '',
+        ]
+
+
+def stream_csv(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Построчно отдаёт CSV для StreamingHttpResponse"""
+    writer = csv.writer(Echo())
+    # BOM, чтобы Excel правильно открыл кириллицу
+    yield '\ufeff' + writer.writerow(EXPORT_HEADERS)
+    for row in replica_iterator(export_rows(queryset, chunk_size)):
+        yield writer.writerow(row)
+
+
+def write_csv(queryset, fileobj, chunk_size=EXPORT_CHUNK_SIZE):
+    """Записывает CSV в открытый текстовый файл, возвращает число строк"""
+    count = 0
+    for line in stream_csv(queryset, chunk_size):
+        fileobj.write(line)
+        count += 1
+    return count - 1
+
+
+def write_xlsx(queryset, fileobj, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Записывает XLSX в файл (путь или бинарный файловый объект).
+    Используется режим constant_memory: строки сбрасываются на диск сразу
+    после записи. Требует установленного пакета xlsxwriter.
+    """
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(fileobj, {
+        'constant_memory': True,
+        'default_date_format': 'dd.mm.yyyy',
+    })
+    worksheet = workbook.add_worksheet('Ученики')
+    bold = workbook.add_format({'bold': True})
+
+    worksheet.write_row(0, 0, EXPORT_HEADERS, bold)
+    count = 0
+    for count, row in enumerate(replica_iterator(export_rows(queryset, chunk_size)), start=1):
+        worksheet.write_row(count, 0, row)
+
+    workbook.close()
+    return count
@@ -0,0 +1,185 @@
+"""
+Фоновые задачи без внешнего брокера: очередь — таблица Job.
+
+enqueue() ставит задачу в очередь, воркер (manage.py run_worker) забирает
+её через claim_job() условным UPDATE ... WHERE status = 'pending' и
+выполняет run_job() в пуле потоков или процессов. Пока задачи выполняются,
+воркер периодически отмечает их heartbeat() и возвращает в очередь задачи
+упавших воркеров (requeue_stale), у которых сигнала давно нет. Обработчики
+регистрируются декоратором @register и получают задачу и её параметры,
+а возвращают результат, который можно сохранить в JSON.
+"""
+import os
+import tempfile
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .db import retry_on_locked
+from .export import EXPORT_CHUNK_SIZE, stream_csv, write_xlsx
+from .models import Job, Student
+from .reports import PERIOD_DAYS, generate_reports, pending_students, write_report_files
+from .search import install_search_index
+
+
+JOB_HANDLERS = {}
+
+
+def get_output_dir():
+    """Каталог для файлов, которые создают задачи (TRACKER_JOB_OUTPUT_DIR)"""
+    path = getattr(
+        settings,
+        'TRACKER_JOB_OUTPUT_DIR',
+        os.path.join(tempfile.gettempdir(), 'wellkid-jobs'),
+    )
+    os.makedirs(path, exist_ok=True)
+    return str(path)
+
+
+def register(kind):
+    def decorator(handler):
+        JOB_HANDLERS[kind] = handler
+        return handler
+    return decorator
+
+
+def enqueue(kind, **params):
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f'Неизвестная задача: {kind}')
+    return Job.objects.create(kind=kind, params=params)
+
+
+@retry_on_locked()
+def claim_job(worker):
+    """
+    Забирает самую старую задачу из очереди и возвращает её id (или None).
+    Если задачу первым забрал другой воркер, UPDATE не изменит ни одной
+    строки и берётся следующая.
+    """
+    while True:
+        pk = (
+            Job.objects.filter(status=Job.PENDING)
+            .order_by('pk')
+            .values_list('pk', flat=True)
+            .first()
+        )
+        if pk is None:
+            return None
+        now = timezone.now()
+        claimed = Job.objects.filter(pk=pk, status=Job.PENDING).update(
+            status=Job.RUNNING,
+            worker=worker,
+            started_at=now,
+            heartbeat_at=now,
+        )
+        if claimed:
+            return pk
+
+
+@retry_on_locked()
+def heartbeat(worker, job_ids):
+    """Отмечает, что задачи job_ids ещё выполняются воркером worker"""
+    return Job.objects.filter(pk__in=list(job_ids), status=Job.RUNNING, worker=worker).update(
+        heartbeat_at=timezone.now(),
+    )
+
+
+@retry_on_locked()
+def requeue_stale(timeout):
+    """
+    Возвращает в очередь задачи, от воркера которых не было сигнала дольше
+    timeout (воркер упал). Долгая задача живого воркера не возвращается:
+    её сигнал обновляется, сколько бы она ни шла.
+    """
+    return Job.objects.filter(
+        status=Job.RUNNING,
+        heartbeat_at__lt=timezone.now() - timeout,
+    ).update(status=Job.PENDING, worker='', started_at=None, heartbeat_at=None, progress=0)
+
+
+def run_job(job_id):
+    """Выполняет задачу в потоке или процессе пула воркера"""
+    try:
+        job = Job.objects.get(pk=job_id)
+        try:
+            result = JOB_HANDLERS[job.kind](job, **job.params)
+        except Exception:
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.FAILED,
+                error=traceback.format_exc(),
+                finished_at=timezone.now(),
+            )
+            return Job.FAILED
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.DONE,
+            progress=100,
+            result=result,
+            finished_at=timezone.now(),
+        )
+        return Job.DONE
+    finally:
+        close_old_connections()
+
+
+def _students(student_ids):
+    # Без явного списка — только активные ученики
+    if student_ids is None:
+        return Student.active.all()
+    return Student.objects.filter(pk__in=student_ids)
+
+
+def _period(period):
+    end_date = timezone.now().date()
+    return end_date - timedelta(days=PERIOD_DAYS[period]), end_date
+
+
+def _chunk_progress(job, total):
+    """Колбэк порций: число обработанных из total в прогресс задачи"""
+    return lambda done: job.set_progress(done * 100 / (total or 1))
+
+
+@register('generate_reports')
+def generate_reports_job(job, student_ids=None, period='month'):
+    start_date, end_date = _period(period)
+    students = _students(student_ids)
+    # Ожидающие отчёта ученики читаются по частичному индексу, COUNT дешёвый
+    progress = _chunk_progress(job, pending_students(students).count())
+    return {'created': len(generate_reports(students, start_date, end_date, progress=progress))}
+
+
+@register('report_output')
+def report_output_job(job, student_ids=None, period='month'):
+    start_date, end_date = _period(period)
+    students = _students(student_ids)
+    path = os.path.join(get_output_dir(), f'report-{job.pk}')
+    paths, count = write_report_files(
+        students, path, start_date, end_date, progress=_chunk_progress(job, students.count()),
+    )
+    return {'files': paths, 'rows': count}
+
+
+@register('export_students')
+def export_students_job(job, student_ids=None, file_format='csv'):
+    queryset = _students(student_ids).order_by('last_name', 'first_name')
+    path = os.path.join(get_output_dir(), f'students-{job.pk}.{file_format}')
+
+    if file_format == 'xlsx':
+        count = write_xlsx(queryset, path)
+    else:
+        total = queryset.count() or 1
+        count = 0
+        with open(path, 'w', encoding='utf-8', newline='') as output:
+            for count, line in enumerate(stream_csv(queryset)):
+                output.write(line)
+                if count and count % EXPORT_CHUNK_SIZE == 0:
+                    job.set_progress(count * 100 / total)
+    return {'file': path, 'rows': count}
+
+
+@register('rebuild_search_index')
+def rebuild_search_index_job(job):
+    install_search_index('default')
+    return {}
@@ -0,0 +1,167 @@
+"""
+Живой дашборд: поток server-sent events через ASGI.
+
+Сигналы прогресса публикуют изменения во внутрипроцессный брокер, а каждое
+открытое соединение получает их из своей asyncio-очереди. Пока изменений
+нет, соединение простаивает и не делает запросов к базе: при подключении
+один раз отдаются текущие счётчики светофора, дальше только дельты.
+Массовые изменения (tracker/bulk.py, синхронизация списка, архив) дельт по
+каждому ученику не считают: после фиксации каждой порции подписчики получают
+свежие счётчики (publish_resync). Если клиент не успевает читать и очередь переполнилась, накопленные события
+выбрасываются и поток отдаёт счётчики заново, чтобы дельты не потерялись
+молча.
+
+Брокер живёт в памяти процесса, поэтому события доходят до соединений того
+же воркера. Поток нужно отдавать через ASGI (WellKidHomeWork/asgi.py).
+"""
+import asyncio
+import json
+import threading
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.http import HttpResponseForbidden, StreamingHttpResponse
+
+
+KEEPALIVE_INTERVAL = 15
+
+# Медленный клиент не должен копить события бесконечно
+QUEUE_SIZE = 100
+
+# Метка в очереди подписчика: события пропущены, нужны свежие счётчики
+RESYNC = object()
+
+
+def format_event(event, data):
+    return f'event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n'
+
+
+class Broker:
+    """Публикация событий из синхронного кода в asyncio-очереди подписчиков"""
+
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    @property
+    def has_subscribers(self):
+        return bool(self._subscribers)
+
+    def subscribe(self):
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(QUEUE_SIZE))
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event, data):
+        self._send(format_event(event, data))
+
+    def resync(self):
+        """Подписчики заново получат текущие счётчики"""
+        self._send(RESYNC)
+
+    def _send(self, message):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(self._put, queue, message)
+
+    @staticmethod
+    def _put(queue, message):
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Без выброшенного события дельты на клиенте разойдутся с базой,
+            # поэтому очередь очищается и вместо неё клиент получит счётчики
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(RESYNC)
+
+
+broker = Broker()
+
+
+def publish_progress_change(student_id, old_lessons, new_lessons):
+    """
+    Публикует изменение прогресса ученика: сдвиг счётчиков светофора и
+    новое сданное ДЗ. old_lessons и new_lessons — пары
+    (id последнего урока, id последнего урока с ДЗ).
+    """
+    if not broker.has_subscribers:
+        return
+
+    from .models import Lesson, Student
+
+    lesson_map = Lesson.get_map()
+
+    def level(lessons):
+        behind = Lesson.lessons_behind(lesson_map.get(lessons[0]), lesson_map.get(lessons[1]))
+        return None if behind is None else Student.backlog_level(behind)
+
+    events = []
+    old_level, new_level = level(old_lessons), level(new_lessons)
+    if old_level != new_level:
+        delta = {}
+        if old_level:
+            delta[old_level] = -1
+        if new_level:
+            delta[new_level] = 1
+        events.append(('traffic_light', delta))
+
+    homework = lesson_map.get(new_lessons[1])
+    old_homework = lesson_map.get(old_lessons[1])
+    if homework is not None and (old_homework is None or homework[1] > old_homework[1]):
+        name = Student.objects.filter(pk=student_id).values_list(
+            'last_name', 'first_name'
+        ).first()
+        events.append(('homework', {
+            'student_id': student_id,
+            'student': ' '.join(name) if name else '',
+            'lesson': homework[0],
+        }))
+
+    # Только после фиксации транзакции: откаченные изменения не публикуются
+    for event, data in events:
+        transaction.on_commit(lambda event=event, data=data: broker.publish(event, data))
+
+
+def publish_resync():
+    """Свежие счётчики всем подписчикам после фиксации массового изменения"""
+    transaction.on_commit(broker.resync)
+
+
+async def event_stream(request):
+    """SSE-поток для живого дашборда (только для сотрудников)"""
+    user = await request.auser()
+    if not user.is_active or not user.is_staff:
+        return HttpResponseForbidden()
+
+    from .dashboard import get_traffic_light_counts
+
+    async def events():
+        subscriber = broker.subscribe()
+        queue = subscriber[1]
+        # При подключении и после переполнения очереди — текущие счётчики
+        message = RESYNC
+        try:
+            while True:
+                if message is RESYNC:
+                    counts = await sync_to_async(get_traffic_light_counts)()
+                    message = format_event('counts', counts)
+                yield message
+                try:
+                    message = await asyncio.wait_for(queue.get(), KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    # Комментарий держит соединение открытым через прокси
+                    message = ': keepalive\n\n'
+        finally:
+            broker.unsubscribe(subscriber)
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
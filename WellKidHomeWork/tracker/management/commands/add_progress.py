@@ -15,7 +15,7 @@ class Command(BaseCommand):
         lesson_numbers = options['lesson_numbers']
         
         try:
-            student = Student.objects.get(id=student_id, is_active=True)
+            student = Student.active.get(id=student_id)
         except Student.DoesNotExist:
             self.stdout.write(self.style.ERROR(f"Студент с ID {student_id} не найден"))
             return
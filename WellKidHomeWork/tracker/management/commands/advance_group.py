@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from tracker import bulk
+from tracker.models import Student, StudyGroup
+
+
+class Command(BaseCommand):
+    help = 'Перевести всех учеников группы на следующий урок или засчитать им ДЗ'
+
+    def add_arguments(self, parser):
+        parser.add_argument('groups', nargs='+', help='Номера групп')
+        mode = parser.add_mutually_exclusive_group()
+        mode.add_argument(
+            '--homework',
+            action='store_true',
+            help='Засчитать ДЗ следующего урока вместо перехода на следующий урок'
+        )
+        mode.add_argument(
+            '--mark-done',
+            action='store_true',
+            help='Засчитать ДЗ по последнему пройденному уроку'
+        )
+
+    def handle(self, *args, **options):
+        groups = StudyGroup.objects.filter(number__in=options['groups'])
+        missing = set(options['groups']) - set(groups.values_list('number', flat=True))
+        if missing:
+            raise CommandError(f"Группы не найдены: {', '.join(sorted(missing))}")
+
+        if options['mark_done']:
+            updated = bulk.mark_homework_done(Student.active.filter(group__in=groups))
+            self.stdout.write(self.style.SUCCESS(f'Засчитано ДЗ: {updated}'))
+        elif options['homework']:
+            updated = bulk.advance_groups(groups, bulk.LAST_HOMEWORK_LESSON)
+            self.stdout.write(self.style.SUCCESS(f'Засчитано ДЗ: {updated}'))
+        else:
+            updated = bulk.advance_groups(groups, bulk.LAST_LESSON)
+            self.stdout.write(self.style.SUCCESS(f'Переведено на следующий урок: {updated}'))
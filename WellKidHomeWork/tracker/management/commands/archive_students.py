@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from tracker.archive import ARCHIVE_CHUNK_SIZE, archivable_students, archive_students
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит в архив учеников, неактивных дольше указанного срока, '
+        'вместе с прохождениями и отчётами'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months',
+            type=int,
+            default=12,
+            help='Сколько месяцев ученик должен быть неактивен (по дате изменения)'
+        )
+        parser.add_argument('--chunk-size', type=int, default=ARCHIVE_CHUNK_SIZE, help='Учеников в одной транзакции')
+        parser.add_argument('--dry-run', action='store_true', help='Только показать, сколько учеников попадёт в архив')
+
+    def handle(self, *args, **options):
+        students = archivable_students(options['months'])
+
+        if options['dry_run']:
+            self.stdout.write(f'В архив попадут учеников: {students.count()}')
+            return
+
+        archived = archive_students(students, chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Перенесено в архив учеников: {archived}'))
@@ -0,0 +1,117 @@
+import os
+import sqlite3
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+from text_format import STYLES, prinf_progress
+
+
+BACKUP_SUFFIX = '.sqlite3'
+
+
+class Command(BaseCommand):
+    help = (
+        'Резервная копия SQLite без остановки приложения: онлайн-бэкап SQLite '
+        'порциями страниц с паузами, проверка копии integrity_check и '
+        'удаление старых копий'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output-dir',
+            help='Каталог для копий (по умолчанию настройка BACKUP_DIR или <BASE_DIR>/backups)'
+        )
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Алиас базы из DATABASES')
+        parser.add_argument('--pages', type=int, default=256, help='Страниц за один шаг копирования')
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=0.05,
+            help='Пауза между шагами в секундах: в это время база свободна для записи'
+        )
+        parser.add_argument('--keep', type=int, default=7, help='Сколько последних копий хранить')
+
+    def handle(self, *args, **options):
+        database = settings.DATABASES.get(options['database'])
+        if database is None or database['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError('Команда копирует только базы SQLite')
+        if options['pages'] < 1 or options['keep'] < 1:
+            raise CommandError('--pages и --keep должны быть больше нуля')
+
+        source_path = Path(database['NAME'])
+        output_dir = Path(
+            options['output_dir']
+            or getattr(settings, 'BACKUP_DIR', Path(settings.BASE_DIR) / 'backups')
+        )
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        target_path, partial_path = self._reserve(output_dir, source_path.stem)
+
+        show_progress = options['verbosity'] >= 1 and self.stdout.isatty()
+
+        def progress(status, remaining, total):
+            if show_progress and total:
+                prinf_progress(total - remaining, total, prefix='Копирование:', length=40, style=STYLES)
+
+        # Источник открывается только на чтение. Каждый шаг держит блокировку
+        # чтения лишь на время копирования pages страниц; если между шагами
+        # базу изменит другое соединение, SQLite начнёт копирование заново,
+        # поэтому результат — согласованный снимок
+        source = sqlite3.connect(f'file:{source_path}?mode=ro', uri=True)
+        target = sqlite3.connect(partial_path)
+        try:
+            source.backup(target, pages=options['pages'], progress=progress, sleep=options['sleep'])
+            result = target.execute('PRAGMA integrity_check').fetchall()
+        except sqlite3.Error as error:
+            target.close()
+            partial_path.unlink(missing_ok=True)
+            raise CommandError(f'Ошибка копирования: {error}')
+        finally:
+            source.close()
+        target.close()
+
+        if result != [('ok',)]:
+            partial_path.unlink(missing_ok=True)
+            problems = '; '.join(row[0] for row in result[:5])
+            raise CommandError(f'Копия не прошла integrity_check: {problems}')
+
+        # link, в отличие от rename, не перезапишет копию с тем же именем
+        os.link(partial_path, target_path)
+        partial_path.unlink()
+        size = target_path.stat().st_size / 1024 / 1024
+        self.stdout.write(self.style.SUCCESS(f'Копия сохранена: {target_path} ({size:.1f} МБ)'))
+
+        for old_path in self._rotate(output_dir, source_path.stem, options['keep']):
+            self.stdout.write(f'Удалена старая копия: {old_path}')
+
+    def _reserve(self, output_dir, stem):
+        """
+        Имя новой копии и её временного файла. Пока копия не проверена, она
+        лежит под временным именем и не попадает в ротацию. Временный файл
+        создаётся эксклюзивно, поэтому два запуска в одну секунду получают
+        разные имена (…-ЧЧММСС.sqlite3, …-ЧЧММСС_01.sqlite3 и т. д.: с таким
+        суффиксом имена по-прежнему сортируются по времени)
+        """
+        stamp = timezone.localtime().strftime('%Y%m%d-%H%M%S')
+        for number in range(100):
+            suffix = f'_{number:02d}' if number else ''
+            target_path = output_dir / f'{stem}-{stamp}{suffix}{BACKUP_SUFFIX}'
+            partial_path = target_path.with_name(target_path.name + '.partial')
+            if target_path.exists():
+                continue
+            try:
+                partial_path.open('x').close()
+            except FileExistsError:
+                continue
+            return target_path, partial_path
+        raise CommandError(f'Не удалось выбрать имя копии в {output_dir}: слишком много копий за секунду')
+
+    def _rotate(self, output_dir, stem, keep):
+        """Удаляет копии сверх keep последних (имена сортируются по времени)"""
+        backups = sorted(output_dir.glob(f'{stem}-*{BACKUP_SUFFIX}'))
+        for old_path in backups[:-keep]:
+            old_path.unlink()
+            yield old_path
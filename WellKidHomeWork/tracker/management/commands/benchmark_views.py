@@ -0,0 +1,126 @@
+import statistics
+import time
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory
+from tracker.models import Student, StudyGroup
+
+
+def add_latency(latency):
+    """
+    Задержка перед каждым запросом во всех соединениях, включая соединения
+    потоков одновременных выборок. Возвращает функцию, снимающую задержку.
+    """
+    def delay(execute, sql, params, many, context):
+        time.sleep(latency)
+        return execute(sql, params, many, context)
+
+    def install(connection, **kwargs):
+        if delay not in connection.execute_wrappers:
+            connection.execute_wrappers.append(delay)
+
+    def remove():
+        connection_created.disconnect(install)
+        for conn in connections.all(initialized_only=True):
+            if delay in conn.execute_wrappers:
+                conn.execute_wrappers.remove(delay)
+
+    connection_created.connect(install)
+    for conn in connections.all(initialized_only=True):
+        install(conn)
+    return remove
+
+
+def percentiles(durations):
+    cuts = statistics.quantiles(durations, n=100, method='inclusive')
+    return cuts[49] * 1000, cuts[98] * 1000
+
+
+class Command(BaseCommand):
+    help = (
+        'Задержка дашборда групп и страницы ученика в админке (p50/p99) '
+        'с последовательными и одновременными выборками'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Количество запросов на каждый вариант'
+        )
+        parser.add_argument(
+            '--latency',
+            type=float,
+            action='append',
+            help='Задержка базы на запрос в мс (можно указать несколько раз), по умолчанию 0 и 5'
+        )
+        parser.add_argument('--student', type=int, help='ID ученика для страницы ученика')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 2:
+            raise CommandError('Нужно хотя бы 2 запроса')
+
+        students = Student.objects.all()
+        if options['student']:
+            students = students.filter(pk=options['student'])
+        student = students.first()
+        if student is None:
+            raise CommandError('Нет учеников для страницы ученика')
+        user = get_user_model().objects.filter(is_superuser=True, is_active=True).first()
+        if user is None:
+            raise CommandError('Нужен суперпользователь: представления админки проверяют права')
+
+        factory = RequestFactory()
+        group_admin = admin.site._registry[StudyGroup]
+        student_admin = admin.site._registry[Student]
+        pages = {
+            'dashboard': (group_admin, lambda request: group_admin.dashboard_view(request), 'dashboard/'),
+            'student': (
+                student_admin,
+                lambda request: student_admin.change_view(request, str(student.pk)),
+                f'{student.pk}/change/',
+            ),
+        }
+
+        for latency_ms in options['latency'] or [0, 5]:
+            self.stdout.write(f'Задержка базы: {latency_ms:g} мс')
+            remove_latency = add_latency(latency_ms / 1000) if latency_ms else None
+            try:
+                for page, (model_admin, view, path) in pages.items():
+                    timings = {}
+                    for mode, concurrent in (('sync', False), ('async', True)):
+                        model_admin.concurrent_fetches = concurrent
+                        timings[mode] = percentiles(self._run(
+                            lambda: view(self._request(factory, path, user)),
+                            options['requests'],
+                        ))
+                    (sync_p50, sync_p99), (async_p50, async_p99) = timings['sync'], timings['async']
+                    self.stdout.write(
+                        f'  {page:<10} sync p50 {sync_p50:8.2f} мс  p99 {sync_p99:8.2f} мс | '
+                        f'async p50 {async_p50:8.2f} мс  p99 {async_p99:8.2f} мс'
+                    )
+            finally:
+                group_admin.concurrent_fetches = student_admin.concurrent_fetches = True
+                if remove_latency:
+                    remove_latency()
+
+    def _request(self, factory, path, user):
+        request = factory.get(f'/tracker/{path}')
+        request.user = user
+        return request
+
+    def _run(self, call, count):
+        durations = []
+        for _ in range(count):
+            # Кэш групп и снимков очищается, чтобы каждый запрос шёл в базу
+            cache.clear()
+            started = time.perf_counter()
+            call().render()
+            durations.append(time.perf_counter() - started)
+        return durations
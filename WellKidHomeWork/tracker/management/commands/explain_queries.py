@@ -0,0 +1,347 @@
+import re
+from datetime import timedelta
+from functools import partial
+
+from django.apps import apps
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.core.paginator import Paginator
+from django.db import connection, transaction
+from django.test import RequestFactory, override_settings
+from django.utils import timezone
+from tracker.dashboard import get_group_stats, get_traffic_light_counts
+from tracker.models import Lesson, Student, StudentLessonProgress
+from tracker.reports import generate_reports
+from tracker.search import search_students
+
+
+# Кэш отключён, чтобы в отчёт попали все запросы, а не только промахи
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+CHANGELIST_QUERIES = ['', 'q=ан', 'format__exact=group', 'is_active__exact=1', 'o=3']
+
+PLANNED_STATEMENTS = ('SELECT', 'UPDATE', 'DELETE')
+
+SQLITE_FULL_SCAN = re.compile(r'^SCAN (\w+)(?! USING (?:COVERING )?INDEX)')
+SQLITE_TEMP_BTREE = re.compile(r'USE TEMP B-TREE FOR (ORDER BY|GROUP BY|DISTINCT)')
+POSTGRESQL_FULL_SCAN = re.compile(r'Seq Scan on (\w+)')
+POSTGRESQL_SORT = re.compile(r'Sort Key: (.+)')
+
+# Повторы, число которых зависит от данных (IN по id страницы, CASE из
+# bulk_update и продвижения, OR по ученикам в reports._new_progress),
+# сворачиваются, чтобы отчёт не менялся от числа строк
+REPEATED_IN = re.compile(r'IN \(\?(?:, \?)*\)')
+REPEATED_WHEN = re.compile(r'( WHEN \([^()]*\) THEN (?:\?|\([^()]*\)))\1+')
+REPEATED_OR = re.compile(r'(\([^()]*\))(?: OR \1)+')
+
+ORDER_BY = re.compile(r'\bORDER BY (.+?)(?:\bLIMIT\b|\)|$)')
+ORDER_COLUMN = r'"{}"\."(\w+)" (ASC|DESC)'
+
+
+class Rollback(Exception):
+    pass
+
+
+def collapse_placeholders(sql):
+    """SQL в одну строку с ? вместо %s и свёрнутыми повторами"""
+    sql = ' '.join(sql.replace('%s', '?').split())
+    sql = REPEATED_IN.sub('IN (?, ...)', sql)
+    sql = REPEATED_WHEN.sub(r'\1 ...', sql)
+    return REPEATED_OR.sub(r'\1 OR ...', sql)
+
+
+class Command(BaseCommand):
+    help = (
+        'Советник по индексам: выполняет горячие запросы (список учеников в админке, '
+        'StudentListView, дашборд, сигнал прогресса, генерация отчётов), '
+        'показывает их планы (EXPLAIN), отмечает полные сканы и временные B-деревья '
+        'и предлагает недостающие индексы. Отчёт детерминирован, его можно сравнивать в CI'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Записать отчёт в файл вместо вывода')
+        parser.add_argument(
+            '--ignore-table',
+            action='append',
+            default=[],
+            help='Не отмечать полные сканы таблицы (маленькие справочники)'
+        )
+        parser.add_argument(
+            '--fail',
+            action='store_true',
+            help='Завершиться с ошибкой, если есть предложенные индексы'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            raise CommandError('Разбор планов есть только для SQLite и PostgreSQL')
+
+        self.ignored = set(options['ignore_table'])
+        self.tables = {model._meta.db_table: model for model in apps.get_models()}
+        self.indexes = self._existing_indexes()
+
+        lines = []
+        suggestions = set()
+        issues = 0
+        with override_settings(CACHES=NO_CACHE):
+            for name, scenario in self._scenarios():
+                lines.append(f'== {name}')
+                for sql, plan, flags, suggested in self._explain(self._capture(scenario)):
+                    lines.append(f'   {sql}')
+                    lines += [f'      {step}' for step in plan]
+                    lines += [f'      ! {flag}' for flag in flags]
+                    lines += [f'      + {suggestion}' for suggestion in suggested]
+                    issues += len(flags)
+                    suggestions.update(suggested)
+                lines.append('')
+
+        lines.append(f'Проблем в планах: {issues}')
+        lines.append(f'Предложено индексов: {len(suggestions)}')
+        lines += [f'   {suggestion}' for suggestion in sorted(suggestions)]
+        report = '\n'.join(lines) + '\n'
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                output.write(report)
+            self.stdout.write(self.style.SUCCESS(f"Отчёт сохранён в {options['output']}"))
+        else:
+            self.stdout.write(report, ending='')
+
+        if options['fail'] and suggestions:
+            raise CommandError(f'Не хватает индексов: {len(suggestions)}')
+
+    # Сценарии: каждая функция выполняет код горячего пути как есть
+
+    def _scenarios(self):
+        return [
+            ('admin: список учеников', self._admin_changelist),
+            ('StudentListView', self._student_list),
+            ('дашборд', self._dashboard),
+            ('сигнал прогресса', partial(self._progress_signal, *self._signal_target())),
+            ('generate_reports', self._generate_reports),
+        ]
+
+    def _admin_changelist(self):
+        model_admin = admin.site._registry[Student]
+        user = User(is_active=True, is_staff=True, is_superuser=True)
+        factory = RequestFactory()
+
+        for query in CHANGELIST_QUERIES:
+            request = factory.get('/tracker/student/', dict(
+                pair.split('=') for pair in query.split('&') if pair
+            ))
+            request.user = user
+            changelist = model_admin.get_changelist_instance(request)
+
+            # Следующая страница по курсору должна стоить столько же, сколько первая
+            if changelist.keyset_next_url:
+                request = factory.get('/tracker/student/' + changelist.keyset_next_url)
+                request.user = user
+                model_admin.get_changelist_instance(request)
+
+    def _student_list(self):
+        # Тот же queryset, что в StudentListView (paginate_by = 20)
+        for search in ('', 'ан'):
+            queryset = Student.active.all()
+            if search:
+                queryset = search_students(queryset, search)
+            paginator = Paginator(queryset, 20)
+            list(paginator.page(paginator.num_pages).object_list)
+        Student.objects.count()
+        Student.active.count()
+        Student.active.filter(format=Student.GROUP).count()
+        Student.active.filter(format=Student.INDIVIDUAL).count()
+
+    def _dashboard(self):
+        Student.objects.count()
+        Student.active.count()
+        Lesson.objects.count()
+        get_traffic_light_counts()
+        get_group_stats()
+        list(StudentLessonProgress.objects.select_related('student', 'lesson')[:10])
+
+    def _signal_target(self):
+        """Ученик и ещё не пройденный им урок (выбираются вне отчёта)"""
+        student = Student.active.order_by('pk').first()
+        lesson = Lesson.objects.exclude(progress__student=student).order_by('module', 'lesson').first()
+        return student, lesson
+
+    def _progress_signal(self, student, lesson):
+        if student is None or lesson is None:
+            return
+        progress = StudentLessonProgress.objects.create(
+            student=student,
+            lesson=lesson,
+            date_completed=timezone.now().date(),
+        )
+        progress.homework_completed = True
+        progress.save()
+        progress.delete()
+
+    def _generate_reports(self):
+        end_date = timezone.now().date()
+        generate_reports(Student.active.all(), end_date - timedelta(days=30), end_date)
+
+    # Сбор и разбор запросов
+
+    def _capture(self, scenario):
+        """Запросы сценария [(sql, params)]; все изменения откатываются"""
+        captured = []
+
+        def record(execute, sql, params, many, context):
+            captured.append((sql, params))
+            return execute(sql, params, many, context)
+
+        try:
+            with transaction.atomic(), connection.execute_wrapper(record):
+                scenario()
+                raise Rollback
+        except Rollback:
+            pass
+        return captured
+
+    def _explain(self, captured):
+        seen = set()
+        for sql, params in captured:
+            display = collapse_placeholders(sql)
+            if not sql.lstrip().upper().startswith(PLANNED_STATEMENTS) or display in seen:
+                continue
+            seen.add(display)
+            plan = self._plan(sql, params)
+            flags, suggested = self._analyze(sql, plan)
+            yield display, plan, flags, suggested
+
+    def _plan(self, sql, params):
+        if connection.vendor == 'postgresql':
+            prefix = connection.ops.explain_query_prefix(costs=False)
+        else:
+            prefix = connection.ops.explain_query_prefix()
+        with connection.cursor() as cursor:
+            cursor.execute(f'{prefix} {sql}', params)
+            rows = cursor.fetchall()
+
+        if connection.vendor == 'postgresql':
+            return [row[0].rstrip() for row in rows]
+
+        # SQLite: (id, родитель, -, описание), вложенность по родителю
+        depth = {0: -1}
+        plan = []
+        for node, parent, _, detail in rows:
+            depth[node] = depth.get(parent, -1) + 1
+            plan.append('  ' * depth[node] + detail)
+        return plan
+
+    def _analyze(self, sql, plan):
+        flags = []
+        suggested = []
+        for step in plan:
+            step = step.strip()
+            if connection.vendor == 'postgresql':
+                scan = POSTGRESQL_FULL_SCAN.search(step)
+                sort = POSTGRESQL_SORT.search(step)
+            else:
+                scan = SQLITE_FULL_SCAN.search(step)
+                sort = SQLITE_TEMP_BTREE.search(step)
+
+            if scan and scan.group(1) in self.tables and scan.group(1) not in self.ignored:
+                table = scan.group(1)
+                flags.append(f'полный скан {table}')
+                columns = self._filter_columns(sql, table)
+                # Индекс с той же первой колонкой уже есть — планировщик счёл его бесполезным
+                if columns and not any(index[:1] == columns[:1] for index in self.indexes.get(table, [])):
+                    suggested += self._suggest(table, columns)
+            elif sort:
+                flags.append(f'временное B-дерево / сортировка: {sort.group(1)}')
+                # Внешняя сортировка запроса — последний ORDER BY (раньше идут окна и подзапросы)
+                orders = ORDER_BY.findall(sql)
+                for table in self._tables_in(orders[-1] if orders else ''):
+                    equal = self._filter_columns(sql, table, ranges=False, joins=False)
+                    ordering = [
+                        ('-' if direction == 'DESC' else '') + column
+                        for column, direction in re.findall(ORDER_COLUMN.format(table), orders[-1])
+                        if column not in equal
+                    ]
+                    suggested += self._suggest(table, equal + ordering)
+        return flags, sorted(set(suggested))
+
+    def _tables_in(self, clause):
+        return sorted({
+            table for table in re.findall(r'"(\w+)"\."\w+"', clause)
+            if table in self.tables and table not in self.ignored
+        })
+
+    def _columns(self, clause, table):
+        columns = []
+        for column in re.findall(rf'"{table}"\."(\w+)"', clause):
+            if column not in columns:
+                columns.append(column)
+        return columns
+
+    def _filter_columns(self, sql, table, ranges=True, joins=True):
+        """
+        Колонки таблицы из условий со значениями (WHERE): сначала равенства,
+        потом диапазоны; joins=True добавляет колонки из условий соединения ON.
+        """
+        where = sql.split(' WHERE ', 1)[1] if ' WHERE ' in sql else ''
+        equal = self._columns(
+            ' '.join(re.findall(rf'"{table}"\."\w+" (?:= %s|IN \(%s|IS NULL)', where)), table
+        )
+        if joins:
+            equal += [
+                column for column in self._columns(' '.join(re.findall(r' ON \((.+?)\)', sql)), table)
+                if column not in equal
+            ]
+        if not ranges:
+            return equal
+        ranges = self._columns(
+            ' '.join(re.findall(rf'"{table}"\."\w+" (?:[<>]=? %s|BETWEEN %s)', where)), table
+        )
+        return equal + [column for column in ranges if column not in equal]
+
+    def _suggest(self, table, columns):
+        """Индекс по колонкам (с '-' для убывания), если нет индекса с таким началом"""
+        plain = [column.removeprefix('-') for column in columns]
+        if not columns or any(index[:len(plain)] == plain for index in self.indexes.get(table, [])):
+            return []
+        model = self.tables[table]
+        names = {field.column: field.name for field in model._meta.concrete_fields}
+        fields = ', '.join(
+            repr(('-' if column.startswith('-') else '') + names.get(name, name))
+            for column, name in zip(columns, plain)
+        )
+        return [f'{model._meta.label}: models.Index(fields=[{fields}])']
+
+    def _existing_indexes(self):
+        """
+        Колонки существующих индексов по таблицам. Частичные индексы (с WHERE)
+        не учитываются: они годятся только для запросов с тем же условием,
+        и индекс по активным ученикам иначе скрыл бы индекс для всех.
+        """
+        with connection.cursor() as cursor:
+            tables = [table for table in self.tables if table in connection.introspection.table_names(cursor)]
+            partial = self._partial_indexes(cursor, tables)
+            return {
+                table: [
+                    constraint['columns']
+                    for name, constraint in connection.introspection.get_constraints(cursor, table).items()
+                    if (constraint['index'] or constraint['unique'] or constraint['primary_key'])
+                    and name not in partial
+                ]
+                for table in tables
+            }
+
+    def _partial_indexes(self, cursor, tables):
+        """Имена частичных индексов"""
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid '
+                'WHERE i.indpred IS NOT NULL'
+            )
+            return {name for name, in cursor.fetchall()}
+        partial = set()
+        for table in tables:
+            # PRAGMA index_list: (seq, name, unique, origin, partial)
+            cursor.execute(f'PRAGMA index_list({connection.ops.quote_name(table)})')
+            partial.update(row[1] for row in cursor.fetchall() if row[4])
+        return partial
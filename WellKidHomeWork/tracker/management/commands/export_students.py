@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+from tracker.export import write_csv, write_xlsx, EXPORT_CHUNK_SIZE
+from tracker.models import Student
+
+
+class Command(BaseCommand):
+    help = 'Выгрузка списка учеников в CSV или XLSX (тот же формат, что и в админке)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу выгрузки')
+        parser.add_argument(
+            '--file-format',
+            choices=['csv', 'xlsx'],
+            help='Формат файла (по умолчанию определяется по расширению)'
+        )
+        parser.add_argument(
+            '--format',
+            choices=[Student.GROUP, Student.INDIVIDUAL],
+            help='Только ученики с указанным форматом обучения'
+        )
+        parser.add_argument('--group', help='Только ученики указанной группы')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help='Сколько строк читать из базы за один запрос'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['file_format'] or ('xlsx' if path.endswith('.xlsx') else 'csv')
+
+        students = Student.objects.all()
+        if options['format']:
+            students = students.filter(format=options['format'])
+        if options['group']:
+            students = students.filter(group__number=options['group'])
+
+        if file_format == 'xlsx':
+            try:
+                count = write_xlsx(students, path, options['chunk_size'])
+            except ImportError:
+                raise CommandError('Для выгрузки в XLSX установите пакет xlsxwriter')
+        else:
+            with open(path, 'w', encoding='utf-8', newline='') as output:
+                count = write_csv(students, output, options['chunk_size'])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Выгружено {count} учеников в {path}")
+        )
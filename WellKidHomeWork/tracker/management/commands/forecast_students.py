@@ -0,0 +1,66 @@
+import csv
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from tracker import analytics
+
+
+class Command(BaseCommand):
+    help = 'Прогноз окончания программы и группа риска по всем ученикам'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=20,
+            help='Сколько учеников группы риска вывести'
+        )
+        parser.add_argument('--csv', help='Сохранить прогноз по всем ученикам в CSV')
+
+    def handle(self, *args, **options):
+        if analytics.np is None:
+            raise CommandError('Для прогноза установите пакет numpy')
+
+        started = time.perf_counter()
+        roster = analytics.load_roster()
+        loaded = time.perf_counter()
+        result = analytics.forecast(roster)
+        summary = analytics.forecast_summary(result)
+        computed = time.perf_counter()
+
+        self.stdout.write(
+            f"Учеников: {summary['students']}, в группе риска: {summary['at_risk']}"
+        )
+        if summary['students']:
+            self.stdout.write(
+                f"Медианный темп: {summary['median_pace']:.2f} урока в неделю, "
+                f"медианное отставание: {summary['median_backlog']:.1f}"
+            )
+        self.stdout.write(
+            f"Загрузка: {loaded - started:.3f} с, расчёт: {computed - loaded:.3f} с"
+        )
+
+        for row in analytics.at_risk_rows(result, options['limit']):
+            self.stdout.write(self.style.WARNING(
+                f"ID {row['id']}: урок {row['lesson']}, отставание {row['backlog']} "
+                f"({row['backlog_percentile']}%), темп {row['pace']}, "
+                f"окончание {row['finish_date'] or 'не прогнозируется'}"
+            ))
+
+        if options['csv']:
+            with open(options['csv'], 'w', encoding='utf-8', newline='') as output:
+                writer = csv.writer(output)
+                writer.writerow([
+                    'id', 'lesson', 'pace', 'backlog', 'backlog_percentile',
+                    'finish_date', 'at_risk',
+                ])
+                writer.writerows(zip(
+                    result['id'].tolist(),
+                    result['lesson'].tolist(),
+                    result['pace'].round(3).tolist(),
+                    result['backlog'].tolist(),
+                    result['backlog_percentile'].round(1).tolist(),
+                    result['finish_date'].astype(str).tolist(),
+                    result['at_risk'].tolist(),
+                ))
+            self.stdout.write(self.style.SUCCESS(f"Прогноз сохранён в {options['csv']}"))
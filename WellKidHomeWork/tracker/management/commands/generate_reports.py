@@ -1,7 +1,8 @@
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from datetime import timedelta
-from tracker.models import Student, AutomatedReport
+from tracker.models import Student
+from tracker.reports import PERIOD_DAYS, generate_reports, write_report_files
 
 
 class Command(BaseCommand):
@@ -11,15 +12,21 @@ class Command(BaseCommand):
         parser.add_argument(
             '--period',
             type=str,
-            choices=['week', 'month', 'quarter'],
+            choices=list(PERIOD_DAYS),
             default='month',
-            help='Период для отчета (week/month/quarter)'
+            help='Период для первого отчета ученика (week/month/quarter), '
+                 'следующие отчеты начинаются с конца предыдущего'
         )
         parser.add_argument(
             '--all-students',
             action='store_true',
             help='Генерировать отчеты для всех активных учеников'
         )
+        parser.add_argument(
+            '--output',
+            help='Выгрузить отчет по ученикам в файлы <путь>.jsonl.gz и <путь>.parquet '
+                 '(<путь>.csv.gz без pyarrow) вместо создания отчетов в базе'
+        )
     
     def handle(self, *args, **options):
         period = options['period']
@@ -27,15 +34,10 @@ class Command(BaseCommand):
         
         # Определяем даты периода
         end_date = timezone.now().date()
-        if period == 'week':
-            start_date = end_date - timedelta(days=7)
-        elif period == 'month':
-            start_date = end_date - timedelta(days=30)
-        else:  # quarter
-            start_date = end_date - timedelta(days=90)
+        start_date = end_date - timedelta(days=PERIOD_DAYS[period])
         
         if all_students:
-            students = Student.objects.filter(is_active=True)
+            students = Student.active.all()
             self.stdout.write(f"Генерация отчетов для {students.count()} учеников...")
         else:
             # Если не указан --all-students, запрашиваем ID студента
@@ -43,52 +45,35 @@ class Command(BaseCommand):
             
             if student_id:
                 try:
-                    students = Student.objects.filter(id=int(student_id), is_active=True)
+                    students = Student.objects.filter(id=int(student_id))
                     if not students.exists():
-                        self.stdout.write(self.style.ERROR(f"Студент с ID {student_id} не найден или неактивен"))
+                        self.stdout.write(self.style.ERROR(f"Студент с ID {student_id} не найден"))
                         return
                 except ValueError:
                     self.stdout.write(self.style.ERROR("Некорректный ID студента"))
                     return
             else:
-                students = Student.objects.filter(is_active=True)
+                students = Student.active.all()
         
-        reports_created = 0
+        if options['output']:
+            paths, count = write_report_files(students, options['output'], start_date, end_date)
+            for path in paths:
+                self.stdout.write(self.style.SUCCESS(f"Сохранено {count} строк в {path}"))
+            return
         
-        for student in students:
-            # Проверяем, есть ли прогресс за период
-            has_progress = student.studentlessonprogress_set.filter(
-                date_completed__range=[start_date, end_date]
-            ).exists()
-            
-            if not has_progress:
-                self.stdout.write(
-                    self.style.WARNING(
-                        f"Нет данных для студента {student} за период {start_date} - {end_date}"
-                    )
+        # Ученики без новых прохождений отсеиваются одним запросом
+        reports = generate_reports(students, start_date, end_date)
+        
+        for report in reports:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Создан отчет для {report.student} за {report.period_start} - {report.period_end}: "
+                    f"уроков {report.lessons_completed}, ДЗ {report.homeworks_completed}"
                 )
-                continue
-            
-            # Создаем отчет
-            report = AutomatedReport.objects.create(
-                student=student,
-                period_start=start_date,
-                period_end=end_date,
             )
-            
-            # Генерируем данные отчета
-            if report.generate_report():
-                self.stdout.write(
-                    self.style.SUCCESS(
-                        f"Создан отчет для {student} за {start_date} - {end_date}"
-                    )
-                )
-                reports_created += 1
-            else:
-                report.delete()
         
         self.stdout.write(
             self.style.SUCCESS(
-                f"Успешно создано {reports_created} отчетов"
+                f"Успешно создано {len(reports)} отчетов"
             )
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+from tracker.curriculum import CURRICULUM_PATH, CurriculumError, apply_curriculum, read_curriculum
+
+
+def lesson_code(key):
+    return f'М{key[0]}У{key[1]}'
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает программу курса (модули, уроки, темы) из файла и записывает '
+        'только отличия одним запросом; повторный запуск ничего не меняет'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            nargs='?',
+            default=CURRICULUM_PATH,
+            help='Файл программы (по умолчанию tracker/curriculum.json)'
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Только показать отличия')
+
+    def handle(self, *args, **options):
+        try:
+            lessons = read_curriculum(options['path'])
+        except CurriculumError as error:
+            raise CommandError(str(error))
+
+        diff = apply_curriculum(lessons, dry_run=options['dry_run'])
+
+        for key in diff['created']:
+            self.stdout.write(f'+ {lesson_code(key)} {lessons[key]}')
+        for key in diff['updated']:
+            self.stdout.write(f'~ {lesson_code(key)} {lessons[key]}')
+        for key in diff['missing']:
+            self.stdout.write(self.style.WARNING(f'? {lesson_code(key)} есть в базе, но не в файле'))
+
+        if not diff['created'] and not diff['updated']:
+            self.stdout.write(f"Программа не изменилась (уроков: {diff['unchanged']})")
+            return
+        verb = 'Проверка без записи' if options['dry_run'] else 'Готово'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb}: добавлено {len(diff['created'])}, изменено {len(diff['updated'])}, "
+            f"без изменений {diff['unchanged']}"
+        ))
@@ -0,0 +1,372 @@
+import json
+import random
+import statistics
+import threading
+import time
+from collections import Counter, defaultdict
+from html.parser import HTMLParser
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode, urljoin
+from urllib.request import HTTPCookieProcessor, HTTPErrorProcessor, Request, build_opener
+
+from django.core.management.base import BaseCommand, CommandError
+from tracker.models import Lesson, Student
+from text_format import prinf_table
+
+
+# Доли запросов в сгенерированном сценарии
+SCENARIO_WEIGHTS = {
+    'changelist': 30,
+    'search': 20,
+    'student_detail': 25,
+    'dashboard': 15,
+    'changelist_save': 10,
+}
+
+CHANGELIST_QUERIES = ['', 'format__exact=group', 'is_active__exact=1', 'o=3', 'o=-3']
+
+CHANGELIST_URL = '/tracker/student/'
+DASHBOARD_URL = '/tracker/studygroup/dashboard/'
+LOGIN_URL = '/login/'
+
+
+class NoRedirect(HTTPErrorProcessor):
+    """Ответы 3xx возвращаются как есть: редирект после сохранения — это успех"""
+
+    def http_response(self, request, response):
+        return response
+
+    https_response = http_response
+
+
+class FormParser(HTMLParser):
+    """Поля формы с заданным id, как их отправил бы браузер"""
+
+    def __init__(self, form_id):
+        super().__init__()
+        self.form_id = form_id
+        self.inside = False
+        self.fields = {}
+        self.select = None
+        self.first_option = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'form':
+            self.inside = attrs.get('id') == self.form_id
+        if not self.inside or not attrs.get('name') and tag != 'option':
+            return
+        if tag == 'input':
+            kind = attrs.get('type', 'text')
+            if kind in ('submit', 'button', 'image', 'file'):
+                return
+            if kind in ('checkbox', 'radio') and 'checked' not in attrs:
+                return
+            self.fields[attrs['name']] = attrs.get('value') or ''
+        elif tag == 'select':
+            self.select = attrs['name']
+            self.first_option = None
+        elif tag == 'option' and self.select:
+            value = attrs.get('value') or ''
+            if self.first_option is None:
+                self.first_option = value
+            if 'selected' in attrs:
+                self.fields[self.select] = value
+
+    def handle_endtag(self, tag):
+        if tag == 'form':
+            self.inside = False
+        elif tag == 'select' and self.select:
+            self.fields.setdefault(self.select, self.first_option or '')
+            self.select = None
+
+
+class Session:
+    """Браузер одного сотрудника: свои cookie и CSRF-токен"""
+
+    def __init__(self, base_url, timeout):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.cookies = CookieJar()
+        self.opener = build_opener(HTTPCookieProcessor(self.cookies), NoRedirect)
+
+    def csrf_token(self):
+        return next((cookie.value for cookie in self.cookies if cookie.name == 'csrftoken'), '')
+
+    def request(self, path, data=None):
+        """(статус, тело) ответа; ошибки HTTP тоже возвращаются, а не бросаются"""
+        url = urljoin(self.base_url, path)
+        body = urlencode(data).encode() if data is not None else None
+        headers = {'X-CSRFToken': self.csrf_token(), 'Referer': url} if data is not None else {}
+        try:
+            with self.opener.open(Request(url, body, headers), timeout=self.timeout) as response:
+                return response.status, response.read().decode('utf-8', 'replace')
+        except HTTPError as error:
+            return error.code, error.read().decode('utf-8', 'replace')
+
+    def login(self, username, password):
+        self.request(LOGIN_URL)
+        status, _ = self.request(LOGIN_URL, {
+            'username': username,
+            'password': password,
+            'csrfmiddlewaretoken': self.csrf_token(),
+            'next': '/',
+        })
+        if status != 302:
+            raise CommandError(f'Не удалось войти как {username}: проверьте логин, пароль и is_staff')
+
+
+def classify(status, body, endpoint):
+    """Вид ошибки ответа или None для успешного"""
+    if status >= 500:
+        # Текст ошибки виден на отладочной странице (DEBUG = True)
+        return 'sqlite_locked' if 'database is locked' in body else f'http_{status}'
+    if status >= 400:
+        return f'http_{status}'
+    if endpoint == 'changelist_save' and status != 302:
+        return 'validation'
+    if endpoint != 'changelist_save' and 300 <= status < 400:
+        # Обычно редирект на страницу входа: сессия потеряна
+        return 'redirect'
+    return None
+
+
+def percentile_cuts(latencies):
+    """99 границ процентилей или None, если успешных запросов не было"""
+    if not latencies:
+        return None
+    if len(latencies) < 2:
+        return latencies * 99
+    return statistics.quantiles(latencies, n=100, method='inclusive')
+
+
+def format_ms(value):
+    return '—' if value is None else f'{value:.1f}'
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный прогон по HTTP против runserver или gunicorn: несколько '
+        'сессий сотрудников одновременно открывают список учеников, сохраняют '
+        'правки в списке, ищут, смотрят дашборд групп и карточку ученика. '
+        'Показывает пропускную способность, p50/p95/p99 и долю ошибок '
+        '(включая блокировки SQLite) по каждому виду запроса. Блокировку '
+        'SQLite видно только по тексту отладочной страницы: запускайте сервер '
+        'с DEBUG = True, иначе такие ответы попадут в http_500'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Адрес сервера')
+        parser.add_argument('--username', required=True, help='Сотрудник (is_staff) для входа в админку')
+        parser.add_argument('--password', required=True)
+        parser.add_argument('--sessions', type=int, default=8, help='Одновременных сессий')
+        parser.add_argument('--requests', type=int, default=50, help='Запросов на сессию в сгенерированном сценарии')
+        parser.add_argument('--seed', type=int, default=1, help='Seed генератора сценария')
+        parser.add_argument(
+            '--scenario',
+            help='Повторить сценарий из JSON-файла (сессии и запросы берутся из него)'
+        )
+        parser.add_argument('--save-scenario', help='Сохранить сгенерированный сценарий в JSON-файл')
+        parser.add_argument('--think', type=float, default=0, help='Пауза между запросами сессии, мс')
+        parser.add_argument('--timeout', type=float, default=30, help='Таймаут запроса, с')
+        parser.add_argument('--json', action='store_true', help='Вывести итоги в JSON')
+
+    def handle(self, *args, **options):
+        if options['scenario']:
+            with open(options['scenario'], encoding='utf-8') as scenario_file:
+                scenario = json.load(scenario_file)
+        else:
+            if options['sessions'] < 1 or options['requests'] < 1:
+                raise CommandError('--sessions и --requests должны быть больше нуля')
+            scenario = self._generate(options['sessions'], options['requests'], options['seed'])
+        if options['save_scenario']:
+            with open(options['save_scenario'], 'w', encoding='utf-8') as scenario_file:
+                json.dump(scenario, scenario_file, ensure_ascii=False, indent=1)
+
+        base_url = options['url'].rstrip('/') + '/'
+        sessions = []
+        for _ in scenario['sessions']:
+            session = Session(base_url, options['timeout'])
+            session.login(options['username'], options['password'])
+            sessions.append(session)
+
+        results = defaultdict(list)
+        lock = threading.Lock()
+        start = threading.Barrier(len(sessions) + 1)
+
+        def run(session, steps):
+            start.wait()
+            for step in steps:
+                endpoint, latency, error = self._perform(session, step)
+                with lock:
+                    results[endpoint].append((latency, error))
+                if options['think']:
+                    time.sleep(options['think'] / 1000)
+
+        threads = [
+            threading.Thread(target=run, args=(session, steps), daemon=True)
+            for session, steps in zip(sessions, scenario['sessions'])
+        ]
+        for thread in threads:
+            thread.start()
+        start.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        summary = self._summarize(results, elapsed)
+        if options['json']:
+            self.stdout.write(json.dumps(summary, ensure_ascii=False, indent=1))
+        else:
+            self._print(summary, len(sessions))
+
+    # Сценарий
+
+    def _generate(self, sessions, requests, seed):
+        """Сценарий по засеянной базе: для каждой сессии список запросов"""
+        rng = random.Random(seed)
+        students = list(
+            Student.active.order_by('pk').values_list(
+                'pk', 'last_name', 'first_name', 'last_lesson_id', 'last_homework_lesson_id'
+            )
+        )
+        if not students:
+            raise CommandError('В базе нет учеников: засейте базу перед прогоном')
+        lesson_ids = list(Lesson.objects.order_by('module', 'lesson').values_list('pk', flat=True))
+
+        def step(endpoint):
+            pk, last_name, first_name, last_lesson_id, homework_id = rng.choice(students)
+            if endpoint == 'changelist':
+                query = rng.choice(CHANGELIST_QUERIES)
+                return {'endpoint': endpoint, 'path': CHANGELIST_URL + (f'?{query}' if query else '')}
+            if endpoint == 'search':
+                return {'endpoint': endpoint, 'path': CHANGELIST_URL + '?' + urlencode({'q': last_name[:3]})}
+            if endpoint == 'student_detail':
+                return {'endpoint': endpoint, 'path': f'{CHANGELIST_URL}{pk}/change/'}
+            if endpoint == 'dashboard':
+                return {'endpoint': endpoint, 'path': DASHBOARD_URL}
+            # Сохранение переключает ДЗ между двумя уроками, чтобы каждая
+            # отправка меняла строку и при повторе сценария
+            other = rng.choice([lesson for lesson in lesson_ids if lesson != homework_id] or [''])
+            return {
+                'endpoint': endpoint,
+                'path': CHANGELIST_URL + '?' + urlencode({'q': f'{last_name} {first_name}'}),
+                'student': pk,
+                'field': 'last_homework_lesson',
+                'values': [homework_id or '', other],
+            }
+
+        endpoints = list(SCENARIO_WEIGHTS)
+        weights = list(SCENARIO_WEIGHTS.values())
+        return {
+            'seed': seed,
+            'sessions': [
+                [step(endpoint) for endpoint in rng.choices(endpoints, weights, k=requests)]
+                for _ in range(sessions)
+            ],
+        }
+
+    # Запросы
+
+    def _perform(self, session, step):
+        """(вид запроса, задержка в секундах, вид ошибки или None)"""
+        endpoint = step['endpoint']
+        try:
+            if endpoint == 'changelist_save':
+                return endpoint, *self._save(session, step)
+            started = time.perf_counter()
+            status, body = session.request(step['path'])
+            return endpoint, time.perf_counter() - started, classify(status, body, endpoint)
+        except (URLError, OSError) as error:
+            return endpoint, None, f'connection: {getattr(error, "reason", error)}'
+
+    def _save(self, session, step):
+        """Правка одной строки в списке: форма читается заранее, замеряется только POST"""
+        status, body = session.request(step['path'])
+        error = classify(status, body, 'changelist')
+        if error:
+            return None, error
+
+        parser = FormParser('changelist-form')
+        parser.feed(body)
+        fields = parser.fields
+        prefix = next(
+            (name[:-len('-id')] for name, value in fields.items()
+             if name.endswith('-id') and value == str(step['student'])),
+            None
+        )
+        if prefix is None:
+            return None, 'student_not_found'
+
+        name = f"{prefix}-{step['field']}"
+        current = fields.get(name, '')
+        fields[name] = next((str(value) for value in step['values'] if str(value) != current), current)
+        fields['_save'] = 'Сохранить'
+
+        started = time.perf_counter()
+        status, body = session.request(step['path'], fields)
+        return time.perf_counter() - started, classify(status, body, 'changelist_save')
+
+    # Итоги
+
+    def _summarize(self, results, elapsed):
+        endpoints = {}
+        for endpoint in SCENARIO_WEIGHTS:
+            rows = results.get(endpoint)
+            if not rows:
+                continue
+            latencies = sorted(latency for latency, error in rows if error is None)
+            errors = Counter(error for _, error in rows if error is not None)
+            cuts = percentile_cuts(latencies)
+            # Без успешных запросов процентили не определены (None, в таблице «—»)
+            endpoints[endpoint] = {
+                'requests': len(rows),
+                'ok': len(latencies),
+                'per_second': len(rows) / elapsed if elapsed else 0,
+                'p50_ms': cuts[49] * 1000 if cuts else None,
+                'p95_ms': cuts[94] * 1000 if cuts else None,
+                'p99_ms': cuts[98] * 1000 if cuts else None,
+                'error_rate': sum(errors.values()) / len(rows),
+                'errors': dict(errors.most_common()),
+            }
+        total = sum(row['requests'] for row in endpoints.values())
+        errors = Counter()
+        for row in endpoints.values():
+            errors.update(row['errors'])
+        return {
+            'seconds': elapsed,
+            'requests': total,
+            'per_second': total / elapsed if elapsed else 0,
+            'error_rate': sum(errors.values()) / total if total else 0,
+            'errors': dict(errors.most_common()),
+            'endpoints': endpoints,
+        }
+
+    def _print(self, summary, sessions):
+        headers = ['Запрос', 'Всего', 'Запр/с', 'p50, мс', 'p95, мс', 'p99, мс', 'Ошибки']
+        rows = [
+            [
+                endpoint,
+                row['requests'],
+                f"{row['per_second']:.1f}",
+                format_ms(row['p50_ms']),
+                format_ms(row['p95_ms']),
+                format_ms(row['p99_ms']),
+                f"{row['error_rate']:.1%}",
+            ]
+            for endpoint, row in summary['endpoints'].items()
+        ]
+        prinf_table(rows, headers)
+        self.stdout.write(
+            f"Сессий {sessions}, запросов {summary['requests']} за {summary['seconds']:.1f} с: "
+            f"{summary['per_second']:.1f} запр/с, ошибок {summary['error_rate']:.1%}"
+        )
+        for error, count in summary['errors'].items():
+            self.stdout.write(self.style.WARNING(f'  {error}: {count}'))
+        if 'http_500' in summary['errors']:
+            self.stdout.write(
+                'Блокировки SQLite отличаются от других ошибок 500 только на '
+                'отладочной странице: проверьте, что сервер запущен с DEBUG = True'
+            )
@@ -0,0 +1,62 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+
+class Command(BaseCommand):
+    help = (
+        'Обновляет локальную реплику SQLite (settings.REPLICA_DATABASE_ALIAS) '
+        'копией основной базы через онлайн-бэкап SQLite; с --every повторяет '
+        'копирование с заданным интервалом'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--every',
+            type=float,
+            help='Обновлять реплику каждые N секунд, пока команду не остановят'
+        )
+        parser.add_argument('--pages', type=int, default=256, help='Страниц за один шаг копирования')
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=0.05,
+            help='Пауза между шагами в секундах: в это время база свободна для записи'
+        )
+
+    def handle(self, *args, **options):
+        alias = settings.REPLICA_DATABASE_ALIAS
+        source = settings.DATABASES[DEFAULT_DB_ALIAS]
+        replica = settings.DATABASES.get(alias)
+        if replica is None or {source['ENGINE'], replica['ENGINE']} != {'django.db.backends.sqlite3'}:
+            raise CommandError('Команда обновляет только реплику SQLite')
+        if not settings.REPLICA_ENABLED or replica['NAME'] == source['NAME']:
+            raise CommandError('Реплика не настроена: задайте переменную окружения SQLITE_REPLICA_PATH')
+        if options['pages'] < 1:
+            raise CommandError('--pages должно быть больше нуля')
+
+        while True:
+            started = time.monotonic()
+            self._copy(source['NAME'], replica['NAME'], options['pages'], options['sleep'])
+            elapsed = time.monotonic() - started
+            self.stdout.write(self.style.SUCCESS(f"Реплика обновлена: {replica['NAME']} ({elapsed:.1f} с)"))
+            if not options['every']:
+                break
+            time.sleep(max(options['every'] - elapsed, 0))
+
+    def _copy(self, source_path, replica_path, pages, sleep):
+        # Копирование идёт прямо в файл реплики: SQLite блокирует его на время
+        # записи, поэтому открытые соединения читателей видят либо старый,
+        # либо новый снимок целиком
+        source = sqlite3.connect(f'file:{source_path}?mode=ro', uri=True)
+        target = sqlite3.connect(replica_path, timeout=30)
+        try:
+            source.backup(target, pages=pages, sleep=sleep)
+        except sqlite3.Error as error:
+            raise CommandError(f'Ошибка копирования: {error}')
+        finally:
+            target.close()
+            source.close()
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from tracker.archive import ARCHIVE_CHUNK_SIZE, restore_students
+from tracker.models import ArchivedStudent
+
+
+class Command(BaseCommand):
+    help = 'Возвращает учеников из архива вместе с прохождениями и отчётами'
+
+    def add_arguments(self, parser):
+        parser.add_argument('student_ids', nargs='*', type=int, help='ID учеников в архиве')
+        parser.add_argument('--all', action='store_true', help='Вернуть весь архив')
+        parser.add_argument('--activate', action='store_true', help='Сразу сделать учеников активными')
+        parser.add_argument('--chunk-size', type=int, default=ARCHIVE_CHUNK_SIZE, help='Учеников в одной транзакции')
+
+    def handle(self, *args, **options):
+        if options['all']:
+            students = ArchivedStudent.objects.all()
+        elif options['student_ids']:
+            students = ArchivedStudent.objects.filter(pk__in=options['student_ids'])
+        else:
+            raise CommandError('Укажите ID учеников или --all')
+
+        restored = restore_students(students, activate=options['activate'], chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Возвращено из архива учеников: {restored}'))
@@ -0,0 +1,109 @@
+import multiprocessing
+import os
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from tracker import jobs
+from tracker.models import Job
+
+
+class Command(BaseCommand):
+    help = 'Воркер фоновых задач: забирает задачи из таблицы Job и выполняет их в пуле'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=2,
+            help='Сколько задач выполнять одновременно'
+        )
+        parser.add_argument(
+            '--processes',
+            action='store_true',
+            help='Пул процессов вместо пула потоков (для задач, нагружающих CPU)'
+        )
+        parser.add_argument(
+            '--poll',
+            type=float,
+            default=2.0,
+            help='Пауза в секундах между проверками пустой очереди'
+        )
+        parser.add_argument(
+            '--heartbeat',
+            type=float,
+            default=30.0,
+            help='Как часто в секундах отмечать выполняющиеся задачи и искать брошенные'
+        )
+        parser.add_argument(
+            '--stale-after',
+            type=int,
+            default=5,
+            help='Через сколько минут без сигнала воркера задачу считать брошенной и вернуть в очередь'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Выполнить задачи из очереди и завершиться'
+        )
+
+    def handle(self, *args, **options):
+        name = f'{socket.gethostname()}:{os.getpid()}'
+        stale_after = timedelta(minutes=options['stale_after'])
+        if stale_after.total_seconds() <= options['heartbeat']:
+            raise CommandError('--stale-after должен быть больше интервала --heartbeat')
+
+        if options['processes']:
+            # Процессы запускаются через spawn, без унаследованных соединений
+            # с базой, и настраивают Django заново до получения задач
+            connections.close_all()
+            pool = ProcessPoolExecutor(
+                options['workers'],
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=django.setup,
+            )
+        else:
+            pool = ThreadPoolExecutor(options['workers'], thread_name_prefix='job')
+
+        self.stdout.write(f"Воркер {name} запущен, задач одновременно: {options['workers']}")
+        running = {}
+        last_heartbeat = None
+        try:
+            with pool:
+                while True:
+                    # Сигнал идёт из основного потока: пока процесс воркера жив,
+                    # его задачи не считаются брошенными, сколько бы они ни шли
+                    now = time.monotonic()
+                    if last_heartbeat is None or now - last_heartbeat >= options['heartbeat']:
+                        last_heartbeat = now
+                        if running:
+                            jobs.heartbeat(name, running.values())
+                        requeued = jobs.requeue_stale(stale_after)
+                        if requeued:
+                            self.stdout.write(self.style.WARNING(f'Возвращено в очередь брошенных задач: {requeued}'))
+
+                    while len(running) < options['workers']:
+                        job_id = jobs.claim_job(name)
+                        if job_id is None:
+                            break
+                        self.stdout.write(f'Задача #{job_id} взята в работу')
+                        running[pool.submit(jobs.run_job, job_id)] = job_id
+
+                    if not running:
+                        if options['once']:
+                            break
+                        time.sleep(options['poll'])
+                        continue
+
+                    done, _ = wait(running, timeout=options['poll'], return_when=FIRST_COMPLETED)
+                    for future in done:
+                        job_id = running.pop(future)
+                        status = future.result()
+                        style = self.style.SUCCESS if status == Job.DONE else self.style.ERROR
+                        self.stdout.write(style(f'Задача #{job_id}: {status}'))
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('Воркер остановлен'))
@@ -0,0 +1,125 @@
+import json
+import os
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, transaction
+from tracker.dashboard import get_traffic_light_counts
+from tracker.db import is_locked_error, retry_on_locked
+from tracker.models import Lesson, Student
+
+
+MODES = ['stock', 'production']
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочная проверка SQLite: несколько процессов одновременно '
+        'сохраняют учеников и читают дашборд на копии базы, '
+        'для стандартных настроек и профиля SQLITE_PRODUCTION'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=8, help='Количество процессов')
+        parser.add_argument('--seconds', type=float, default=5, help='Длительность прогона')
+        parser.add_argument(
+            '--mode',
+            choices=MODES,
+            action='append',
+            help='Какие настройки проверить (по умолчанию обе)'
+        )
+        parser.add_argument('--child', action='store_true', help='Служебный режим процесса нагрузки')
+
+    def handle(self, *args, **options):
+        if options['child']:
+            self._run_child(options['seconds'])
+            return
+
+        if settings.DATABASES['default']['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError('Проверка нужна только для SQLite')
+
+        for mode in options['mode'] or MODES:
+            result = self._run_mode(mode, options['processes'], options['seconds'])
+            self.stdout.write(
+                f"{mode:<11} записей/с {result['writes_per_second']:8.1f}  "
+                f"ошибок блокировки {result['errors']:5}  "
+                f"запись p50 {result['p50']:7.1f} мс  p99 {result['p99']:7.1f} мс  "
+                f"чтений {result['reads']}"
+            )
+
+    def _run_mode(self, mode, processes, seconds):
+        # Каждый режим работает на свежей копии базы
+        fd, path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(fd)
+        try:
+            source = sqlite3.connect(settings.DATABASES['default']['NAME'])
+            target = sqlite3.connect(path)
+            source.backup(target)
+            source.close()
+            if mode == 'stock':
+                target.execute('PRAGMA journal_mode = DELETE')
+            target.close()
+
+            env = dict(os.environ, SQLITE_PATH=path, SQLITE_PRODUCTION='1' if mode == 'production' else '0')
+            command = [
+                sys.executable, os.path.join(settings.BASE_DIR, 'manage.py'),
+                'stress_sqlite', '--child', '--seconds', str(seconds),
+            ]
+            children = [
+                subprocess.Popen(command, env=env, stdout=subprocess.PIPE, text=True)
+                for _ in range(processes)
+            ]
+            results = [json.loads(child.communicate()[0].strip().splitlines()[-1]) for child in children]
+        finally:
+            for suffix in ('', '-wal', '-shm', '-journal'):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+        latencies = sorted(latency for result in results for latency in result['latencies'])
+        cuts = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 else [0] * 99
+        return {
+            'writes_per_second': len(latencies) / seconds,
+            'errors': sum(result['errors'] for result in results),
+            'reads': sum(result['reads'] for result in results),
+            'p50': cuts[49] * 1000,
+            'p99': cuts[98] * 1000,
+        }
+
+    def _run_child(self, seconds):
+        students = list(Student.objects.values_list('pk', flat=True))
+        lessons = list(Lesson.objects.values_list('pk', flat=True))
+        if not students or not lessons:
+            raise CommandError('Для проверки нужны ученики и уроки')
+
+        # Как сохранение в админке: чтение ученика и запись в одной транзакции
+        @retry_on_locked()
+        def write():
+            with transaction.atomic():
+                student = Student.objects.get(pk=random.choice(students))
+                student.last_homework_lesson_id = random.choice(lessons)
+                student.save(update_fields=['last_homework_lesson'])
+
+        latencies = []
+        errors = reads = 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                write()
+            except OperationalError as error:
+                if not is_locked_error(error):
+                    raise
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - started)
+            get_traffic_light_counts()
+            reads += 1
+
+        self.stdout.write(json.dumps({'latencies': latencies, 'errors': errors, 'reads': reads}))
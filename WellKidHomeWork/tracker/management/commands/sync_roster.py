@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand, CommandError
+from text_format import prinf_table
+from tracker.roster import ROSTER_CHUNK_SIZE, RosterError, apply_roster, diff_roster, read_roster
+
+
+class Command(BaseCommand):
+    help = (
+        'Сверяет учеников со списком зачисления (CSV): добавляет новых, '
+        'обновляет изменившихся и делает неактивными тех, кого нет в списке. '
+        'Записываются только отличия; повтор на том же файле ничего не меняет'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV-файл со списком учеников')
+        parser.add_argument('--delimiter', default=',', help='Разделитель столбцов (для Excel часто ";")')
+        parser.add_argument('--encoding', default='utf-8-sig', help='Кодировка файла')
+        parser.add_argument(
+            '--keep-missing',
+            action='store_true',
+            help='Не делать неактивными учеников, которых нет в списке (неполный файл)'
+        )
+        parser.add_argument('--chunk-size', type=int, default=ROSTER_CHUNK_SIZE, help='Учеников в одной транзакции')
+        parser.add_argument('--dry-run', action='store_true', help='Только показать отличия')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должен быть больше нуля')
+
+        try:
+            with open(options['path'], encoding=options['encoding'], newline='') as roster:
+                diff = diff_roster(
+                    read_roster(roster, delimiter=options['delimiter']),
+                    deactivate=not options['keep_missing'],
+                )
+        except OSError as error:
+            raise CommandError(f'Не удалось прочитать файл: {error}')
+        except RosterError as error:
+            raise CommandError(f'Список не загружен: {error}')
+
+        if options['verbosity'] >= 2:
+            for row in diff['create']:
+                self.stdout.write(f"+ {row['last_name']} {row['first_name']} {row.get('email', '')}")
+            for student, row, changed in diff['update']:
+                self.stdout.write(f"~ {student.pk} {student}: {', '.join(changed)}")
+            for student in diff['deactivate']:
+                self.stdout.write(f'- {student.pk} {student}')
+
+        prinf_table([
+            ['Новые ученики', len(diff['create'])],
+            ['Изменённые', len(diff['update'])],
+            ['Станут неактивными', len(diff['deactivate'])],
+            ['Без изменений', diff['unchanged']],
+            ['Новые группы', len(diff['groups'])],
+        ], ['Изменение', 'Количество'])
+
+        if not (diff['create'] or diff['update'] or diff['deactivate'] or diff['groups']):
+            self.stdout.write('Список совпадает с базой, ничего не записано')
+            return
+        if options['dry_run']:
+            self.stdout.write('Проверка без записи')
+            return
+
+        apply_roster(diff, chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS('Список учеников синхронизирован'))
@@ -0,0 +1,70 @@
+# Generated by Django 6.0.1 on 2026-10-19 01:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def group_numbers_to_groups(apps, schema_editor):
+    """Создаёт StudyGroup для каждого номера группы и проставляет ученикам FK"""
+    Student = apps.get_model('tracker', 'Student')
+    StudyGroup = apps.get_model('tracker', 'StudyGroup')
+
+    numbers = (
+        Student.objects.exclude(group_number='')
+        .order_by()
+        .values_list('group_number', flat=True)
+        .distinct()
+    )
+    for number in numbers:
+        group, _ = StudyGroup.objects.get_or_create(number=number.strip())
+        Student.objects.filter(group_number=number).update(group=group)
+
+
+def groups_to_group_numbers(apps, schema_editor):
+    Student = apps.get_model('tracker', 'Student')
+    StudyGroup = apps.get_model('tracker', 'StudyGroup')
+
+    for group in StudyGroup.objects.all():
+        Student.objects.filter(group=group).update(group_number=group.number)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='lesson',
+            options={'ordering': ['module', 'lesson'], 'verbose_name': 'Урок', 'verbose_name_plural': 'Уроки'},
+        ),
+        migrations.AlterModelOptions(
+            name='student',
+            options={'ordering': ['last_name', 'first_name'], 'verbose_name': 'Ученик', 'verbose_name_plural': 'Ученики'},
+        ),
+        migrations.CreateModel(
+            name='StudyGroup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.CharField(max_length=50, unique=True, verbose_name='Номер группы')),
+                ('schedule', models.CharField(blank=True, help_text='Например: Пн, Ср 18:00', max_length=200, verbose_name='Расписание')),
+                ('current_lesson', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='groups_current', to='tracker.lesson', verbose_name='Текущий урок')),
+            ],
+            options={
+                'verbose_name': 'Группа',
+                'verbose_name_plural': 'Группы',
+                'ordering': ['number'],
+            },
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='group',
+            field=models.ForeignKey(blank=True, help_text='Для группового формата', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='students', to='tracker.studygroup', verbose_name='Группа'),
+        ),
+        migrations.RunPython(group_numbers_to_groups, groups_to_group_numbers),
+        migrations.RemoveField(
+            model_name='student',
+            name='group_number',
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 6.0.1 on 2026-10-19 01:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0002_studygroup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='progress_version',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Увеличивается при каждом изменении прогресса, входит в ключи кэша', verbose_name='Версия прогресса'),
+        ),
+        migrations.CreateModel(
+            name='StudentLessonProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date_completed', models.DateField(verbose_name='Дата прохождения')),
+                ('homework_completed', models.BooleanField(default=False, verbose_name='ДЗ сдано')),
+                ('lesson', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progress', to='tracker.lesson', verbose_name='Урок')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tracker.student', verbose_name='Ученик')),
+            ],
+            options={
+                'verbose_name': 'Прогресс по уроку',
+                'verbose_name_plural': 'Прогресс по урокам',
+                'ordering': ['-date_completed', '-id'],
+                'unique_together': {('student', 'lesson')},
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-19 01:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0004_student_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='studentlessonprogress',
+            index=models.Index(fields=['student', '-date_completed', '-id'], name='tracker_progress_timeline'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 6.0.1 on 2026-10-19 01:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0005_studentlessonprogress_timeline_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AutomatedReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_start', models.DateField(verbose_name='Начало периода')),
+                ('period_end', models.DateField(verbose_name='Конец периода')),
+                ('lessons_completed', models.PositiveIntegerField(default=0, verbose_name='Уроков за период')),
+                ('homeworks_completed', models.PositiveIntegerField(default=0, verbose_name='ДЗ за период')),
+                ('total_lessons_completed', models.PositiveIntegerField(default=0, verbose_name='Уроков всего')),
+                ('total_homeworks_completed', models.PositiveIntegerField(default=0, verbose_name='ДЗ всего')),
+                ('last_progress_id', models.PositiveBigIntegerField(default=0, editable=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Создан')),
+            ],
+            options={
+                'verbose_name': 'Отчёт об успеваемости',
+                'verbose_name_plural': 'Отчёты об успеваемости',
+                'ordering': ['-period_end', '-id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='studentlessonprogress',
+            index=models.Index(fields=['student', 'id'], name='tracker_progress_watermark'),
+        ),
+        migrations.AddField(
+            model_name='automatedreport',
+            name='student',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='automated_reports', to='tracker.student', verbose_name='Ученик'),
+        ),
+        migrations.AddIndex(
+            model_name='automatedreport',
+            index=models.Index(fields=['student', '-period_end', '-id'], name='tracker_report_latest'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 6.0.1 on 2026-10-19 01:48
+
+from django.db import migrations, models
+
+
+def deactivate_graduates(apps, schema_editor):
+    """Ученики, сдавшие ДЗ последнего урока программы, — выпускники"""
+    Lesson = apps.get_model('tracker', 'Lesson')
+    Student = apps.get_model('tracker', 'Student')
+
+    final_lesson = Lesson.objects.order_by('-module', '-lesson').first()
+    if final_lesson is not None:
+        Student.objects.filter(last_homework_lesson=final_lesson).update(is_active=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0008_student_name_order'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='is_active',
+            field=models.BooleanField(default=True, help_text='Выпускники и ушедшие ученики неактивны и не попадают в списки, дашборды и отчёты', verbose_name='Активен'),
+        ),
+        migrations.RunPython(deactivate_graduates, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['last_name', 'first_name'], name='tracker_student_active_name'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['format'], name='tracker_student_active_format'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['group'], name='tracker_student_active_group'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.0.1 on 2026-10-19 01:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0009_student_is_active'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='student',
+            name='tracker_student_name_order',
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['last_name', 'first_name', '-id'], name='tracker_student_name_order'),
+        ),
+    ]
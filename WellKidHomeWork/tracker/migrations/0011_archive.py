@@ -0,0 +1,53 @@
+# Generated by Django 6.0.1 on 2026-10-19 01:53
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0010_student_name_order_desc'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedStudent',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID ученика')),
+                ('first_name', models.CharField(max_length=100, verbose_name='Имя')),
+                ('last_name', models.CharField(max_length=100, verbose_name='Фамилия')),
+                ('email', models.EmailField(max_length=254, verbose_name='Email')),
+                ('format', models.CharField(choices=[('group', 'Группа'), ('individual', 'Индивидуальный')], max_length=20, verbose_name='Формат обучения')),
+                ('first_lesson_date', models.DateField(verbose_name='Дата первого урока')),
+                ('progress_version', models.PositiveIntegerField(default=0, editable=False)),
+                ('updated_at', models.DateTimeField(verbose_name='Изменён')),
+                ('reports', models.JSONField(blank=True, default=list, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Отчёты об успеваемости')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='В архиве с')),
+                ('group', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='tracker.studygroup', verbose_name='Группа')),
+                ('last_homework_lesson', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='tracker.lesson', verbose_name='Последний урок с ДЗ')),
+                ('last_lesson', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='tracker.lesson', verbose_name='Последний урок')),
+            ],
+            options={
+                'verbose_name': 'Ученик в архиве',
+                'verbose_name_plural': 'Архив учеников',
+                'ordering': ['last_name', 'first_name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedLessonProgress',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('date_completed', models.DateField(verbose_name='Дата прохождения')),
+                ('homework_completed', models.BooleanField(default=False, verbose_name='ДЗ сдано')),
+                ('lesson', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='tracker.lesson', verbose_name='Урок')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progress', to='tracker.archivedstudent', verbose_name='Ученик')),
+            ],
+            options={
+                'verbose_name': 'Прохождение урока в архиве',
+                'verbose_name_plural': 'Прохождения уроков в архиве',
+                'ordering': ['-date_completed', '-id'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 01:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0011_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lesson',
+            name='topic',
+            field=models.CharField(blank=True, max_length=200, verbose_name='Тема'),
+        ),
+    ]
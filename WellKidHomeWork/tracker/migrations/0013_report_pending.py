@@ -0,0 +1,50 @@
+# Generated by Django 6.0.1 on 2026-10-19 02:10
+
+from django.db import migrations, models
+from django.db.models import Exists, F, OuterRef, Subquery
+
+
+def mark_reported(apps, schema_editor):
+    """
+    Ученики с отчётом и без прохождений после его отметки считаются
+    учтёнными, чтобы первый прогон после миграции не обходил весь ростер
+    """
+    Student = apps.get_model('tracker', 'Student')
+    AutomatedReport = apps.get_model('tracker', 'AutomatedReport')
+    StudentLessonProgress = apps.get_model('tracker', 'StudentLessonProgress')
+
+    latest = AutomatedReport.objects.filter(student=OuterRef('pk')).order_by('-period_end', '-pk')
+    Student.objects.alias(
+        report_mark=Subquery(latest.values('last_progress_id')[:1]),
+    ).filter(report_mark__isnull=False).exclude(Exists(
+        StudentLessonProgress.objects.filter(student=OuterRef('pk'), pk__gt=OuterRef('report_mark'))
+    )).update(reported_version=F('progress_version'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0012_lesson_topic'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='studentlessonprogress',
+            name='tracker_progress_watermark',
+        ),
+        migrations.AddField(
+            model_name='archivedstudent',
+            name='reported_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='reported_version',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='progress_version на момент последнего отчёта: ученик ждёт отчёта, пока версии различаются', verbose_name='Версия в последнем отчёте'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(condition=models.Q(('progress_version__gt', models.F('reported_version'))), fields=['id'], name='tracker_student_report_pending'),
+        ),
+        migrations.RunPython(mark_reported, migrations.RunPython.noop),
+    ]
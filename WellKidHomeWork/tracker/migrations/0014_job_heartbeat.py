@@ -0,0 +1,26 @@
+# Generated by Django 6.0.1 on 2026-10-19 02:17
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def start_heartbeat(apps, schema_editor):
+    """Выполняющиеся задачи получают сигнал на момент начала, как раньше считалась их давность"""
+    Job = apps.get_model('tracker', 'Job')
+    Job.objects.filter(status='running').update(heartbeat_at=F('started_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0013_report_pending'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Последний сигнал воркера'),
+        ),
+        migrations.RunPython(start_heartbeat, migrations.RunPython.noop),
+    ]
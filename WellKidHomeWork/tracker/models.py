@@ -1,12 +1,22 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
 
 from text_format import printf
 
+from .routers import note_write
+
+LESSON_MAP_CACHE_KEY = 'tracker:lesson_map'
+GROUP_FACETS_CACHE_KEY = 'tracker:group_facets'
+GROUP_DASHBOARD_CACHE_KEY = 'tracker:group_dashboard'
+
+
 class Lesson(models.Model):
     """Модель урока"""
     module = models.PositiveIntegerField(verbose_name='Модуль')
     lesson = models.PositiveIntegerField(verbose_name='Урок')
+    topic = models.CharField(max_length=200, blank=True, verbose_name='Тема')
     
     class Meta:
         ordering = ['module', 'lesson']
@@ -20,6 +30,123 @@ class Lesson(models.Model):
     @property
     def code(self):
         return f'М{self.module}У{self.lesson} ({(self.module - 1) * 4 + self.lesson})'
+    
+    @property
+    def number(self):
+        """Порядковый номер урока в программе"""
+        return (self.module - 1) * 4 + self.lesson
+    
+    @staticmethod
+    def code_for_number(number):
+        """Код урока по его порядковому номеру"""
+        return f'М{(number - 1) // 4 + 1}У{(number - 1) % 4 + 1} ({number})'
+    
+    @staticmethod
+    def number_expression(field):
+        """Выражение порядкового номера урока по внешнему ключу field для запросов"""
+        return (models.F(f'{field}__module') - 1) * 4 + models.F(f'{field}__lesson')
+    
+    @staticmethod
+    def lessons_behind(last_lesson, last_homework):
+        """
+        Отставание по ДЗ в уроках по записям get_map() (код, номер)
+        последнего урока и урока с ДЗ: None без урока, а без ДЗ
+        отставание равно номеру урока.
+        """
+        if last_lesson is None:
+            return None
+        return last_lesson[1] - (last_homework[1] if last_homework else 0)
+    
+    @classmethod
+    def get_map(cls):
+        """
+        Словарь {id: (код, порядковый номер)} для всех уроков.
+        Уроков немного и меняются они редко, поэтому словарь хранится в кэше
+        и избавляет от загрузки FK на каждую строку при выгрузках.
+        """
+        lesson_map = cache.get(LESSON_MAP_CACHE_KEY)
+        if lesson_map is None:
+            lesson_map = {
+                lesson.pk: (lesson.code, lesson.number)
+                for lesson in cls.objects.all()
+            }
+            cache.set(LESSON_MAP_CACHE_KEY, lesson_map, 60 * 60)
+        return lesson_map
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        cache.delete(LESSON_MAP_CACHE_KEY)
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        cache.delete(LESSON_MAP_CACHE_KEY)
+        return result
+
+class StudyGroup(models.Model):
+    """Модель учебной группы"""
+    number = models.CharField(max_length=50, unique=True, verbose_name='Номер группы')
+    schedule = models.CharField(
+        max_length=200,
+        blank=True,
+        verbose_name='Расписание',
+        help_text='Например: Пн, Ср 18:00'
+    )
+    current_lesson = models.ForeignKey(
+        Lesson,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='groups_current',
+        verbose_name='Текущий урок'
+    )
+    
+    class Meta:
+        ordering = ['number']
+        verbose_name = "Группа"
+        verbose_name_plural = "Группы"
+    
+    def __str__(self):
+        return self.number
+    
+    @classmethod
+    def get_facets(cls):
+        """
+        Список (id, номер, количество активных учеников) для фильтра в админке.
+        Считается одним GROUP BY по внешнему ключу и хранится в кэше
+        до изменения состава групп.
+        """
+        facets = cache.get(GROUP_FACETS_CACHE_KEY)
+        if facets is None:
+            facets = list(
+                cls.objects.annotate(
+                    students_count=models.Count('students', filter=models.Q(students__is_active=True))
+                ).values_list('pk', 'number', 'students_count')
+            )
+            cache.set(GROUP_FACETS_CACHE_KEY, facets, 60 * 60)
+        return facets
+    
+    @classmethod
+    def invalidate_caches(cls):
+        """Сбрасывает кэши, зависящие от состава групп"""
+        cache.delete_many([GROUP_FACETS_CACHE_KEY, GROUP_DASHBOARD_CACHE_KEY])
+        note_write()
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.invalidate_caches()
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self.invalidate_caches()
+        return result
+
+
+class ActiveStudentManager(models.Manager):
+    """Только активные ученики: запросы идут по частичным индексам is_active"""
+    
+    def get_queryset(self):
+        return super().get_queryset().filter(is_active=True)
+
 
 class Student(models.Model):
     """Модель ученика"""
@@ -34,16 +161,24 @@ class Student(models.Model):
         (INDIVIDUAL, 'Индивидуальный'),
     ]
     
+    # Уровни отставания («светофор»)
+    GREEN = 'green'
+    YELLOW = 'yellow'
+    RED = 'red'
+    
     format = models.CharField(
         max_length=20,
         choices=FORMAT_CHOICES,
         default=GROUP,
         verbose_name='Формат обучения'
     )
-    group_number = models.CharField(
-        max_length=50,
-        verbose_name='Номер группы',
+    group = models.ForeignKey(
+        StudyGroup,
+        on_delete=models.SET_NULL,
+        null=True,
         blank=True,
+        related_name='students',
+        verbose_name='Группа',
         help_text='Для группового формата'
     )
     
@@ -63,9 +198,61 @@ class Student(models.Model):
         related_name='students_homework',
         verbose_name='Последний урок с ДЗ'
     )
+    is_active = models.BooleanField(
+        default=True,
+        verbose_name='Активен',
+        help_text='Выпускники и ушедшие ученики неактивны и не попадают в списки, дашборды и отчёты'
+    )
+    progress_version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Версия прогресса',
+        help_text='Увеличивается при каждом изменении прогресса, входит в ключи кэша'
+    )
+    reported_version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Версия в последнем отчёте',
+        help_text='progress_version на момент последнего отчёта: ученик ждёт отчёта, пока версии различаются'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name='Изменён'
+    )
+    
+    objects = models.Manager()
+    active = ActiveStudentManager()
     
     class Meta:
         ordering = ['last_name', 'first_name']
+        indexes = [
+            # Листание списка в админке по курсору: порядок (фамилия, имя, -pk)
+            models.Index(fields=['last_name', 'first_name', '-id'], name='tracker_student_name_order'),
+            # Частичные индексы только по активным ученикам (Student.active)
+            models.Index(
+                fields=['last_name', 'first_name'],
+                condition=models.Q(is_active=True),
+                name='tracker_student_active_name',
+            ),
+            models.Index(
+                fields=['format'],
+                condition=models.Q(is_active=True),
+                name='tracker_student_active_format',
+            ),
+            models.Index(
+                fields=['group'],
+                condition=models.Q(is_active=True),
+                name='tracker_student_active_group',
+            ),
+            # Ученики с изменениями после последнего отчёта (reports.pending_students):
+            # индекс содержит только их, поэтому прогон не читает весь ростер
+            models.Index(
+                fields=['id'],
+                condition=models.Q(progress_version__gt=models.F('reported_version')),
+                name='tracker_student_report_pending',
+            ),
+        ]
         
         verbose_name = "Ученик"
         verbose_name_plural = "Ученики"
@@ -80,18 +267,293 @@ class Student(models.Model):
     
     @property
     def lessons_behind(self):
-        """Вычисляет, на сколько уроков отстаёт ученик"""
-        if not self.last_lesson or not self.last_homework_lesson:
-            return ((self.last_lesson.module-1) * 4) + self.last_lesson.lesson
-        
-        # Вычисляем порядковый номер уроков
-        last_lesson_num = ((self.last_lesson.module-1) * 4) + self.last_lesson.lesson
-        last_hw_lesson_num = ((self.last_homework_lesson.module - 1) * 4) + self.last_homework_lesson.lesson
-        
-        return last_lesson_num - last_hw_lesson_num
+        """Вычисляет, на сколько уроков отстаёт ученик (см. Lesson.lessons_behind)"""
+        lesson_map = Lesson.get_map()
+        return Lesson.lessons_behind(
+            lesson_map.get(self.last_lesson_id),
+            lesson_map.get(self.last_homework_lesson_id),
+        )
+    
+    @classmethod
+    def backlog_level(cls, behind):
+        """Уровень светофора для отставания в уроках"""
+        if behind <= 0:
+            return cls.GREEN
+        if behind <= 2:
+            return cls.YELLOW
+        return cls.RED
+    
+    # Поля, изменение которых сбрасывает кэши (см. save)
+    PROGRESS_FIELDS = ['last_lesson_id', 'last_homework_lesson_id']
+    TRACKED_FIELDS = ['group_id', 'is_active'] + PROGRESS_FIELDS
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем исходные значения, чтобы сбрасывать кэши только при их смене
+        instance._loaded_values = {
+            field: instance.__dict__.get(field)
+            for field in cls.TRACKED_FIELDS
+        }
+        return instance
+    
+    def _changed(self, field):
+        loaded = getattr(self, '_loaded_values', {})
+        return field not in loaded or loaded[field] != getattr(self, field)
     
     def save(self, *args, **kwargs):
-        # Очищаем номер группы для индивидуального формата
+        # Очищаем группу для индивидуального формата
         if self.format == self.INDIVIDUAL:
-            self.group_number = ''
-        super().save(*args, **kwargs)
\ No newline at end of file
+            self.group = None
+        adding = self._state.adding
+        
+        # Прогресс поменяли вручную — снимок в кэше устарел, увеличиваем версию
+        update_fields = kwargs.get('update_fields')
+        progress_changed = not adding and any(
+            self._changed(field) for field in self.PROGRESS_FIELDS
+            if update_fields is None or field[:-3] in update_fields
+        )
+        if progress_changed:
+            self.progress_version = models.F('progress_version') + 1
+            if update_fields is not None:
+                kwargs['update_fields'] = list(update_fields) + ['progress_version']
+        
+        super().save(*args, **kwargs)
+        
+        if progress_changed:
+            self.refresh_from_db(fields=['progress_version'])
+            from .live import publish_progress_change
+            publish_progress_change(
+                self.pk,
+                tuple(self._loaded_values[field] for field in self.PROGRESS_FIELDS),
+                tuple(getattr(self, field) for field in self.PROGRESS_FIELDS),
+            )
+        if adding or self._changed('group_id') or self._changed('is_active'):
+            StudyGroup.invalidate_caches()
+        if not adding and self._changed('is_active'):
+            from .bulk import invalidate_progress_caches
+            invalidate_progress_caches()
+        self._loaded_values = {
+            field: getattr(self, field)
+            for field in self.TRACKED_FIELDS
+        }
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        StudyGroup.invalidate_caches()
+        return result
+
+
+class StudentLessonProgress(models.Model):
+    """Прохождение урока учеником"""
+    student = models.ForeignKey(
+        Student,
+        on_delete=models.CASCADE,
+        verbose_name='Ученик'
+    )
+    lesson = models.ForeignKey(
+        Lesson,
+        on_delete=models.CASCADE,
+        related_name='progress',
+        verbose_name='Урок'
+    )
+    date_completed = models.DateField(verbose_name='Дата прохождения')
+    homework_completed = models.BooleanField(default=False, verbose_name='ДЗ сдано')
+    
+    class Meta:
+        ordering = ['-date_completed', '-id']
+        unique_together = ['student', 'lesson']
+        indexes = [
+            # Последние прохождения и лента ученика с курсором по (дата, id)
+            models.Index(
+                fields=['student', '-date_completed', '-id'],
+                name='tracker_progress_timeline',
+            ),
+        ]
+        verbose_name = "Прогресс по уроку"
+        verbose_name_plural = "Прогресс по урокам"
+    
+    def __str__(self):
+        return f'{self.student} — {self.lesson.code}'
+
+class AutomatedReport(models.Model):
+    """
+    Отчёт об успеваемости за период с накопленными итогами.
+    
+    last_progress_id — отметка: самое большое id прохождения, учтённого в
+    отчёте. Следующий отчёт обрабатывает только прохождения с id больше
+    отметки и прибавляет их к итогам предыдущего отчёта. ДЗ засчитываются
+    сдвигом Student.last_homework_lesson (в том числе массовыми действиями),
+    поэтому total_homeworks_completed — номер последнего урока с ДЗ.
+    """
+    student = models.ForeignKey(
+        Student,
+        on_delete=models.CASCADE,
+        related_name='automated_reports',
+        verbose_name='Ученик'
+    )
+    period_start = models.DateField(verbose_name='Начало периода')
+    period_end = models.DateField(verbose_name='Конец периода')
+    lessons_completed = models.PositiveIntegerField(default=0, verbose_name='Уроков за период')
+    homeworks_completed = models.PositiveIntegerField(default=0, verbose_name='ДЗ за период')
+    total_lessons_completed = models.PositiveIntegerField(default=0, verbose_name='Уроков всего')
+    total_homeworks_completed = models.PositiveIntegerField(default=0, verbose_name='ДЗ всего')
+    last_progress_id = models.PositiveBigIntegerField(default=0, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Создан')
+    
+    class Meta:
+        ordering = ['-period_end', '-id']
+        indexes = [
+            # Последний отчёт ученика для отметки
+            models.Index(
+                fields=['student', '-period_end', '-id'],
+                name='tracker_report_latest',
+            ),
+        ]
+        verbose_name = "Отчёт об успеваемости"
+        verbose_name_plural = "Отчёты об успеваемости"
+    
+    def __str__(self):
+        return f'{self.student}: {self.period_start} — {self.period_end}'
+
+
+class Job(models.Model):
+    """
+    Фоновая задача. Очередью служит сама таблица: воркер (run_worker)
+    забирает задачу условным UPDATE со статуса «В очереди», поэтому одну
+    задачу не возьмут два воркера. Пока задача выполняется, воркер
+    обновляет heartbeat_at; задачу без сигнала дольше заданного времени
+    другой воркер возвращает в очередь. Обработчики задач — в tracker/jobs.py.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    
+    STATUS_CHOICES = [
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Готово'),
+        (FAILED, 'Ошибка'),
+    ]
+    
+    kind = models.CharField(max_length=50, verbose_name='Задача')
+    params = models.JSONField(default=dict, blank=True, verbose_name='Параметры')
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+        verbose_name='Статус'
+    )
+    progress = models.PositiveSmallIntegerField(default=0, verbose_name='Прогресс, %')
+    result = models.JSONField(null=True, blank=True, verbose_name='Результат')
+    error = models.TextField(blank=True, verbose_name='Ошибка')
+    worker = models.CharField(max_length=100, blank=True, verbose_name='Воркер')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Создана')
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name='Начата')
+    heartbeat_at = models.DateTimeField(null=True, blank=True, verbose_name='Последний сигнал воркера')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='Завершена')
+    
+    class Meta:
+        ordering = ['-id']
+        indexes = [
+            # Выборка следующей задачи из очереди
+            models.Index(fields=['status', 'id'], name='tracker_job_queue'),
+        ]
+        verbose_name = "Фоновая задача"
+        verbose_name_plural = "Фоновые задачи"
+    
+    def __str__(self):
+        return f'{self.kind} #{self.pk}'
+    
+    def set_progress(self, progress):
+        """Сохраняет прогресс (0–100) одним UPDATE, не трогая остальные поля"""
+        self.progress = max(0, min(100, int(progress)))
+        Job.objects.filter(pk=self.pk).update(progress=self.progress)
+
+
+class ArchivedStudent(models.Model):
+    """
+    Ученик в архиве. Давно неактивные ученики переносятся сюда вместе с
+    прохождениями и отчётами (manage.py archive_students), чтобы не раздувать
+    индексы и подсчёты живых таблиц, и возвращаются restore_students.
+    Первичный ключ — id ученика, при восстановлении он сохраняется.
+    """
+    id = models.BigIntegerField(primary_key=True, verbose_name='ID ученика')
+    first_name = models.CharField(max_length=100, verbose_name='Имя')
+    last_name = models.CharField(max_length=100, verbose_name='Фамилия')
+    email = models.EmailField(verbose_name='Email')
+    format = models.CharField(
+        max_length=20,
+        choices=Student.FORMAT_CHOICES,
+        verbose_name='Формат обучения'
+    )
+    group = models.ForeignKey(
+        StudyGroup,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Группа'
+    )
+    first_lesson_date = models.DateField(verbose_name='Дата первого урока')
+    last_lesson = models.ForeignKey(
+        Lesson,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='+',
+        verbose_name='Последний урок'
+    )
+    last_homework_lesson = models.ForeignKey(
+        Lesson,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Последний урок с ДЗ'
+    )
+    progress_version = models.PositiveIntegerField(default=0, editable=False)
+    reported_version = models.PositiveIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(verbose_name='Изменён')
+    reports = models.JSONField(
+        default=list,
+        blank=True,
+        encoder=DjangoJSONEncoder,
+        verbose_name='Отчёты об успеваемости'
+    )
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name='В архиве с')
+    
+    class Meta:
+        ordering = ['last_name', 'first_name']
+        verbose_name = "Ученик в архиве"
+        verbose_name_plural = "Архив учеников"
+    
+    def __str__(self):
+        return f'{self.last_name} {self.first_name}'
+
+
+class ArchivedLessonProgress(models.Model):
+    """Прохождение урока учеником из архива (id прохождения сохраняется)"""
+    id = models.BigIntegerField(primary_key=True)
+    student = models.ForeignKey(
+        ArchivedStudent,
+        on_delete=models.CASCADE,
+        related_name='progress',
+        verbose_name='Ученик'
+    )
+    lesson = models.ForeignKey(
+        Lesson,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Урок'
+    )
+    date_completed = models.DateField(verbose_name='Дата прохождения')
+    homework_completed = models.BooleanField(default=False, verbose_name='ДЗ сдано')
+    
+    class Meta:
+        ordering = ['-date_completed', '-id']
+        verbose_name = "Прохождение урока в архиве"
+        verbose_name_plural = "Прохождения уроков в архиве"
+    
+    def __str__(self):
+        return f'{self.student} - {self.lesson}'
@@ -0,0 +1,199 @@
+"""
+Постраничный вывод списка учеников в админке без OFFSET и полного COUNT.
+
+Страницы листаются по курсору: значения колонок сортировки первой или
+последней строки страницы. Следующая страница выбирается условием «после
+курсора» в том же порядке и идёт по индексу сортировки, поэтому любая
+страница стоит столько же, сколько первая.
+
+Точное число строк считается только до EXACT_COUNT_LIMIT (COUNT по
+подзапросу с LIMIT). Если строк больше, показывается число, посчитанное
+полностью не чаще раза в COUNT_CACHE_TIMEOUT секунд для каждого набора
+фильтров, с пометкой «≈». Так же считается и число строк без фильтров
+(show_full_result_count).
+"""
+import base64
+import hashlib
+import json
+
+from django.contrib.admin.views.main import ALL_VAR, ChangeList
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+AFTER_VAR = 'after'
+BEFORE_VAR = 'before'
+
+EXACT_COUNT_LIMIT = 1000
+COUNT_CACHE_TIMEOUT = 300
+COUNT_CACHE_KEY = 'tracker:changelist_count:{}'
+
+
+def bounded_count(queryset):
+    """
+    (число строк, приблизительное ли оно): точное до EXACT_COUNT_LIMIT,
+    выше — полный COUNT из кэша не старше COUNT_CACHE_TIMEOUT
+    """
+    queryset = queryset.order_by()
+    limited = queryset[:EXACT_COUNT_LIMIT + 1].count()
+    if limited <= EXACT_COUNT_LIMIT:
+        return limited, False
+
+    sql, params = queryset.values('pk').query.sql_with_params()
+    digest = hashlib.md5(repr((sql, params)).encode()).hexdigest()
+    return cache.get_or_set(COUNT_CACHE_KEY.format(digest), queryset.count, COUNT_CACHE_TIMEOUT), True
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator с точным числом строк до EXACT_COUNT_LIMIT и кэшированным выше"""
+
+    count_is_estimated = False
+
+    @cached_property
+    def count(self):
+        count, self.count_is_estimated = bounded_count(self.object_list)
+        return count
+
+
+def encode_cursor(values):
+    data = json.dumps(values, cls=DjangoJSONEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, fields):
+    """Курсор в список значений полей fields, None для испорченного"""
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(data)
+        if not isinstance(values, list) or len(values) != len(fields):
+            return None
+        return [field.to_python(value) for field, value in zip(fields, values)]
+    except (ValueError, TypeError, ValidationError):
+        return None
+
+
+def keyset_filter(ordering, values, forward=True):
+    """
+    Условие «строго после значений values» для сортировки
+    [(имя поля, по убыванию), ...]; forward=False — «строго до».
+    """
+    condition = Q()
+    equal = Q()
+    for (name, descending), value in zip(ordering, values):
+        lookup = 'lt' if descending == forward else 'gt'
+        condition |= equal & Q(**{f'{name}__{lookup}': value})
+        equal &= Q(**{name: value})
+    return condition
+
+
+class KeysetChangeList(ChangeList):
+    """
+    ChangeList с листанием по курсору (?after= / ?before=), если сортировка
+    состоит только из обязательных полей модели и заканчивается первичным
+    ключом. При сортировке по связанным или необязательным полям остаются
+    обычные номера страниц.
+    """
+
+    def __init__(self, request, *args, **kwargs):
+        self.keyset = False
+        self.keyset_next_url = self.keyset_previous_url = self.keyset_first_url = None
+        self.keyset_show_all_url = None
+        super().__init__(request, *args, **kwargs)
+        # Скрытые поля формы поиска не переносят курсор
+        self.params.pop(AFTER_VAR, None)
+        self.params.pop(BEFORE_VAR, None)
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(AFTER_VAR, None)
+        lookup_params.pop(BEFORE_VAR, None)
+        return lookup_params
+
+    @property
+    def count_is_estimated(self):
+        return getattr(self.paginator, 'count_is_estimated', False)
+
+    def get_keyset_ordering(self):
+        """[(поле модели, по убыванию), ...] или None, если курсор не подходит"""
+        ordering = []
+        for item in self.queryset.query.order_by:
+            if not isinstance(item, str):
+                return None
+            descending = item.startswith('-')
+            name = item.removeprefix('-')
+            try:
+                field = self.lookup_opts.pk if name == 'pk' else self.lookup_opts.get_field(name)
+            except FieldDoesNotExist:
+                return None
+            if field.is_relation or field.null or not field.concrete:
+                return None
+            ordering.append((field, descending))
+            if field.primary_key:
+                return ordering
+        return None
+
+    def get_results(self, request):
+        ordering = self.get_keyset_ordering()
+        if ordering is None:
+            return super().get_results(request)
+
+        # То же, что ChangeList.get_results, но без страницы по OFFSET
+        # (номер страницы не используется) и без полного COUNT всей таблицы
+        self.paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        self.result_count = self.paginator.count
+        self.show_full_result_count = self.model_admin.show_full_result_count
+        if self.show_full_result_count:
+            self.full_result_count, _ = bounded_count(self.root_queryset)
+        else:
+            self.full_result_count = None
+        self.show_admin_actions = not self.show_full_result_count or bool(self.full_result_count)
+        self.can_show_all = self.result_count <= self.list_max_show_all
+        self.multi_page = self.result_count > self.list_per_page
+        if not self.multi_page or (self.show_all and self.can_show_all):
+            self.result_list = self.queryset._clone()
+            return
+
+        self.keyset = True
+        fields = [field for field, descending in ordering]
+        names = [(field.attname, descending) for field, descending in ordering]
+        after = request.GET.get(AFTER_VAR)
+        before = request.GET.get(BEFORE_VAR)
+        cursor = decode_cursor(after or before or '', fields)
+        forward = not (before and cursor is not None)
+
+        queryset = self.queryset
+        if cursor is not None:
+            queryset = queryset.filter(keyset_filter(names, cursor, forward))
+        if not forward:
+            queryset = queryset.reverse()
+        # Лишняя строка показывает, есть ли страница дальше
+        rows = list(queryset[:self.list_per_page + 1])
+        has_more = len(rows) > self.list_per_page
+        rows = rows[:self.list_per_page]
+        if not forward:
+            rows.reverse()
+
+        has_next = has_more if forward else True
+        has_previous = cursor is not None and (forward or has_more)
+        if rows and has_next:
+            self.keyset_next_url = self.get_query_string({AFTER_VAR: self._row_cursor(rows[-1], fields)})
+        if rows and has_previous:
+            self.keyset_previous_url = self.get_query_string({BEFORE_VAR: self._row_cursor(rows[0], fields)})
+        if cursor is not None:
+            self.keyset_first_url = self.get_query_string()
+        if self.can_show_all:
+            self.keyset_show_all_url = self.get_query_string({ALL_VAR: ''})
+        self.result_list = rows
+
+    def get_query_string(self, new_params=None, remove=None):
+        # Ссылки фильтров, сортировки и выгрузки начинают список с начала
+        new_params = {AFTER_VAR: None, BEFORE_VAR: None, **(new_params or {})}
+        return super().get_query_string(new_params, remove)
+
+    @staticmethod
+    def _row_cursor(obj, fields):
+        return encode_cursor([getattr(obj, field.attname) for field in fields])
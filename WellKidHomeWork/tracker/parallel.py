@@ -0,0 +1,58 @@
+"""
+Параллельное выполнение независимых выборок для асинхронных представлений.
+
+Асинхронный ORM Django (acount, aget, async for) выполняет все запросы в
+одном потоке через sync_to_async(thread_sensitive=True), то есть по очереди.
+Здесь каждая выборка запускается в отдельном потоке со своим соединением
+с базой, поэтому время ответа определяется самой долгой выборкой, а не
+суммой всех.
+
+Потоки не видят незафиксированных изменений транзакции вызывающего кода,
+поэтому использовать это можно только для чтения вне atomic().
+fetch_in_threads() запускает те же выборки из синхронного представления
+(админка) и внутри транзакции выполняет их по очереди.
+"""
+import asyncio
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+
+
+def _in_own_connection(fetch):
+    def wrapper():
+        try:
+            return fetch()
+        finally:
+            # Соединение потока закрывается с учётом CONN_MAX_AGE
+            close_old_connections()
+    return wrapper
+
+
+async def fetch_concurrently(fetchers):
+    """
+    Выполняет выборки {имя: функция} одновременно и возвращает
+    {имя: результат}. Функции должны возвращать уже вычисленные данные
+    (list(...), count()), а не ленивые QuerySet.
+    """
+    names = list(fetchers)
+    results = await asyncio.gather(*(
+        sync_to_async(_in_own_connection(fetchers[name]), thread_sensitive=False)()
+        for name in names
+    ))
+    return dict(zip(names, results))
+
+
+def fetch_sequentially(fetchers):
+    """Те же выборки по очереди, для синхронных представлений и сравнения"""
+    return {name: fetch() for name, fetch in fetchers.items()}
+
+
+def fetch_in_threads(fetchers, using=DEFAULT_DB_ALIAS):
+    """
+    fetch_concurrently() для синхронного кода. Внутри atomic() выборки
+    идут по очереди в текущем соединении: потоки не увидели бы данных
+    незафиксированной транзакции.
+    """
+    if connections[using].in_atomic_block:
+        return fetch_sequentially(fetchers)
+    return async_to_sync(fetch_concurrently)(fetchers)
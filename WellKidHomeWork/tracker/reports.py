@@ -0,0 +1,293 @@
+"""
+Инкрементальная генерация отчётов об успеваемости.
+
+Каждый отчёт хранит накопленные итоги и отметку last_progress_id. Новый
+отчёт учитывает только прохождения с id больше отметки предыдущего отчёта
+и прибавляет их к его итогам. ДЗ засчитываются сдвигом последнего урока с ДЗ
+у ученика (сигнал прохождений, массовые действия в админке), поэтому итог
+по ДЗ — номер этого урока, а за период — разница с предыдущим отчётом.
+
+Кого обрабатывать, решает Student.reported_version: любое изменение прогресса
+увеличивает progress_version, отчёт запоминает её. Ученики с различающимися
+версиями лежат в частичном индексе, поэтому прогон читает только учеников с
+изменениями и их новые прохождения, а не весь ростер.
+
+Отметка — id, а не дата: прохождение, внесённое задним числом, всё равно
+попадёт в следующий отчёт.
+
+Для аналитики отчёт по всему ростеру можно выгрузить в файлы (JSONL.gz и
+Parquet или CSV.gz) без создания строк в базе: ученики читаются порциями,
+итоги по каждой порции считаются одним GROUP BY и сразу дописываются в файлы.
+ДЗ в файлах считаются так же, как в отчётах в базе: итог — номер последнего
+урока с ДЗ, за период — разница с итогом последнего отчёта до начала периода.
+"""
+import csv
+import gzip
+import json
+import operator
+from functools import reduce
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import AutomatedReport, Lesson, Student, StudentLessonProgress
+from .routers import replica_iterator
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # без pyarrow столбцовый файл пишется в CSV.gz
+    pa = pq = None
+
+
+REPORT_CHUNK_SIZE = 500
+
+# Длина периода первого отчёта в днях
+PERIOD_DAYS = {
+    'week': 7,
+    'month': 30,
+    'quarter': 90,
+}
+
+OUTPUT_CHUNK_SIZE = 5000
+
+OUTPUT_COLUMNS = [
+    'student_id',
+    'last_name',
+    'first_name',
+    'group',
+    'period_start',
+    'period_end',
+    'lessons_completed',
+    'homeworks_completed',
+    'total_lessons_completed',
+    'total_homeworks_completed',
+    'last_lesson',
+    'last_homework_lesson',
+    'lessons_behind',
+]
+
+
+def pending_students(students):
+    """
+    Ученики с изменениями прогресса после последнего отчёта, с id и отметкой
+    этого отчёта. Условие совпадает с частичным индексом
+    tracker_student_report_pending, подзапросы выполняются только для них.
+    """
+    latest = AutomatedReport.objects.filter(student=OuterRef('pk')).order_by('-period_end', '-pk')
+    return students.filter(progress_version__gt=F('reported_version')).annotate(
+        previous_report_id=Subquery(latest.values('pk')[:1]),
+        report_mark=Coalesce(Subquery(latest.values('last_progress_id')[:1]), 0),
+    )
+
+
+def _new_progress(marks):
+    """
+    Новые прохождения по ученикам: (уроков, ДЗ, максимальный id, первая дата).
+    Для каждого ученика читаются только строки после его отметки (диапазон
+    по индексу внешнего ключа student_id, в SQLite он включает id).
+    """
+    if not marks:
+        return {}
+    rows = StudentLessonProgress.objects.filter(reduce(operator.or_, (
+        Q(student_id=student_id, pk__gt=mark) for student_id, mark in marks.items()
+    ))).order_by().values_list('student_id', 'pk', 'date_completed')
+
+    progress = {}
+    for student_id, pk, date_completed in rows.iterator():
+        lessons, last_id, first_date = progress.get(student_id, (0, 0, date_completed))
+        progress[student_id] = (lessons + 1, max(last_id, pk), min(first_date, date_completed))
+    return progress
+
+
+def generate_reports(students, period_start, period_end, chunk_size=REPORT_CHUNK_SIZE, progress=None):
+    """
+    Создаёт отчёты для учеников с новыми прохождениями или ДЗ и возвращает их.
+    Первый отчёт ученика учитывает всю историю и начинается с period_start или
+    с даты первого учтённого прохождения, если она раньше; дальше период
+    начинается с конца предыдущего отчёта. progress(n) вызывается после
+    каждой порции с числом обработанных учеников.
+    """
+    created = []
+    processed = 0
+    pending = pending_students(students).order_by('pk')
+    chunk = []
+    for student in pending.iterator(chunk_size=chunk_size):
+        chunk.append(student)
+        if len(chunk) == chunk_size:
+            created += _create_reports(chunk, period_start, period_end)
+            processed += len(chunk)
+            if progress:
+                progress(processed)
+            chunk = []
+    if chunk:
+        created += _create_reports(chunk, period_start, period_end)
+        if progress:
+            progress(processed + len(chunk))
+    return created
+
+
+def _create_reports(students, period_start, period_end):
+    previous = AutomatedReport.objects.in_bulk(
+        [student.previous_report_id for student in students if student.previous_report_id]
+    )
+    progress = _new_progress({student.pk: student.report_mark for student in students})
+    lesson_map = Lesson.get_map()
+
+    reports = []
+    for student in students:
+        last_report = previous.get(student.previous_report_id)
+        lessons, last_id, first_date = progress.get(student.pk, (0, student.report_mark, None))
+        homework = lesson_map.get(student.last_homework_lesson_id)
+        total_homeworks = homework[1] if homework else 0
+        homeworks = max(total_homeworks - (last_report.total_homeworks_completed if last_report else 0), 0)
+        # Изменения без новых уроков и ДЗ (перевод на урок без прохождения,
+        # откат ДЗ) отчёта не дают, но версия всё равно отмечается ниже
+        if not lessons and not homeworks:
+            continue
+
+        if last_report:
+            start = last_report.period_end
+        else:
+            start = min(period_start, first_date) if first_date else period_start
+        reports.append(AutomatedReport(
+            student=student,
+            period_start=start,
+            period_end=period_end,
+            lessons_completed=lessons,
+            homeworks_completed=homeworks,
+            total_lessons_completed=(last_report.total_lessons_completed if last_report else 0) + lessons,
+            total_homeworks_completed=total_homeworks,
+            last_progress_id=last_id,
+        ))
+
+    for student in students:
+        student.reported_version = student.progress_version
+
+    with transaction.atomic():
+        created = AutomatedReport.objects.bulk_create(reports)
+        # Версия, прочитанная вместе с учеником: изменение, сделанное во время
+        # прогона, оставит ученика в очереди до следующего
+        Student.objects.bulk_update(students, ['reported_version'])
+    return created
+
+
+def _output_chunks(students, period_start, period_end, chunk_size):
+    """Порции строк отчёта по ростеру: список словарей OUTPUT_COLUMNS"""
+    lesson_map = Lesson.get_map()
+    before = AutomatedReport.objects.filter(
+        student=OuterRef('pk'), period_end__lte=period_start,
+    ).order_by('-period_end', '-pk')
+    rows = students.order_by('pk').annotate(
+        homeworks_before=Coalesce(Subquery(before.values('total_homeworks_completed')[:1]), 0),
+    ).values_list(
+        'pk', 'last_name', 'first_name', 'group__number',
+        'last_lesson_id', 'last_homework_lesson_id', 'homeworks_before',
+    ).iterator(chunk_size=chunk_size)
+
+    def build(chunk):
+        in_period = Q(date_completed__range=(period_start, period_end))
+        totals = {
+            row['student_id']: row
+            for row in StudentLessonProgress.objects.filter(
+                student_id__in=[student[0] for student in chunk]
+            ).order_by().values('student_id').annotate(
+                lessons=Count('pk', filter=in_period),
+                total_lessons=Count('pk'),
+            )
+        }
+
+        records = []
+        for (pk, last_name, first_name, group_number,
+                last_lesson_id, last_homework_id, homeworks_before) in chunk:
+            last_lesson = lesson_map.get(last_lesson_id)
+            last_homework = lesson_map.get(last_homework_id)
+            behind = Lesson.lessons_behind(last_lesson, last_homework)
+            total_homeworks = last_homework[1] if last_homework else 0
+
+            total = totals.get(pk, {})
+            records.append({
+                'student_id': pk,
+                'last_name': last_name,
+                'first_name': first_name,
+                'group': group_number,
+                'period_start': period_start,
+                'period_end': period_end,
+                'lessons_completed': total.get('lessons', 0),
+                'homeworks_completed': max(total_homeworks - homeworks_before, 0),
+                'total_lessons_completed': total.get('total_lessons', 0),
+                'total_homeworks_completed': total_homeworks,
+                'last_lesson': last_lesson[0] if last_lesson else None,
+                'last_homework_lesson': last_homework[0] if last_homework else None,
+                'lessons_behind': behind,
+            })
+        return records
+
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield build(chunk)
+            chunk = []
+    if chunk:
+        yield build(chunk)
+
+
+def _parquet_schema():
+    return pa.schema([
+        ('student_id', pa.int64()),
+        ('last_name', pa.string()),
+        ('first_name', pa.string()),
+        ('group', pa.string()),
+        ('period_start', pa.date32()),
+        ('period_end', pa.date32()),
+        ('lessons_completed', pa.int32()),
+        ('homeworks_completed', pa.int32()),
+        ('total_lessons_completed', pa.int32()),
+        ('total_homeworks_completed', pa.int32()),
+        ('last_lesson', pa.string()),
+        ('last_homework_lesson', pa.string()),
+        ('lessons_behind', pa.int32()),
+    ])
+
+
+def write_report_files(students, path, period_start, period_end, chunk_size=OUTPUT_CHUNK_SIZE,
+                       progress=None):
+    """
+    Пишет отчёт по ученикам в <path>.jsonl.gz и <path>.parquet (или
+    <path>.csv.gz без pyarrow). Возвращает (список файлов, число строк).
+    progress(n) вызывается после каждой порции с числом записанных строк.
+    """
+    jsonl_path = f'{path}.jsonl.gz'
+    columnar_path = f'{path}.parquet' if pa is not None else f'{path}.csv.gz'
+    count = 0
+
+    with gzip.open(jsonl_path, 'wt', encoding='utf-8') as jsonl:
+        if pa is not None:
+            schema = _parquet_schema()
+            columnar = pq.ParquetWriter(columnar_path, schema, compression='zstd')
+            write_chunk = lambda records: columnar.write_table(
+                pa.Table.from_pylist(records, schema=schema)
+            )
+        else:
+            columnar = gzip.open(columnar_path, 'wt', encoding='utf-8', newline='')
+            writer = csv.DictWriter(columnar, OUTPUT_COLUMNS)
+            writer.writeheader()
+            write_chunk = writer.writerows
+
+        try:
+            chunks = _output_chunks(students, period_start, period_end, chunk_size)
+            for records in replica_iterator(chunks):
+                jsonl.writelines(
+                    json.dumps(record, ensure_ascii=False, default=str) + '\n'
+                    for record in records
+                )
+                write_chunk(records)
+                count += len(records)
+                if progress:
+                    progress(count)
+        finally:
+            columnar.close()
+
+    return [jsonl_path, columnar_path], count
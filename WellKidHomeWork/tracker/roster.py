@@ -0,0 +1,269 @@
+"""
+Синхронизация учеников с внешним списком (выгрузка таблицы зачисления в CSV).
+
+read_roster() читает CSV построчно. Заголовки берутся как в выгрузке из
+админки (tracker/export.py) или по именам полей: email, last_name, first_name,
+format, group, first_lesson_date. diff_roster() сопоставляет строки с
+учениками по индексу в памяти, собранному одним запросом: по (email, фамилия,
+имя), а если такого нет — по (фамилия, имя, дата первого урока). Одного
+email мало: он бывает общим у детей одного родителя. Строка, которой подходят
+несколько учеников, и повтор одного ученика (в том числе нового) в файле —
+ошибки: иначе каждый запуск создавал бы ученика заново. apply_roster() записывает
+отличия порциями: bulk_create для новых, bulk_update (bulk.save_students)
+для изменённых и для учеников, которых нет в списке (они становятся
+неактивными). Файл без изменений ничего не записывает.
+"""
+import csv
+import datetime
+from collections import defaultdict
+
+from django.db import transaction
+
+from .bulk import invalidate_progress_caches, save_students
+from .live import publish_resync
+from .export import EXPORT_HEADERS
+from .models import Student, StudyGroup
+
+
+ROSTER_CHUNK_SIZE = 500
+
+ROSTER_FIELDS = ['last_name', 'first_name', 'email', 'format', 'group', 'first_lesson_date']
+
+# Заголовки выгрузки из админки -> поля
+HEADER_ALIASES = {
+    EXPORT_HEADERS[1]: 'last_name',
+    EXPORT_HEADERS[2]: 'first_name',
+    EXPORT_HEADERS[3]: 'email',
+    EXPORT_HEADERS[4]: 'format',
+    EXPORT_HEADERS[5]: 'group',
+    EXPORT_HEADERS[6]: 'first_lesson_date',
+}
+
+REQUIRED_FIELDS = ['last_name', 'first_name', 'first_lesson_date']
+
+DATE_FORMATS = ['%Y-%m-%d', '%d.%m.%Y']
+
+
+class RosterError(ValueError):
+    """Ошибки в строках списка: (номер строки, текст)"""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__('; '.join(f'строка {line}: {message}' for line, message in errors[:10]))
+
+
+def _parse_date(value):
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(value, date_format).date()
+        except ValueError:
+            pass
+    raise ValueError(f'неверная дата «{value}»')
+
+
+def _parse_format(value):
+    formats = {code: code for code, label in Student.FORMAT_CHOICES}
+    formats.update({label.lower(): code for code, label in Student.FORMAT_CHOICES})
+    if not value:
+        return Student.GROUP
+    if value.lower() not in formats:
+        raise ValueError(f'неизвестный формат «{value}»')
+    return formats[value.lower()]
+
+
+def read_roster(fileobj, delimiter=','):
+    """
+    Строки списка: (номер строки, {поле: значение}). Ошибки копятся и
+    выбрасываются одним RosterError в конце, чтобы показать их все сразу.
+    """
+    reader = csv.reader(fileobj, delimiter=delimiter)
+    header = next(reader, None)
+    if header is None:
+        raise RosterError([(1, 'пустой файл')])
+    columns = [HEADER_ALIASES.get(name.strip(), name.strip().lower()) for name in header]
+    missing = [field for field in REQUIRED_FIELDS if field not in columns]
+    if missing:
+        raise RosterError([(1, f"нет столбцов {', '.join(missing)}")])
+
+    errors = []
+    for line, values in enumerate(reader, start=2):
+        if not any(value.strip() for value in values):
+            continue
+        raw = {
+            column: value.strip()
+            for column, value in zip(columns, values)
+            if column in ROSTER_FIELDS
+        }
+        try:
+            empty = [field for field in REQUIRED_FIELDS if not raw.get(field)]
+            if empty:
+                raise ValueError(f"не заполнено: {', '.join(empty)}")
+            # Столбцов, которых нет в файле, нет и в строке: такие поля не меняются
+            row = {**raw, 'first_lesson_date': _parse_date(raw['first_lesson_date'])}
+            if 'format' in row:
+                row['format'] = _parse_format(row['format'])
+        except ValueError as error:
+            errors.append((line, str(error)))
+            continue
+        if row.get('format') == Student.INDIVIDUAL:
+            row['group'] = ''
+        yield line, row
+
+    if errors:
+        raise RosterError(errors)
+
+
+class RosterIndex:
+    """Ученики в памяти с поиском по email и естественным ключам"""
+
+    def __init__(self, students):
+        self.by_email = defaultdict(list)
+        self.by_name = defaultdict(list)
+        for student in students:
+            self.by_email[student.email.lower()].append(student)
+            self.by_name[student.last_name.lower(), student.first_name.lower()].append(student)
+
+    def find(self, row):
+        """Подходящие строке ученики: больше одного — строка неоднозначна"""
+        email = row.get('email', '').lower()
+        name = row['last_name'].lower(), row['first_name'].lower()
+        # Email может быть общим (например, родителя у братьев и сестёр),
+        # поэтому совпадение по email засчитывается только вместе с именем:
+        # иначе новый ребёнок «переименовал» бы ученика с тем же email
+        matches = [
+            student for student in self.by_email.get(email, []) if email
+            if (student.last_name.lower(), student.first_name.lower()) == name
+        ]
+        if matches:
+            return matches
+        # Без совпадения по email и имени — по имени и дате первого урока
+        return [
+            student for student in self.by_name.get(name, [])
+            if student.first_lesson_date == row['first_lesson_date']
+        ]
+
+
+def diff_roster(rows, deactivate=True):
+    """
+    Отличия списка от базы: {'create': [строка], 'update': [(Student, строка,
+    поля)], 'deactivate': [Student], 'unchanged': n, 'groups': [номера новых
+    групп]}. Ученики, которых нет в списке, попадают в deactivate, если
+    deactivate=True.
+    Ученики и группы читаются двумя запросами, строки не обращаются к базе.
+    """
+    students = list(Student.objects.order_by('pk'))
+    index = RosterIndex(students)
+    groups = dict(StudyGroup.objects.values_list('number', 'pk'))
+
+    diff = {'create': [], 'update': [], 'deactivate': [], 'unchanged': 0, 'groups': []}
+    # Ключ строки -> номер строки: pk найденного ученика или ключ нового
+    seen = {}
+    # (фамилия, имя, дата) новых учеников -> (ключ первой такой строки, есть ли email)
+    new_names = {}
+    errors = []
+    for line, row in rows:
+        group = row.get('group')
+        if group and group not in groups and group not in diff['groups']:
+            diff['groups'].append(group)
+
+        matches = index.find(row)
+        if len(matches) > 1:
+            ids = ', '.join(str(student.pk) for student in matches)
+            errors.append((line, f'подходят несколько учеников с этим именем (id {ids})'))
+            continue
+        student = matches[0] if matches else None
+
+        if student is not None:
+            key = student.pk
+        else:
+            name = row['last_name'].lower(), row['first_name'].lower(), row['first_lesson_date']
+            email = row.get('email', '').lower()
+            key = (email, *name[:2]) if email else name
+            # Новый ученик без email на следующем запуске найдётся по имени
+            # и дате, поэтому с ним совпадёт любая строка с теми же данными
+            if key not in seen and name in new_names and not (email and new_names[name][1]):
+                key = new_names[name][0]
+            new_names.setdefault(name, (key, bool(email)))
+        if key in seen:
+            errors.append((line, f'тот же ученик, что в строке {seen[key]}'))
+            continue
+        seen[key] = line
+        if student is None:
+            diff['create'].append(row)
+            continue
+
+        changed = [
+            field for field in ROSTER_FIELDS
+            if field in row and field != 'group' and getattr(student, field) != row[field]
+        ]
+        if 'group' in row and (student.group_id != groups.get(group) or group in diff['groups']):
+            changed.append('group')
+        if not student.is_active:
+            changed.append('is_active')
+        if changed:
+            diff['update'].append((student, row, changed))
+        else:
+            diff['unchanged'] += 1
+
+    if errors:
+        raise RosterError(errors)
+    if deactivate:
+        diff['deactivate'] = [
+            student for student in students
+            if student.is_active and student.pk not in seen
+        ]
+    return diff
+
+
+def _chunks(items, chunk_size):
+    for start in range(0, len(items), chunk_size):
+        yield items[start:start + chunk_size]
+
+
+def apply_roster(diff, chunk_size=ROSTER_CHUNK_SIZE):
+    """Записывает отличия diff_roster() порциями, каждая — одна транзакция"""
+    if diff['groups']:
+        StudyGroup.objects.bulk_create(
+            [StudyGroup(number=number) for number in diff['groups']],
+            ignore_conflicts=True,
+        )
+    groups = dict(StudyGroup.objects.values_list('number', 'pk'))
+
+    for chunk in _chunks(diff['create'], chunk_size):
+        with transaction.atomic():
+            Student.objects.bulk_create([
+                Student(
+                    **{field: value for field, value in row.items() if field != 'group'},
+                    group_id=groups.get(row.get('group')),
+                )
+                for row in chunk
+            ])
+            publish_resync()
+
+    for chunk in _chunks(diff['update'], chunk_size):
+        fields = set()
+        students = []
+        for student, row, changed in chunk:
+            for field in changed:
+                if field == 'group':
+                    student.group_id = groups.get(row['group'])
+                elif field == 'is_active':
+                    student.is_active = True
+                else:
+                    setattr(student, field, row[field])
+            fields.update(changed)
+            students.append(student)
+        with transaction.atomic():
+            save_students(students, fields)
+            publish_resync()
+
+    for chunk in _chunks(diff['deactivate'], chunk_size):
+        for student in chunk:
+            student.is_active = False
+        with transaction.atomic():
+            save_students(chunk, ['is_active'])
+            publish_resync()
+
+    if diff['create'] or diff['update'] or diff['deactivate']:
+        StudyGroup.invalidate_caches()
+        invalidate_progress_caches()
@@ -0,0 +1,117 @@
+"""
+Тяжёлые чтения — на реплику, всё остальное — в основную базу.
+
+Отчёты в файлы, выгрузки, дашборды и аналитика выполняются внутри
+use_replica() (блок with или декоратор) и читают из алиаса
+settings.REPLICA_DATABASE_ALIAS, если включён settings.REPLICA_ENABLED.
+Локально реплика — копия SQLite, которую обновляет manage.py refresh_replica.
+
+Записи всегда идут в основную базу, в том числе сохранение объекта,
+прочитанного из реплики. Первая запись внутри use_replica() закрепляет
+остаток блока за основной базой, чтобы код читал то, что только что записал;
+use_primary() делает то же явно. Состояние хранится в contextvars, поэтому
+потоки воркера и асинхронные запросы не влияют друг на друга.
+
+Кэши, которые сбрасывает запись, заполняются заново через
+use_replica_unless_written(): в течение settings.REPLICA_MAX_LAG после
+note_write() — из основной базы, иначе реплика, ещё не получившая запись,
+закрепила бы в кэше старые данные на весь его таймаут.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+
+_replica = ContextVar('tracker_use_replica', default=False)
+_pinned = ContextVar('tracker_pinned_to_primary', default=False)
+
+RECENT_WRITE_CACHE_KEY = 'tracker:recent_write'
+
+
+def get_replica_alias():
+    """Алиас реплики или None, если реплика выключена"""
+    if not getattr(settings, 'REPLICA_ENABLED', False):
+        return None
+    return getattr(settings, 'REPLICA_DATABASE_ALIAS', None)
+
+
+@contextmanager
+def _route(replica, pinned):
+    replica_token = _replica.set(replica)
+    pinned_token = _pinned.set(pinned)
+    try:
+        yield
+    finally:
+        _pinned.reset(pinned_token)
+        _replica.reset(replica_token)
+
+
+def use_replica():
+    """Чтения внутри блока (или декорированной функции) идут на реплику"""
+    return _route(True, False)
+
+
+def use_primary():
+    """Чтения внутри блока идут в основную базу, даже внутри use_replica()"""
+    return _route(False, True)
+
+
+def note_write():
+    """Запись, которой в реплике может ещё не быть (вызывается при сбросе кэшей)"""
+    if get_replica_alias() is not None:
+        cache.set(RECENT_WRITE_CACHE_KEY, True, getattr(settings, 'REPLICA_MAX_LAG', 5 * 60))
+
+
+def use_replica_unless_written():
+    """Для заполнения кэшей: use_replica(), а вскоре после записи — use_primary()"""
+    if get_replica_alias() is not None and cache.get(RECENT_WRITE_CACHE_KEY):
+        return use_primary()
+    return use_replica()
+
+
+def replica_iterator(iterable):
+    """
+    Итератор, каждый шаг которого выполняется внутри use_replica():
+    для генераторов, которые читают из базы уже после выхода из view
+    (StreamingHttpResponse).
+    """
+    iterator = iter(iterable)
+    while True:
+        with use_replica():
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+class ReplicaRouter:
+    """Роутер для DATABASE_ROUTERS"""
+
+    def db_for_read(self, model, **hints):
+        if _replica.get() and not _pinned.get():
+            return get_replica_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        if get_replica_alias() is None:
+            return None
+        if _replica.get():
+            _pinned.set(True)
+        # Без явного ответа Django записал бы объект туда, откуда он прочитан
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, getattr(settings, 'REPLICA_DATABASE_ALIAS', None)}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Реплика — копия основной базы, схему ей не мигрируют
+        if db == getattr(settings, 'REPLICA_DATABASE_ALIAS', None):
+            return False
+        return None
@@ -0,0 +1,173 @@
+"""
+Индексированный поиск учеников по имени, фамилии, email и номеру группы.
+
+На SQLite используется виртуальная таблица FTS5, которую синхронизируют
+триггеры на tracker_student и tracker_studygroup. На PostgreSQL — GIN-индексы
+pg_trgm по нормализованным строкам ученика и группы. Регистр и буквы ё/е при поиске не различаются,
+каждое слово запроса ищется как префикс (на PostgreSQL — как подстрока).
+
+Индекс и триггеры создаются обработчиком post_migrate (см. apps.py):
+SQLite пересоздаёт таблицу при многих изменениях схемы и теряет триггеры,
+а DROP COLUMN не выполняется, пока на столбец ссылается триггер. Поэтому
+перед миграциями триггеры удаляются, а после — ставятся заново.
+"""
+import re
+
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+
+SEARCH_TABLE = 'tracker_student_search'
+
+SEARCH_COLUMNS = ['first_name', 'last_name', 'email', 'group_number']
+
+# Номер группы хранится в tracker_studygroup, в индекс он попадает подзапросом
+STUDENT_COLUMNS = ['first_name', 'last_name', 'email', 'group_id']
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def normalize(text):
+    """Приводит текст к нижнему регистру и заменяет ё на е"""
+    return text.lower().replace('ё', 'е')
+
+
+def _sqlite_normalized(column):
+    # lower() в SQLite работает только с ASCII, регистр кириллицы
+    # приводит токенизатор unicode61, здесь остаётся только ё -> е
+    return f"replace(replace({column}, 'ё', 'е'), 'Ё', 'Е')"
+
+
+def _sqlite_values(prefix):
+    return ', '.join([
+        _sqlite_normalized(f'{prefix}first_name'),
+        _sqlite_normalized(f'{prefix}last_name'),
+        _sqlite_normalized(f'{prefix}email'),
+        _sqlite_normalized(
+            f'(SELECT number FROM tracker_studygroup WHERE id = {prefix}group_id)'
+        ),
+    ])
+
+
+SQLITE_DROP_TRIGGERS = [
+    'DROP TRIGGER IF EXISTS tracker_student_search_insert',
+    'DROP TRIGGER IF EXISTS tracker_student_search_update',
+    'DROP TRIGGER IF EXISTS tracker_student_search_delete',
+    'DROP TRIGGER IF EXISTS tracker_student_search_group',
+]
+
+
+def _sqlite_search_statements():
+    columns = ', '.join(SEARCH_COLUMNS)
+    insert_new = (
+        f'INSERT INTO {SEARCH_TABLE}(rowid, {columns}) '
+        f'VALUES (new.id, {_sqlite_values("new.")});'
+    )
+    delete_old = f'DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id;'
+    select_students = f'SELECT id, {_sqlite_values("tracker_student.")} FROM tracker_student'
+
+    return [
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5('
+        f'{columns}, tokenize="unicode61 remove_diacritics 2")',
+        *SQLITE_DROP_TRIGGERS,
+        'CREATE TRIGGER tracker_student_search_insert AFTER INSERT ON tracker_student '
+        f'BEGIN {insert_new} END',
+        f'CREATE TRIGGER tracker_student_search_update AFTER UPDATE OF '
+        f'{", ".join(STUDENT_COLUMNS)} ON tracker_student BEGIN {delete_old} {insert_new} END',
+        'CREATE TRIGGER tracker_student_search_delete AFTER DELETE ON tracker_student '
+        f'BEGIN {delete_old} END',
+        # Переименование группы переиндексирует её учеников
+        'CREATE TRIGGER tracker_student_search_group AFTER UPDATE OF number '
+        'ON tracker_studygroup BEGIN '
+        f'DELETE FROM {SEARCH_TABLE} WHERE rowid IN '
+        '(SELECT id FROM tracker_student WHERE group_id = new.id); '
+        f'INSERT INTO {SEARCH_TABLE}(rowid, {columns}) '
+        f'{select_students} WHERE group_id = new.id; END',
+        # Полная перестройка: после миграций и flush индекс мог отстать
+        f'DELETE FROM {SEARCH_TABLE}',
+        f'INSERT INTO {SEARCH_TABLE}(rowid, {columns}) {select_students}',
+    ]
+
+
+def _postgresql_expression(columns):
+    text = " || ' ' || ".join(f"coalesce({column}, '')" for column in columns)
+    return f"upper(translate({text}, 'ёЁ', 'еЕ'))"
+
+
+POSTGRESQL_STUDENT_EXPRESSION = _postgresql_expression(['first_name', 'last_name', 'email'])
+POSTGRESQL_GROUP_EXPRESSION = _postgresql_expression(['number'])
+
+
+def _postgresql_search_statements():
+    return [
+        'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+        'CREATE INDEX IF NOT EXISTS tracker_student_search_trgm ON tracker_student '
+        f'USING gin (({POSTGRESQL_STUDENT_EXPRESSION}) gin_trgm_ops)',
+        'CREATE INDEX IF NOT EXISTS tracker_studygroup_search_trgm ON tracker_studygroup '
+        f'USING gin (({POSTGRESQL_GROUP_EXPRESSION}) gin_trgm_ops)',
+    ]
+
+
+def install_search_index(using='default'):
+    """Создаёт (или пересоздаёт) поисковый индекс в базе using"""
+    connection = connections[using]
+    if connection.vendor == 'sqlite':
+        statements = _sqlite_search_statements()
+    elif connection.vendor == 'postgresql':
+        statements = _postgresql_search_statements()
+    else:
+        return
+
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def uninstall_search_triggers(using='default'):
+    """Удаляет триггеры поискового индекса SQLite перед миграциями"""
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+
+    with connection.cursor() as cursor:
+        for statement in SQLITE_DROP_TRIGGERS:
+            cursor.execute(statement)
+
+
+def search_students(queryset, query):
+    """Фильтрует queryset учеников по поисковой строке"""
+    tokens = [normalize(token) for token in TOKEN_RE.findall(query)]
+    if not tokens:
+        return queryset
+
+    vendor = connections[queryset.db].vendor
+    if vendor == 'sqlite':
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s',
+            [match],
+        ))
+
+    if vendor == 'postgresql':
+        condition = (
+            f'({POSTGRESQL_STUDENT_EXPRESSION} LIKE %s OR group_id IN '
+            f'(SELECT id FROM tracker_studygroup WHERE {POSTGRESQL_GROUP_EXPRESSION} LIKE %s))'
+        )
+        params = []
+        for token in tokens:
+            pattern = '%' + token.upper().replace('_', r'\_') + '%'
+            params += [pattern, pattern]
+        return queryset.filter(pk__in=RawSQL(
+            'SELECT id FROM tracker_student WHERE ' + ' AND '.join([condition] * len(tokens)),
+            params,
+        ))
+
+    for token in tokens:
+        queryset = queryset.filter(
+            Q(first_name__icontains=token) |
+            Q(last_name__icontains=token) |
+            Q(email__icontains=token) |
+            Q(group__number__icontains=token)
+        )
+    return queryset
@@ -1,5 +1,8 @@
+from django.db.models import F
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
+from django.utils import timezone
+from .live import broker, publish_progress_change
 from .models import StudentLessonProgress, Student
 
 
@@ -7,28 +10,36 @@ from .models import StudentLessonProgress, Student
 def update_student_progress(sender, instance, **kwargs):
     """
     Автоматически обновляет прогресс студента при изменении прогресса по урокам
+    и увеличивает версию прогресса, по которой строятся ключи кэша снимков
     """
-    student = instance.student
+    # student_id, а не student: при каскадном удалении ученика его уже нет в базе
+    student_id = instance.student_id
+    progress = StudentLessonProgress.objects.filter(
+        student_id=student_id
+    ).order_by('-lesson__module', '-lesson__lesson')
     
     # Находим последний пройденный урок
-    last_progress = StudentLessonProgress.objects.filter(
-        student=student
-    ).order_by('-lesson__order').first()
-    
-    if last_progress:
-        student.last_lesson = last_progress.lesson
-    else:
-        student.last_lesson = None
+    last_progress = progress.values_list('lesson_id', flat=True).first()
     
     # Находим последний урок с выполненным ДЗ
-    last_homework = StudentLessonProgress.objects.filter(
-        student=student,
+    last_homework = progress.filter(
         homework_completed=True
-    ).order_by('-lesson__order').first()
+    ).values_list('lesson_id', flat=True).first()
+    
+    # Прежние значения нужны только открытым живым дашбордам
+    old_lessons = None
+    if broker.has_subscribers:
+        old_lessons = Student.objects.filter(pk=student_id).values_list(
+            'last_lesson_id', 'last_homework_lesson_id'
+        ).first()
     
-    if last_homework:
-        student.last_homework_lesson = last_homework.lesson
-    else:
-        student.last_homework_lesson = None
+    # Одним UPDATE, чтобы параллельные изменения не потеряли увеличение версии
+    updated = Student.objects.filter(pk=student_id).update(
+        last_lesson_id=last_progress,
+        last_homework_lesson_id=last_homework,
+        progress_version=F('progress_version') + 1,
+        updated_at=timezone.now(),
+    )
     
-    student.save(update_fields=['last_lesson', 'last_homework_lesson'])
\ No newline at end of file
+    if updated and old_lessons is not None:
+        publish_progress_change(student_id, old_lessons, (last_progress, last_homework))
@@ -0,0 +1,96 @@
+"""
+Кэш компактных снимков прогресса учеников.
+
+Снимок — текущий урок, урок с ДЗ, отставание и последние прохождения.
+Снимки хранятся в кэше Django под ключами с Student.progress_version,
+которую увеличивает сигнал update_student_progress. Устаревший снимок
+просто перестаёт запрашиваться и вытесняется по таймауту, поэтому явно
+сбрасывать кэш не нужно. Для списков снимки всех учеников страницы
+достаются одним get_many.
+"""
+from django.core.cache import cache
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from .models import Lesson, StudentLessonProgress
+
+
+SNAPSHOT_TIMEOUT = 24 * 60 * 60
+
+RECENT_ACTIVITY_LIMIT = 5
+
+
+def snapshot_key(student_id, version):
+    return f'tracker:snapshot:{student_id}:v{version}'
+
+
+def _recent_activity(student_ids):
+    """Последние прохождения для нескольких учеников одним запросом"""
+    rows = (
+        StudentLessonProgress.objects.filter(student_id__in=student_ids)
+        .annotate(row_number=Window(
+            RowNumber(),
+            partition_by=[F('student_id')],
+            order_by=[F('date_completed').desc(), F('pk').desc()],
+        ))
+        .filter(row_number__lte=RECENT_ACTIVITY_LIMIT)
+        .order_by('student_id', 'row_number')
+        .values_list('student_id', 'date_completed', 'lesson_id', 'homework_completed')
+    )
+
+    lesson_map = Lesson.get_map()
+    activity = {student_id: [] for student_id in student_ids}
+    for student_id, date_completed, lesson_id, homework_completed in rows:
+        activity[student_id].append({
+            'date': date_completed,
+            'lesson': lesson_map.get(lesson_id, ('', None))[0],
+            'homework_completed': homework_completed,
+        })
+    return activity
+
+
+def build_snapshots(students):
+    """Собирает снимки для учеников без обращения к кэшу"""
+    lesson_map = Lesson.get_map()
+    activity = _recent_activity([student.pk for student in students])
+
+    snapshots = {}
+    for student in students:
+        last_lesson = lesson_map.get(student.last_lesson_id)
+        last_homework = lesson_map.get(student.last_homework_lesson_id)
+
+        snapshots[student.pk] = {
+            'version': student.progress_version,
+            'last_lesson': last_lesson[0] if last_lesson else None,
+            'last_homework_lesson': last_homework[0] if last_homework else None,
+            'lessons_behind': Lesson.lessons_behind(last_lesson, last_homework),
+            'recent_activity': activity[student.pk],
+        }
+    return snapshots
+
+
+def get_snapshots(students):
+    """Снимки {id: снимок} для списка учеников за одно обращение к кэшу"""
+    keys = {
+        snapshot_key(student.pk, student.progress_version): student
+        for student in students
+    }
+    cached = cache.get_many(list(keys))
+
+    snapshots = {keys[key].pk: snapshot for key, snapshot in cached.items()}
+    missing = [student for key, student in keys.items() if key not in cached]
+    if missing:
+        built = build_snapshots(missing)
+        cache.set_many(
+            {
+                snapshot_key(student.pk, student.progress_version): built[student.pk]
+                for student in missing
+            },
+            SNAPSHOT_TIMEOUT,
+        )
+        snapshots.update(built)
+    return snapshots
+
+
+def get_snapshot(student):
+    return get_snapshots([student])[student.pk]
@@ -1,3 +1,884 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import gzip
+import io
+import json
+import tempfile
+from unittest import mock, skipIf
 
-# Create your tests here.
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import analytics, archive, jobs, live
+from .curriculum import CurriculumError, apply_curriculum, read_curriculum
+from .bulk import LAST_HOMEWORK_LESSON, LAST_LESSON, advance_students, mark_homework_done
+from .dashboard import get_group_stats, get_traffic_light_counts
+from .export import EXPORT_HEADERS, export_rows, stream_csv, write_csv
+from .models import ArchivedStudent, AutomatedReport, Job, Lesson, Student, StudentLessonProgress, StudyGroup
+from .reports import generate_reports, write_report_files
+from .roster import RosterError, apply_roster, diff_roster, read_roster
+from .routers import replica_iterator, use_primary, use_replica
+from .search import search_students
+from .timeline import get_timeline_page, student_timeline_sources
+
+
+REPLICA = 'replica'
+
+
+@override_settings(REPLICA_ENABLED=True, REPLICA_DATABASE_ALIAS=REPLICA)
+class ReplicaRouterTests(TransactionTestCase):
+    """
+    Проверяет, в какой алиас уходят запросы (tracker/routers.py).
+    В тестах реплика — зеркало default, поэтому данные должны быть
+    закоммичены: отсюда TransactionTestCase вместо TestCase.
+    """
+
+    databases = {DEFAULT_DB_ALIAS, REPLICA}
+
+    def setUp(self):
+        self.lesson = Lesson.objects.create(module=1, lesson=1)
+        self.student = Student.objects.create(
+            first_name='Анна',
+            last_name='Иванова',
+            email='anna@example.com',
+            format=Student.INDIVIDUAL,
+            first_lesson_date=datetime.date(2025, 9, 1),
+            last_lesson=self.lesson,
+        )
+
+    def capture(self, func):
+        """Выполняет func, возвращает (результат, запросы default, запросы реплики)"""
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as primary, \
+                CaptureQueriesContext(connections[REPLICA]) as replica:
+            result = func()
+        return result, len(primary), len(replica)
+
+    def test_reads_outside_block_go_to_primary(self):
+        _, primary, replica = self.capture(lambda: list(Student.objects.all()))
+        self.assertEqual((primary, replica), (1, 0))
+
+    def test_reads_inside_block_go_to_replica(self):
+        def read():
+            with use_replica():
+                return list(Student.objects.all())
+
+        students, primary, replica = self.capture(read)
+        self.assertEqual((primary, replica), (0, 1))
+        self.assertEqual(students[0]._state.db, REPLICA)
+
+    @override_settings(REPLICA_ENABLED=False)
+    def test_disabled_replica_is_ignored(self):
+        def read():
+            with use_replica():
+                return list(Student.objects.all())
+
+        _, primary, replica = self.capture(read)
+        self.assertEqual((primary, replica), (1, 0))
+
+    def test_decorator(self):
+        @use_replica()
+        def count():
+            return Student.objects.count()
+
+        result, primary, replica = self.capture(count)
+        self.assertEqual(result, 1)
+        self.assertEqual((primary, replica), (0, 1))
+
+    def test_write_goes_to_primary_and_pins_block(self):
+        def write_then_read():
+            with use_replica():
+                Student.objects.filter(pk=self.student.pk).update(first_name='Аня')
+                return Student.objects.get(pk=self.student.pk)
+
+        student, primary, replica = self.capture(write_then_read)
+        self.assertEqual((primary, replica), (2, 0))
+        self.assertEqual(student.first_name, 'Аня')
+
+        # Закрепление действует только до конца блока
+        _, primary, replica = self.capture(self.test_reads_inside_block_go_to_replica)
+        self.assertEqual((primary, replica), (0, 1))
+
+    def test_object_read_from_replica_saves_to_primary(self):
+        with use_replica():
+            student = Student.objects.get(pk=self.student.pk)
+
+        student.first_name = 'Аня'
+        _, primary, replica = self.capture(student.save)
+        self.assertEqual(replica, 0)
+        self.assertGreater(primary, 0)
+        self.assertEqual(student._state.db, DEFAULT_DB_ALIAS)
+
+    def test_use_primary_inside_replica_block(self):
+        def read():
+            with use_replica():
+                with use_primary():
+                    list(Student.objects.all())
+                list(Student.objects.all())
+
+        _, primary, replica = self.capture(read)
+        self.assertEqual((primary, replica), (1, 1))
+
+    def test_replica_iterator_routes_each_step(self):
+        def rows():
+            yield Student.objects.count()
+            yield Lesson.objects.count()
+
+        result, primary, replica = self.capture(lambda: list(replica_iterator(rows())))
+        self.assertEqual(result, [1, 1])
+        self.assertEqual((primary, replica), (0, 2))
+
+    def test_dashboard_reads_from_replica(self):
+        counts, primary, replica = self.capture(get_traffic_light_counts)
+        self.assertEqual(counts[Student.YELLOW], 1)
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    def test_cache_cleared_by_write_refills_from_primary(self):
+        cache.clear()
+        _, primary, replica = self.capture(get_group_stats)
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+        # Реплика могла ещё не получить запись: кэш заполняется из основной базы
+        mark_homework_done(Student.objects.all())
+        _, primary, replica = self.capture(get_group_stats)
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+    def test_export_reads_from_replica(self):
+        output = io.StringIO()
+        count, primary, replica = self.capture(
+            lambda: write_csv(Student.objects.order_by('pk'), output)
+        )
+        self.assertEqual(count, 1)
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+
+class LessonsBehindTests(TestCase):
+    """Отставание по ДЗ (Lesson.lessons_behind) и его использование"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.first, cls.second, cls.third = [
+            Lesson.objects.create(module=1, lesson=number) for number in (1, 2, 3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_map_entries(self):
+        lesson_map = Lesson.get_map()
+        third, first = lesson_map[self.third.pk], lesson_map[self.first.pk]
+        self.assertIsNone(Lesson.lessons_behind(None, first))
+        self.assertEqual(Lesson.lessons_behind(third, None), 3)
+        self.assertEqual(Lesson.lessons_behind(third, first), 2)
+
+    def test_student_without_lesson(self):
+        student = Student(first_lesson_date=datetime.date(2025, 9, 1))
+        self.assertIsNone(student.lessons_behind)
+        student.last_lesson = self.second
+        self.assertEqual(student.lessons_behind, 2)
+        student.last_homework_lesson = self.first
+        self.assertEqual(student.lessons_behind, 1)
+
+
+class AdvanceStudentsTests(TestCase):
+    """Массовое продвижение (tracker/bulk.py), в том числе учеников без уроков"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.lessons = [Lesson.objects.create(module=1, lesson=number) for number in (1, 2, 3)]
+
+    def setUp(self):
+        cache.clear()
+
+    def create_student(self, last_lesson=None, last_homework_lesson=None):
+        return Student.objects.create(
+            first_name='Анна',
+            last_name='Иванова',
+            email='anna@example.com',
+            first_lesson_date=datetime.date(2025, 9, 1),
+            last_lesson=last_lesson,
+            last_homework_lesson=last_homework_lesson,
+        )
+
+    def assertLessons(self, student, last_lesson, last_homework_lesson):
+        student.refresh_from_db()
+        self.assertEqual(
+            (student.last_lesson, student.last_homework_lesson),
+            (last_lesson, last_homework_lesson),
+        )
+
+    def test_advance_without_lesson_starts_at_first_lesson(self):
+        first, second, last = self.lessons
+        without_lesson = self.create_student()
+        on_first = self.create_student(first)
+        on_last = self.create_student(last)
+
+        self.assertEqual(advance_students(Student.objects.all()), 2)
+        self.assertLessons(without_lesson, first, None)
+        self.assertLessons(on_first, second, None)
+        self.assertLessons(on_last, last, None)
+
+    def test_advance_homework_without_homework_credits_first_lesson(self):
+        first, second, last = self.lessons
+        without_homework = self.create_student(second)
+        behind = self.create_student(last, first)
+        done = self.create_student(second, second)
+        without_lesson = self.create_student()
+
+        self.assertEqual(advance_students(Student.objects.all(), LAST_HOMEWORK_LESSON), 2)
+        self.assertLessons(without_homework, second, first)
+        self.assertLessons(behind, last, second)
+        self.assertLessons(done, second, second)
+        self.assertLessons(without_lesson, None, None)
+
+    def test_mark_homework_done_without_homework(self):
+        first, second, last = self.lessons
+        without_homework = self.create_student(second)
+        done = self.create_student(first, first)
+
+        self.assertEqual(mark_homework_done(Student.objects.all()), 1)
+        self.assertLessons(without_homework, second, second)
+        self.assertLessons(done, first, first)
+
+
+class GenerateReportsTests(TestCase):
+    """Инкрементальные отчёты (tracker/reports.py)"""
+
+    period_end = datetime.date(2025, 10, 31)
+    period_start = datetime.date(2025, 10, 1)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.lessons = [Lesson.objects.create(module=1, lesson=number) for number in (1, 2, 3)]
+        cls.student = Student.objects.create(
+            first_name='Анна',
+            last_name='Иванова',
+            email='anna@example.com',
+            first_lesson_date=datetime.date(2025, 6, 1),
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def generate(self):
+        return generate_reports(Student.objects.all(), self.period_start, self.period_end)
+
+    def test_first_report_starts_at_earliest_counted_progress(self):
+        StudentLessonProgress.objects.create(
+            student=self.student, lesson=self.lessons[0],
+            date_completed=datetime.date(2025, 6, 1), homework_completed=True,
+        )
+        [report] = self.generate()
+        self.assertEqual(report.period_start, datetime.date(2025, 6, 1))
+        self.assertEqual((report.lessons_completed, report.homeworks_completed), (1, 1))
+        self.assertEqual(self.generate(), [])
+
+    def test_homework_without_new_progress_rows(self):
+        progress = StudentLessonProgress.objects.create(
+            student=self.student, lesson=self.lessons[0], date_completed=self.period_start,
+        )
+        StudentLessonProgress.objects.create(
+            student=self.student, lesson=self.lessons[1], date_completed=self.period_start,
+        )
+        self.generate()
+
+        # ДЗ отмечено в уже учтённом прохождении
+        progress.homework_completed = True
+        progress.save()
+        [report] = self.generate()
+        self.assertEqual((report.lessons_completed, report.homeworks_completed), (0, 1))
+
+        # ДЗ засчитано массовым действием, без прохождений
+        mark_homework_done(Student.objects.all())
+        [report] = self.generate()
+        self.assertEqual((report.homeworks_completed, report.total_homeworks_completed), (1, 2))
+        self.assertEqual(self.generate(), [])
+
+    def test_report_files_count_homework_like_reports(self):
+        for lesson in self.lessons[:2]:
+            StudentLessonProgress.objects.create(
+                student=self.student, lesson=lesson, date_completed=self.period_start,
+                homework_completed=lesson == self.lessons[0],
+            )
+        self.generate()
+        # ДЗ засчитано массовым действием: строк прохождений с ДЗ не прибавилось
+        mark_homework_done(Student.objects.all())
+
+        period_start, period_end = self.period_end, self.period_end + datetime.timedelta(days=30)
+        with tempfile.TemporaryDirectory() as directory:
+            [jsonl_path, _], count = write_report_files(
+                Student.objects.all(), f'{directory}/report', period_start, period_end,
+            )
+            with gzip.open(jsonl_path, 'rt', encoding='utf-8') as jsonl:
+                [row] = [json.loads(line) for line in jsonl]
+
+        [report] = generate_reports(Student.objects.all(), period_start, period_end)
+        self.assertEqual(
+            (row['homeworks_completed'], row['total_homeworks_completed']),
+            (report.homeworks_completed, report.total_homeworks_completed),
+        )
+        self.assertEqual((row['homeworks_completed'], row['total_homeworks_completed']), (1, 2))
+
+    def test_progress_per_chunk(self):
+        for number in range(2):
+            Student.objects.create(
+                first_name=f'Ученик{number}',
+                last_name='Петров',
+                first_lesson_date=datetime.date(2025, 6, 1),
+            )
+        for student in Student.objects.all():
+            StudentLessonProgress.objects.create(
+                student=student, lesson=self.lessons[0], date_completed=self.period_start,
+            )
+
+        done = []
+        generate_reports(
+            Student.objects.all(), self.period_start, self.period_end, chunk_size=2, progress=done.append,
+        )
+        self.assertEqual(done, [2, 3])
+
+        done = []
+        with tempfile.TemporaryDirectory() as directory:
+            write_report_files(
+                Student.objects.all(), f'{directory}/report', self.period_start, self.period_end,
+                chunk_size=2, progress=done.append,
+            )
+        self.assertEqual(done, [2, 3])
+
+
+class RosterTests(TestCase):
+    """Сопоставление строк списка с учениками (tracker/roster.py)"""
+
+    header = 'last_name,first_name,email,first_lesson_date\n'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = Student.objects.create(
+            first_name='Анна',
+            last_name='Иванова',
+            email='parent@example.com',
+            first_lesson_date=datetime.date(2025, 9, 1),
+        )
+
+    def diff(self, *lines):
+        return diff_roster(read_roster(io.StringIO(self.header + ''.join(lines))))
+
+    def test_sibling_with_shared_email_is_created(self):
+        diff = self.diff(
+            'Иванова,Анна,parent@example.com,2025-09-01\n',
+            'Иванов,Пётр,parent@example.com,2025-09-01\n',
+        )
+        self.assertEqual(diff['unchanged'], 1)
+        self.assertEqual([row['first_name'] for row in diff['create']], ['Пётр'])
+        self.assertEqual((diff['update'], diff['deactivate']), ([], []))
+
+    def test_sibling_alone_does_not_take_over_student(self):
+        diff = self.diff('Иванов,Пётр,parent@example.com,2025-09-01\n')
+        self.assertEqual([row['first_name'] for row in diff['create']], ['Пётр'])
+        self.assertEqual(diff['update'], [])
+        self.assertEqual(diff['deactivate'], [self.student])
+
+    def test_changed_email_matches_by_name_and_date(self):
+        diff = self.diff('Иванова,Анна,anna@example.com,2025-09-01\n')
+        [(student, row, changed)] = diff['update']
+        self.assertEqual((student, changed), (self.student, ['email']))
+
+    def test_new_student_listed_twice_is_rejected(self):
+        for lines in (
+            ('Петров,Иван,ivan@example.com,2025-09-01\n', 'Петров,Иван,ivan@example.com,2025-09-01\n'),
+            ('Петров,Иван,ivan@example.com,2025-09-01\n', 'Петров,Иван,,2025-09-01\n'),
+        ):
+            with self.subTest(lines=lines), self.assertRaises(RosterError) as context:
+                self.diff('Иванова,Анна,parent@example.com,2025-09-01\n', *lines)
+            self.assertEqual(context.exception.errors, [(4, 'тот же ученик, что в строке 3')])
+
+    def test_ambiguous_row_is_rejected(self):
+        Student.objects.create(
+            first_name='Анна',
+            last_name='Иванова',
+            email='other@example.com',
+            first_lesson_date=datetime.date(2025, 9, 1),
+        )
+        with self.assertRaises(RosterError) as context:
+            self.diff('Иванова,Анна,,2025-09-01\n')
+        [(line, message)] = context.exception.errors
+        self.assertEqual(line, 2)
+        self.assertIn('несколько учеников', message)
+
+    def test_second_sync_writes_nothing(self):
+        lines = (
+            'Иванова,Анна,parent@example.com,2025-09-01\n',
+            'Иванов,Пётр,parent@example.com,2025-09-01\n',
+            'Петров,Иван,,2025-09-01\n',
+        )
+        apply_roster(self.diff(*lines))
+        self.assertEqual(Student.objects.count(), 3)
+
+        diff = self.diff(*lines)
+        self.assertEqual((diff['create'], diff['update'], diff['deactivate']), ([], [], []))
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as queries:
+            apply_roster(diff)
+        self.assertFalse([
+            query['sql'] for query in queries
+            if query['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))
+        ])
+
+
+class StudentTimelineTests(TestCase):
+    """Лента активности на странице ученика в админке (tracker/timeline.py)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.lessons = [Lesson.objects.create(module=1, lesson=number) for number in (1, 2, 3)]
+        cls.student = Student.objects.create(
+            first_name='Анна',
+            last_name='Иванова',
+            email='anna@example.com',
+            first_lesson_date=datetime.date(2025, 9, 1),
+        )
+        for day, lesson in enumerate(cls.lessons, start=1):
+            StudentLessonProgress.objects.create(
+                student=cls.student, lesson=lesson, date_completed=datetime.date(2025, 9, day),
+            )
+        cls.report = AutomatedReport.objects.create(
+            student=cls.student,
+            period_start=datetime.date(2025, 9, 1),
+            period_end=datetime.date(2025, 9, 2),
+            lessons_completed=2,
+        )
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_pages_merge_sources_by_date(self):
+        sources = student_timeline_sources(self.student)
+        items, cursor = get_timeline_page(sources, page_size=2)
+        self.assertEqual(
+            [(item['kind'], item['date'].day) for item in items],
+            [('lesson', 3), ('report', 2)],
+        )
+        items, cursor = get_timeline_page(sources, cursor, page_size=2)
+        self.assertEqual(
+            [(item['kind'], item['date'].day) for item in items],
+            [('lesson', 2), ('lesson', 1)],
+        )
+        self.assertIsNone(cursor)
+
+    def test_change_page_shows_timeline(self):
+        self.client.force_login(self.user)
+        url = reverse('admin:tracker_student_change', args=[self.student.pk])
+        response = self.client.get(url)
+        self.assertContains(response, 'Лента активности')
+        self.assertContains(response, 'отчёт за')
+        self.assertEqual(len(response.context['timeline']), 4)
+        self.assertIsNone(response.context['timeline_next_cursor'])
+
+
+class StudentAdminTests(TestCase):
+    """Список учеников и выгрузка в админке"""
+
+    @classmethod
+    def setUpTestData(cls):
+        lesson = Lesson.objects.create(module=1, lesson=1)
+        cls.students = [
+            Student.objects.create(
+                first_name=f'Ученик{number}',
+                last_name='Иванов',
+                email=f'student{number}@example.com',
+                first_lesson_date=datetime.date(2025, 9, 1),
+                last_lesson=lesson,
+                last_homework_lesson=lesson,
+            )
+            for number in range(3)
+        ]
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_changelist_loads_snapshots(self):
+        response = self.client.get(reverse('admin:tracker_student_changelist'))
+        result_list = response.context['cl'].result_list
+        self.assertEqual(len(result_list), 3)
+        self.assertTrue(all(hasattr(obj, 'snapshot') for obj in result_list))
+
+    def test_lessons_behind_column_reads_snapshots(self):
+        url = reverse('admin:tracker_student_changelist')
+        self.client.get(url)
+        # Снимки уже в кэше: карта уроков не нужна ни одной строке
+        with mock.patch.object(Lesson, 'get_map', wraps=Lesson.get_map) as get_map:
+            response = self.client.get(url)
+        self.assertContains(response, 'Всё сдано', count=3)
+        self.assertEqual(get_map.call_count, 0)
+
+    def test_keyset_page_without_offset_and_full_count(self):
+        model_admin = admin.site._registry[Student]
+        for name, value in (('list_per_page', 2), ('show_full_result_count', True)):
+            self.addCleanup(setattr, model_admin, name, getattr(model_admin, name))
+            setattr(model_admin, name, value)
+
+        url = reverse('admin:tracker_student_changelist')
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as queries:
+            response = self.client.get(url, {'o': '-1', 'p': '2'})
+        cl = response.context['cl']
+        self.assertTrue(cl.keyset)
+        self.assertEqual((cl.result_count, cl.full_result_count), (3, 3))
+        self.assertEqual(len(cl.result_list), 2)
+        student_queries = [query['sql'] for query in queries if 'FROM "tracker_student"' in query['sql']]
+        self.assertFalse([sql for sql in student_queries if 'OFFSET' in sql])
+        # Только ограниченные COUNT по подзапросу с LIMIT
+        counts = [sql for sql in student_queries if 'COUNT(' in sql]
+        self.assertEqual(len(counts), 2)
+        self.assertTrue(all('LIMIT' in sql for sql in counts))
+
+    def test_export_does_not_fetch_changelist_page(self):
+        url = reverse('admin:tracker_student_export', args=['csv'])
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as queries:
+            content = b''.join(self.client.get(url, {'q': 'Ученик1'}).streaming_content)
+        self.assertIn('Ученик1'.encode(), content)
+        self.assertNotIn('Ученик2'.encode(), content)
+        student_queries = [query['sql'] for query in queries if 'FROM "tracker_student"' in query['sql']]
+        self.assertFalse([sql for sql in student_queries if 'COUNT(' in sql])
+        self.assertFalse([sql for sql in student_queries if 'tracker_studentlessonprogress' in sql])
+
+
+class ExportTests(TestCase):
+    """Строки и заголовок выгрузки учеников (tracker/export.py)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        first, second, third = [Lesson.objects.create(module=1, lesson=number) for number in (1, 2, 3)]
+        group = StudyGroup.objects.create(number='ППН 1')
+        cls.group_student = Student.objects.create(
+            first_name='Анна',
+            last_name='Иванова',
+            email='anna@example.com',
+            first_lesson_date=datetime.date(2025, 9, 1),
+            group=group,
+            last_lesson=third,
+            last_homework_lesson=first,
+        )
+        cls.new_student = Student.objects.create(
+            first_name='Пётр',
+            last_name='Петров',
+            format=Student.INDIVIDUAL,
+            first_lesson_date=datetime.date(2025, 10, 1),
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_rows(self):
+        rows = list(export_rows(Student.objects.order_by('pk')))
+        self.assertEqual(rows, [
+            [
+                self.group_student.pk, 'Иванова', 'Анна', 'anna@example.com', 'Группа',
+                'ППН 1', datetime.date(2025, 9, 1), 'М1У3 (3)', 'М1У1 (1)', 2,
+            ],
+            [
+                self.new_student.pk, 'Петров', 'Пётр', '', 'Индивидуальный',
+                '', datetime.date(2025, 10, 1), '', '', '',
+            ],
+        ])
+
+    def test_csv_header(self):
+        lines = list(stream_csv(Student.objects.order_by('pk')))
+        self.assertEqual(lines[0], '\ufeff' + ','.join(EXPORT_HEADERS) + '\r\n')
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[1].startswith(f'{self.group_student.pk},Иванова,Анна,'))
+
+
+class SearchTests(TestCase):
+    """Поиск учеников по индексу, который ведут триггеры (tracker/search.py)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = StudyGroup.objects.create(number='ППН 7')
+        cls.student = Student.objects.create(
+            first_name='Фёдор',
+            last_name='Смирнов',
+            email='fedor@example.com',
+            first_lesson_date=datetime.date(2025, 9, 1),
+            group=cls.group,
+        )
+
+    def search(self, query):
+        return list(search_students(Student.objects.all(), query))
+
+    def test_finds_new_student(self):
+        for query in ('смир', 'ФЕДОР', 'fedor@', 'смирнов фёд', 'ппн 7'):
+            with self.subTest(query=query):
+                self.assertEqual(self.search(query), [self.student])
+        self.assertEqual(self.search('иванов'), [])
+
+    def test_finds_renamed_student(self):
+        self.student.last_name = 'Кузнецов'
+        self.student.save()
+        self.assertEqual(self.search('кузнец'), [self.student])
+        self.assertEqual(self.search('смирнов'), [])
+
+    def test_finds_students_of_renamed_group(self):
+        self.group.number = 'ВЕБ 3'
+        self.group.save()
+        self.assertEqual(self.search('веб'), [self.student])
+        self.assertEqual(self.search('ппн'), [])
+
+    def test_deleted_student_is_not_found(self):
+        self.student.delete()
+        self.assertEqual(self.search('смирнов'), [])
+
+
+class ConditionalGetTests(TestCase):
+    """304 на страницах админки без изменений (tracker/etags.py)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.lessons = [Lesson.objects.create(module=1, lesson=number) for number in (1, 2)]
+        cls.group = StudyGroup.objects.create(number='ППН 1')
+        cls.student = Student.objects.create(
+            first_name='Анна',
+            last_name='Иванова',
+            first_lesson_date=datetime.date(2025, 9, 1),
+            group=cls.group,
+        )
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def assertRevalidates(self, url, change):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertNotIn('no-store', response['Cache-Control'])
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        change()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_change_page(self):
+        url = reverse('admin:tracker_student_change', args=[self.student.pk])
+        self.assertRevalidates(url, lambda: StudentLessonProgress.objects.create(
+            student=self.student, lesson=self.lessons[0], date_completed=datetime.date(2025, 9, 1),
+        ))
+
+    def test_change_page_lesson_labels(self):
+        url = reverse('admin:tracker_student_change', args=[self.student.pk])
+        self.assertRevalidates(url, lambda: Lesson.objects.create(module=1, lesson=3))
+
+    def test_group_dashboard(self):
+        url = reverse('admin:tracker_studygroup_dashboard')
+        self.assertRevalidates(url, lambda: advance_students(
+            Student.objects.filter(pk=self.student.pk), LAST_LESSON,
+        ))
+
+
+class StudyGroupFacetsTests(TestCase):
+    """Число учеников групп в фильтре списка (StudyGroup.get_facets)"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_counts_only_active_students(self):
+        group = StudyGroup.objects.create(number='ППН 1')
+        for is_active in (True, True, False):
+            Student.objects.create(
+                first_name='Анна',
+                last_name='Иванова',
+                first_lesson_date=datetime.date(2025, 9, 1),
+                group=group,
+                is_active=is_active,
+            )
+        self.assertEqual(StudyGroup.get_facets(), [(group.pk, 'ППН 1', 2)])
+
+        student = Student.objects.filter(is_active=True).first()
+        student.is_active = False
+        student.save()
+        self.assertEqual(StudyGroup.get_facets(), [(group.pk, 'ППН 1', 1)])
+
+
+class JobHeartbeatTests(TestCase):
+    """Возврат в очередь задач упавших воркеров (tracker/jobs.py)"""
+
+    def claim(self, worker):
+        jobs.enqueue('rebuild_search_index')
+        return Job.objects.get(pk=jobs.claim_job(worker))
+
+    def test_requeue_only_jobs_without_heartbeat(self):
+        alive = self.claim('alive')
+        dead = self.claim('dead')
+        # Обе задачи начаты час назад, но живой воркер подаёт сигнал
+        an_hour_ago = timezone.now() - datetime.timedelta(hours=1)
+        Job.objects.update(started_at=an_hour_ago, heartbeat_at=an_hour_ago)
+        self.assertEqual(jobs.heartbeat('alive', [alive.pk, dead.pk]), 1)
+
+        self.assertEqual(jobs.requeue_stale(datetime.timedelta(minutes=5)), 1)
+        alive.refresh_from_db()
+        dead.refresh_from_db()
+        self.assertEqual((alive.status, alive.worker), (Job.RUNNING, 'alive'))
+        self.assertEqual((dead.status, dead.worker, dead.heartbeat_at), (Job.PENDING, '', None))
+
+
+class CurriculumTests(TestCase):
+    """Загрузка программы курса из файла (tracker/curriculum.py)"""
+
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = f'{directory.name}/curriculum.json'
+
+    def read(self, data):
+        with open(self.path, 'w', encoding='utf-8') as curriculum_file:
+            json.dump(data, curriculum_file, ensure_ascii=False)
+        return read_curriculum(self.path)
+
+    def module(self, topics):
+        return {'modules': [{'module': 1, 'title': 'Основы', 'lessons': 2, 'topics': topics}]}
+
+    def test_second_run_writes_nothing(self):
+        diff = apply_curriculum(self.read(self.module(['Переменные'])))
+        self.assertEqual(diff['created'], [(1, 1), (1, 2)])
+
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as queries:
+            diff = apply_curriculum(self.read(self.module(['Переменные'])))
+        self.assertEqual((diff['created'], diff['updated'], diff['unchanged']), ([], [], 2))
+        self.assertFalse([
+            query['sql'] for query in queries
+            if query['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))
+        ])
+
+    def test_topic_change_is_updated(self):
+        apply_curriculum(self.read(self.module(['Переменные'])))
+        diff = apply_curriculum(self.read(self.module(['Переменные', 'Условия'])))
+        self.assertEqual((diff['created'], diff['updated'], diff['unchanged']), ([], [(1, 2)], 1))
+        self.assertEqual(Lesson.objects.get(module=1, lesson=2).topic, 'Условия')
+
+    def test_malformed_file(self):
+        for data in (
+            [{'module': 1, 'lessons': 2}],
+            {'modules': {'module': 1}},
+            {'modules': [1]},
+            self.module([1, 2]),
+            {'modules': [{'module': 1, 'title': 5, 'lessons': 2}]},
+        ):
+            with self.subTest(data=data), self.assertRaises(CurriculumError):
+                self.read(data)
+
+
+@skipIf(analytics.np is None, 'прогноз требует numpy')
+class ForecastTests(TestCase):
+    """Прогноз окончания программы (tracker/analytics.py)"""
+
+    @override_settings(TIME_ZONE='Asia/Vladivostok')
+    def test_today_is_local_date(self):
+        np = analytics.np
+        roster = {
+            'id': np.array([1]),
+            'first_lesson_date': np.array(['2025-09-01'], dtype='datetime64[D]'),
+            'lesson': np.array([analytics.CURRICULUM_LESSONS]),
+            'backlog': np.array([0]),
+        }
+        # 20:00 по UTC — уже следующий день во Владивостоке (UTC+10)
+        now = datetime.datetime(2025, 10, 1, 20, 0, tzinfo=datetime.timezone.utc)
+        with mock.patch('django.utils.timezone.now', return_value=now):
+            result = analytics.forecast(roster)
+        # Программа пройдена: дата окончания — сегодня
+        self.assertEqual(result['finish_date'][0], np.datetime64('2025-10-02'))
+
+
+class ArchiveTests(TestCase):
+    """Перенос учеников в архив и обратно (tracker/archive.py)"""
+
+    def test_restore_keeps_report_created_at(self):
+        student = Student.objects.create(
+            first_name='Анна',
+            last_name='Иванова',
+            first_lesson_date=datetime.date(2025, 9, 1),
+            is_active=False,
+        )
+        report = AutomatedReport.objects.create(
+            student=student,
+            period_start=datetime.date(2025, 9, 1),
+            period_end=datetime.date(2025, 9, 30),
+        )
+        created_at = timezone.now() - datetime.timedelta(days=400)
+        AutomatedReport.objects.filter(pk=report.pk).update(created_at=created_at)
+
+        self.assertEqual(archive.archive_students(Student.objects.all()), 1)
+        self.assertEqual(archive.restore_students(ArchivedStudent.objects.all()), 1)
+        restored = AutomatedReport.objects.get(pk=report.pk)
+        # DjangoJSONEncoder хранит время с точностью до миллисекунд
+        self.assertEqual(restored.created_at, created_at.replace(microsecond=created_at.microsecond // 1000 * 1000))
+
+
+class LiveBrokerTests(TestCase):
+    """Очереди подписчиков живого дашборда (tracker/live.py)"""
+
+    def test_overflow_replaces_events_with_resync(self):
+        async def publish_and_read():
+            broker = live.Broker()
+            subscriber = broker.subscribe()
+            for number in range(live.QUEUE_SIZE + 1):
+                broker.publish('homework', {'number': number})
+            await asyncio.sleep(0)
+            queue = subscriber[1]
+            return [queue.get_nowait() for _ in range(queue.qsize())]
+
+        self.assertEqual(asyncio.run(publish_and_read()), [live.RESYNC])
+
+    def assertResyncs(self, change):
+        """После фиксации change() подписчик получает RESYNC, а не дельты"""
+        async def subscribe():
+            return live.broker.subscribe()
+
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        subscriber = loop.run_until_complete(subscribe())
+        self.addCleanup(live.broker.unsubscribe, subscriber)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            change()
+        loop.run_until_complete(asyncio.sleep(0))
+        queue = subscriber[1]
+        messages = [queue.get_nowait() for _ in range(queue.qsize())]
+        self.assertTrue(messages)
+        self.assertEqual(set(messages), {live.RESYNC})
+
+    def test_bulk_changes_resync(self):
+        lesson = Lesson.objects.create(module=1, lesson=1)
+        Student.objects.create(
+            first_name='Анна',
+            last_name='Иванова',
+            first_lesson_date=datetime.date(2025, 9, 1),
+            last_lesson=lesson,
+        )
+        self.assertResyncs(lambda: mark_homework_done(Student.objects.all()))
+
+    def test_archive_resyncs(self):
+        Student.objects.create(
+            first_name='Анна',
+            last_name='Иванова',
+            first_lesson_date=datetime.date(2025, 9, 1),
+            is_active=False,
+        )
+        self.assertResyncs(lambda: archive.archive_students(Student.objects.all()))
@@ -0,0 +1,96 @@
+"""
+Общая лента активности ученика из нескольких источников.
+
+Каждый источник — QuerySet, отсортированный по (дата, id) по убыванию.
+Страница собирается k-way слиянием (heapq.merge) первых page_size + 1
+записей каждого источника. Следующая страница начинается с курсора
+(дата, вид, id) последней записи, а не со смещения, поэтому каждая страница
+стоит одинаково даже при многолетней истории: фильтр по курсору идёт по
+индексу (ученик, дата, id).
+
+Лента ученика (student_timeline_sources) состоит из прохождений уроков и
+автоматических отчётов; она показывается на странице ученика в админке.
+"""
+import datetime
+import heapq
+
+from django.db.models import Q
+
+from .models import AutomatedReport, StudentLessonProgress
+
+
+TIMELINE_PAGE_SIZE = 20
+
+
+def student_timeline_sources(student):
+    """
+    Источники ленты ученика: (вид, QuerySet, поле даты). Оба источника
+    читаются по индексам (ученик, -дата, -id).
+    """
+    return [
+        (
+            'lesson',
+            StudentLessonProgress.objects.filter(student=student).select_related('lesson'),
+            'date_completed',
+        ),
+        ('report', AutomatedReport.objects.filter(student=student), 'period_end'),
+    ]
+
+
+def encode_cursor(item):
+    return f"{item['date'].isoformat()}:{item['kind']}:{item['object'].pk}"
+
+
+def decode_cursor(cursor):
+    """Курсор 'дата:вид:id' в кортеж, None для пустого или испорченного"""
+    try:
+        date, kind, pk = cursor.split(':')
+        return datetime.date.fromisoformat(date), kind, int(pk)
+    except (AttributeError, ValueError):
+        return None
+
+
+def _after_cursor(kind, date_field, cursor):
+    """Условие «строго раньше курсора» в порядке (дата, вид, id) по убыванию"""
+    date, cursor_kind, pk = cursor
+    if kind < cursor_kind:
+        return Q(**{f'{date_field}__lte': date})
+    if kind > cursor_kind:
+        return Q(**{f'{date_field}__lt': date})
+    return Q(**{f'{date_field}__lt': date}) | Q(**{date_field: date, 'pk__lt': pk})
+
+
+def _source_items(kind, queryset, date_field, cursor, limit):
+    if cursor is not None:
+        queryset = queryset.filter(_after_cursor(kind, date_field, cursor))
+    queryset = queryset.order_by(f'-{date_field}', '-pk')[:limit]
+    for obj in queryset:
+        yield {
+            'kind': kind,
+            'date': getattr(obj, date_field),
+            'object': obj,
+        }
+
+
+def get_timeline_page(sources, cursor=None, page_size=TIMELINE_PAGE_SIZE):
+    """
+    Страница ленты по источникам [(вид, QuerySet, поле даты), ...].
+    Возвращает (записи, курсор следующей страницы или None).
+    """
+    cursor = decode_cursor(cursor) if cursor else None
+    streams = [
+        _source_items(kind, queryset, date_field, cursor, page_size + 1)
+        for kind, queryset, date_field in sources
+    ]
+    merged = heapq.merge(
+        *streams,
+        key=lambda item: (item['date'], item['kind'], item['object'].pk),
+        reverse=True,
+    )
+
+    items = []
+    for item in merged:
+        if len(items) == page_size:
+            return items, encode_cursor(items[-1])
+        items.append(item)
+    return items, None
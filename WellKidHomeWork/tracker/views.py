@@ -2,9 +2,13 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.views.generic import ListView, DetailView, CreateView, UpdateView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
-from django.db.models import Q, Count, Avg
-from .models import Student, Lesson, Homework, Payment, ProgressReport
+from django.db.models import Q, Count, Avg, F
+from django.utils import timezone
+from .models import Student, Lesson, Homework, Payment, ProgressReport, StudentLessonProgress
 from .forms import StudentForm, LessonForm, HomeworkForm
+from .search import search_students
+from .snapshots import get_snapshot, get_snapshots
+from .timeline import get_timeline_page, student_timeline_sources
 
 
 class StudentListView(LoginRequiredMixin, ListView):
@@ -14,24 +18,21 @@ class StudentListView(LoginRequiredMixin, ListView):
     paginate_by = 20
     
     def get_queryset(self):
-        queryset = Student.objects.filter(is_active=True)
+        queryset = Student.active.all()
         search = self.request.GET.get('search', '')
         if search:
-            queryset = queryset.filter(
-                Q(first_name__icontains=search) |
-                Q(last_name__icontains=search) |
-                Q(group_number__icontains=search)
-            )
+            queryset = search_students(queryset, search)
         return queryset
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['stats'] = {
             'total': Student.objects.count(),
-            'active': Student.objects.filter(is_active=True).count(),
-            'group': Student.objects.filter(format='group').count(),
-            'individual': Student.objects.filter(format='individual').count(),
+            'active': Student.active.count(),
+            'group': Student.active.filter(format=Student.GROUP).count(),
+            'individual': Student.active.filter(format=Student.INDIVIDUAL).count(),
         }
+        context['snapshots'] = get_snapshots(context['students'])
         return context
 
 
@@ -42,11 +43,10 @@ class StudentDetailView(LoginRequiredMixin, DetailView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        student = self.get_object()
-        context['recent_lessons'] = student.lessons.all()[:10]
-        context['recent_homeworks'] = student.homeworks.all()[:10]
-        context['recent_payments'] = student.payments.all()[:5]
-        context['reports'] = student.reports.all()[:5]
+        context['snapshot'] = get_snapshot(self.object)
+        context['timeline'] = get_timeline_page(
+            student_timeline_sources(self.object), self.request.GET.get('cursor')
+        )
         return context
 
 
@@ -96,42 +96,23 @@ class HomeworkCreateView(LoginRequiredMixin, CreateView):
 
 def dashboard_view(request):
     """Дашборд с общей статистикой"""
-    total_students = Student.objects.count()
-    active_students = Student.objects.filter(is_active=True).count()
-    total_lessons = Lesson.objects.count()
-    completed_homeworks = Homework.objects.filter(status='completed').count()
-    
-    # Статистика по статусам ДЗ
-    homework_stats = {
-        'green': Student.objects.filter(
-            last_homework_lesson__gte=models.F('last_lesson')
-        ).count(),
-        'yellow': Student.objects.filter(
-            last_homework_lesson=models.F('last_lesson') - 1
-        ).count(),
-        'red': Student.objects.filter(
-            last_homework_lesson__lt=models.F('last_lesson') - 1
-        ).count(),
-    }
-    
-    # Ближайшие дедлайны по ДЗ
-    upcoming_deadlines = Homework.objects.filter(
-        deadline__gte=timezone.now().date()
-    ).order_by('deadline')[:10]
-    
-    # Предстоящие платежи
-    upcoming_payments = Payment.objects.filter(
-        status='pending',
-        date__gte=timezone.now().date()
-    ).order_by('date')[:10]
-    
+    today = timezone.now().date()
     context = {
-        'total_students': total_students,
-        'active_students': active_students,
-        'total_lessons': total_lessons,
-        'completed_homeworks': completed_homeworks,
-        'homework_stats': homework_stats,
-        'upcoming_deadlines': upcoming_deadlines,
-        'upcoming_payments': upcoming_payments,
+        'total_students': Student.objects.count(),
+        'active_students': Student.active.count(),
+        'total_lessons': Lesson.objects.count(),
+        'completed_homeworks': Homework.objects.filter(status='completed').count(),
+        # Статистика по статусам ДЗ
+        'homework_stats': Student.objects.aggregate(
+            green=Count('pk', filter=Q(last_homework_lesson__gte=F('last_lesson'))),
+            yellow=Count('pk', filter=Q(last_homework_lesson=F('last_lesson') - 1)),
+            red=Count('pk', filter=Q(last_homework_lesson__lt=F('last_lesson') - 1)),
+        ),
+        # Ближайшие дедлайны по ДЗ
+        'upcoming_deadlines': Homework.objects.filter(deadline__gte=today).order_by('deadline')[:10],
+        # Предстоящие платежи
+        'upcoming_payments': Payment.objects.filter(
+            status='pending', date__gte=today
+        ).order_by('date')[:10],
     }
-    return render(request, 'tracker/dashboard.html', context)
\ No newline at end of file
+    return render(request, 'tracker/dashboard.html', context)